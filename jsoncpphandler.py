@@ -22,7 +22,9 @@
 
 import string
 import os.path
+import hashlib
 import json
+import re
 import types
 
 class JSONBaseHandler:
@@ -68,10 +70,159 @@ class JSONBaseHandler:
 		if JSONBaseHandler.print_trace:
 			print "--" * len(parent_names) + "handle_string " + str(name)
 
+class FileUtil:
+	def hash_chunks(chunks):
+		md5 = hashlib.md5()
+		for chunk in chunks:
+			md5.update(chunk)
+		return md5.hexdigest()
+
+	def hash_file(filepath):
+		md5 = hashlib.md5()
+		f = open(filepath, "rb")
+		while True:
+			block = f.read(65536)
+			if len(block) == 0:
+				break
+			md5.update(block)
+		f.close()
+		return md5.hexdigest()
+
+	def save_if_changed(filepath, chunks):
+		# chunks is a string or a list of strings, it is written without being joined.
+		# keep the file (and its mtime) untouched when content is the same,
+		# so that build tools do not recompile unchanged code
+		if type(chunks) in types.StringTypes:
+			chunks = [chunks]
+
+		if os.path.exists(filepath) \
+				and os.path.getsize(filepath) == sum([len(chunk) for chunk in chunks]) \
+				and FileUtil.hash_file(filepath) == FileUtil.hash_chunks(chunks):
+			return False
+
+		f = open(filepath, "w")
+		f.writelines(chunks)
+		f.close()
+		return True
+
+	hash_chunks = staticmethod(hash_chunks)
+	hash_file = staticmethod(hash_file)
+	save_if_changed = staticmethod(save_if_changed)
+
+# Writers receive every generated file as writer(relative path, list of string chunks)
+class FileWriter:
+	# save generated files under dirpath, unchanged files are not touched
+	def __init__(self, dirpath):
+		self.dirpath = dirpath
+
+	def __call__(self, filename, chunks):
+		filepath = os.path.join(self.dirpath, filename)
+		dirpath = os.path.dirname(filepath)
+		if dirpath != "" and not os.path.exists(dirpath):
+			try:
+				os.makedirs(dirpath)
+			except OSError:
+				# created by another generator process
+				if not os.path.isdir(dirpath):
+					raise
+		FileUtil.save_if_changed(filepath, chunks)
+
+class MemoryWriter:
+	# keep generated files as {relative path: content}
+	def __init__(self):
+		self.files = {}
+
+	def __call__(self, filename, chunks):
+		self.files[filename] = "".join(chunks)
+
+class CppTemplate:
+	# same "${name}" syntax as string.Template, but the template is split
+	# once so that substitute() only joins text and values
+	placeholder_re = re.compile(r"\$\{([_a-zA-Z][_a-zA-Z0-9]*)\}")
+
+	def __init__(self, template):
+		self.template = template
+		# literal text at even index, placeholder name at odd index
+		self.parts = CppTemplate.placeholder_re.split(template)
+
+	def substitute(self, mapping):
+		parts = self.parts[:]
+		for i in xrange(1, len(parts), 2):
+			parts[i] = mapping[parts[i]]
+		return "".join(parts)
+
 ###############################################################################
 # Convert JSON to C++
 #
 
+class CppCodeOptions:
+	# variants of the generated code besides namespace and string type
+
+	decoders = ["dom", "stream"]
+	encoders = ["dom", "stream"]
+	layouts = ["optional", "compact"]
+	allocators = ["std", "arena"]
+
+	def __init__(self, decoder = "dom", encoder = "dom", layout = "optional", arraylayout = "optional", allocator = "std", parallel = False, lazy = False):
+		self.decoder = decoder
+		self.encoder = encoder
+		self.layout = layout
+		self.arraylayout = arraylayout
+		self.allocator = allocator
+		self.parallel = parallel
+		self.lazy = lazy
+
+	def signature(self):
+		# part of the generation cache key
+		return "decoder=" + self.decoder + ",encoder=" + self.encoder + ",layout=" + self.layout \
+			+ ",arraylayout=" + self.arraylayout + ",allocator=" + self.allocator + ",parallel=" + str(int(self.parallel)) \
+			+ ",lazy=" + str(int(self.lazy))
+
+	def detail_headers(self, namespace):
+		# "detail/" headers shared by all classes, they do not depend on the schema
+		ret = [CppMappedFile(namespace)]
+		if self.decoder == "stream":
+			ret.append(CppJSONReader(namespace))
+		if self.encoder == "stream":
+			ret.append(CppJSONWriter(namespace))
+		if self.allocator == "arena":
+			ret.append(CppArena(namespace))
+		if self.parallel:
+			ret.append(CppParallel(namespace))
+		if self.lazy:
+			ret.append(CppLazy(namespace))
+		return ret
+
+	def add_options(parser):
+		parser.add_option("--decoder", dest="decoder", default="dom",
+			help="""how DecodeJSON(std::istream &) parses JSON, "dom" reads a json_spirit Value first, "stream" decodes while parsing without the Value. Default is dom""")
+		parser.add_option("--encoder", dest="encoder", default="dom",
+			help="""how EncodeJSON(std::ostream &, bool) writes JSON, "dom" builds a json_spirit Value first, "stream" writes fields straight to the stream. Default is dom""")
+		parser.add_option("--layout", dest="layout", default="optional",
+			help="""how object fields are stored, "optional" as public boost::optional members, "compact" as private plain members with a presence bitmask and has_x()/x()/set_x() accessors. Default is optional""")
+		parser.add_option("--arraylayout", dest="arraylayout", default="optional",
+			help="""how array elements are stored, "optional" as std::vector of boost::optional, "compact" as std::vector of plain values with a separate null bitmap. Default is optional""")
+		parser.add_option("--allocator", dest="allocator", default="std",
+			help="""where strings and arrays allocate memory, "std" from the heap, "arena" from the detail::Arena made current by detail::ArenaScope when they are created, so that memory of a decoded message is released at once. Default is std""")
+		parser.add_option("--parallel", action="store_true", dest="parallel", default=False,
+			help="""give top level array classes DecodeJSONParallel() and EncodeJSONParallel(), which decode and encode parts of the elements on boost::thread threads, requires --decoder=stream as json_spirit parsing is not thread safe. Default is False""")
+		parser.add_option("--lazy", action="store_true", dest="lazy", default=False,
+			help="""keep object and array fields of objects as their JSON text when decoded by DecodeJSON(detail::JSONReader &), decode them on first access by x() or mutable_x(), and encode untouched ones as the kept text, requires --decoder=stream and --layout=compact. Default is False""")
+
+	def is_valid(options):
+		return options.decoder in CppCodeOptions.decoders and options.encoder in CppCodeOptions.encoders \
+			and options.layout in CppCodeOptions.layouts and options.arraylayout in CppCodeOptions.layouts \
+			and options.allocator in CppCodeOptions.allocators \
+			and (not options.parallel or options.decoder == "stream") \
+			and (not options.lazy or (options.decoder == "stream" and options.layout == "compact"))
+
+	def from_options(options):
+		return CppCodeOptions(options.decoder, options.encoder, options.layout, options.arraylayout, options.allocator, options.parallel, options.lazy)
+
+	add_options = staticmethod(add_options)
+	is_valid = staticmethod(is_valid)
+	from_options = staticmethod(from_options)
+
 class CppFormat:
 	def headerfilename(name):
 		if name != None and (name.find("::") >= 0):
@@ -108,6 +259,73 @@ class CppFormat:
 		n = CppFormat.classname(name)
 		return "m_" + string.lower(n[0]) + n[1:]
 
+	def accessorname(name):
+		# "x" of has_x(), x() and set_x() in compact layout
+		return CppFormat.fieldname(name)[2:]
+
+	def field_ref(name, layout):
+		# lvalue a decoded field value is assigned to
+		if layout == "compact":
+			return "mutable_" + CppFormat.accessorname(name) + "()"
+		return CppFormat.fieldname(name)
+
+	def field_test(name, layout):
+		# true when the field has a value
+		if layout == "compact":
+			return "has_" + CppFormat.accessorname(name) + "()"
+		return CppFormat.fieldname(name)
+
+	def field_value_ref(name, layout):
+		# modifiable value of a field having one
+		if layout == "compact":
+			return "mutable_" + CppFormat.accessorname(name) + "()"
+		return "*" + CppFormat.fieldname(name)
+
+	def field_value(name, layout):
+		# value of a field having one
+		if layout == "compact":
+			return CppFormat.accessorname(name) + "()"
+		return "*" + CppFormat.fieldname(name)
+
+	def field_reset(name, layout, classname, lazy = False):
+		# makes an object or array field new before decoding into it,
+		# compact fields are cleared to keep their capacity
+		if lazy:
+			return CppFormat.fieldname(name) + ".Clear();"
+		if layout == "compact":
+			return CppFormat.field_ref(name, layout) + ".Clear();"
+		return CppFormat.fieldname(name) + " = " + classname + "();"
+
+	def field_raw_test(name):
+		# true when a lazy field has JSON text not decoded yet
+		return "has_raw_" + CppFormat.accessorname(name) + "()"
+
+	def field_raw_value(name):
+		return "raw_" + CppFormat.accessorname(name) + "()"
+
+	def field_raw_ref(name):
+		return "mutable_raw_" + CppFormat.accessorname(name) + "()"
+
+	def lazytype(cpptype, stringtype, allocator):
+		return "detail::Lazy<" + cpptype + ", " + CppFormat.fieldstringtype(stringtype, allocator) + ">"
+
+	def fieldstringtype(stringtype, allocator):
+		# C++ type of string fields and array elements
+		if allocator == "arena":
+			return "detail::" + CppFormat.stringtype_w(stringtype) + "ArenaString"
+		return stringtype
+
+	def vectortype(elementtype, allocator):
+		if allocator == "arena":
+			return "std::vector<" + elementtype + ", detail::ArenaAllocator<" + elementtype + "> >"
+		return "std::vector<" + elementtype + ">"
+
+	def converted(convert, expr):
+		# expr passed to function convert, if any
+		if convert == "":
+			return expr
+		return convert + "(" + expr + ")"
+
 	def indent(level):
 		return "  " * level
 
@@ -143,6 +361,11 @@ class CppFormat:
 			return "w"
 		return ""
 
+	def chartype(stringtype):
+		if stringtype == "std::wstring":
+			return "wchar_t"
+		return "char"
+
 	def stringtype_L(stringtype):
 		if stringtype == "std::wstring":
 			return "L"
@@ -155,6 +378,41 @@ class CppFormat:
 		return "void " + decorator \
 			+ "DecodeJSON(std::" + CppFormat.stringtype_w(stringtype) + "istream & is)"
 
+	def method_decodejson_range_signature(names, stringtype):
+		decorator = ""
+		if len(names) > 0:
+			decorator = CppFormat.class_decorator(names) + "::"
+		chartype = CppFormat.chartype(stringtype)
+		return "void " + decorator \
+			+ "DecodeJSON(const " + chartype + " * begin, const " + chartype + " * end)"
+
+	def method_decodejson_file_signature(names, stringtype):
+		decorator = ""
+		if len(names) > 0:
+			decorator = CppFormat.class_decorator(names) + "::"
+		return "void " + decorator + "DecodeJSONFile(const char * path)"
+
+	def method_decodejson_stream_signature(names, stringtype):
+		decorator = ""
+		if len(names) > 0:
+			decorator = CppFormat.class_decorator(names) + "::"
+		return "void " + decorator + "DecodeJSONStream(std::" + CppFormat.stringtype_w(stringtype) + "istream & is, " \
+			+ "const boost::function<void (" + CppFormat.classname(names[-1], names[:-1]) + " &)> & callback)"
+
+	def method_decodejson_parallel_signature(names, stringtype):
+		decorator = ""
+		if len(names) > 0:
+			decorator = CppFormat.class_decorator(names) + "::"
+		chartype = CppFormat.chartype(stringtype)
+		return "void " + decorator \
+			+ "DecodeJSONParallel(const " + chartype + " * begin, const " + chartype + " * end, unsigned int threads)"
+
+	def method_decodejson_file_parallel_signature(names, stringtype):
+		decorator = ""
+		if len(names) > 0:
+			decorator = CppFormat.class_decorator(names) + "::"
+		return "void " + decorator + "DecodeJSONFileParallel(const char * path, unsigned int threads)"
+
 	def method_decodejson_object_signature(names, stringtype):
 		decorator = ""
 		if len(names) > 0:
@@ -165,6 +423,20 @@ class CppFormat:
 	def method_decodejson_array_signature(names, stringtype):
 		return CppFormat.method_decodejson_object_signature(names, stringtype)
 
+	def method_decodejson_reader_signature(names, stringtype):
+		decorator = ""
+		if len(names) > 0:
+			decorator = CppFormat.class_decorator(names) + "::"
+		return "void " + decorator \
+			+ "DecodeJSON(detail::" + CppFormat.stringtype_w(stringtype) + "JSONReader & reader)"
+
+	def method_decodejson_member_signature(names, stringtype):
+		decorator = ""
+		if len(names) > 0:
+			decorator = CppFormat.class_decorator(names) + "::"
+		return "bool " + decorator \
+			+ "DecodeJSONMember(const " + stringtype + " & name, detail::" + CppFormat.stringtype_w(stringtype) + "JSONReader & reader)"
+
 	def method_encodejson_ostream_signature(names, stringtype):
 		decorator = ""
 		if len(names) > 0:
@@ -172,6 +444,33 @@ class CppFormat:
 		return "void " + decorator \
 			+ "EncodeJSON(std::" + CppFormat.stringtype_w(stringtype) + "ostream & os, bool isPrettyPrint) const"
 
+	def method_encodejson_stream_signature(names, stringtype):
+		decorator = ""
+		if len(names) > 0:
+			decorator = CppFormat.class_decorator(names) + "::"
+		return "void " + decorator \
+			+ "EncodeJSONStream(std::" + CppFormat.stringtype_w(stringtype) + "ostream & os) const"
+
+	def method_encodejson_parallel_signature(names, stringtype):
+		decorator = ""
+		if len(names) > 0:
+			decorator = CppFormat.class_decorator(names) + "::"
+		return "void " + decorator \
+			+ "EncodeJSONParallel(std::" + CppFormat.stringtype_w(stringtype) + "ostream & os, unsigned int threads) const"
+
+	def method_encodejson_range_signature(names, stringtype):
+		decorator = ""
+		if len(names) > 0:
+			decorator = CppFormat.class_decorator(names) + "::"
+		return "void " + decorator \
+			+ "EncodeJSON(std::" + CppFormat.stringtype_w(stringtype) + "string & text, std::size_t first, std::size_t last) const"
+
+	def method_clear_signature(names):
+		decorator = ""
+		if len(names) > 0:
+			decorator = CppFormat.class_decorator(names) + "::"
+		return "void " + decorator + "Clear()"
+
 	def method_encodejson_object_or_array_signature(names, stringtype):
 		decorator = ""
 		if len(names) > 0:
@@ -179,26 +478,75 @@ class CppFormat:
 		return "void " + decorator \
 			+ "EncodeJSON(json_spirit::" + CppFormat.stringtype_w(stringtype) + "Value & val) const"
 
+	def method_encodejson_writer_signature(names, stringtype):
+		decorator = ""
+		if len(names) > 0:
+			decorator = CppFormat.class_decorator(names) + "::"
+		return "void " + decorator \
+			+ "EncodeJSON(detail::" + CppFormat.stringtype_w(stringtype) + "JSONWriter & writer) const"
+
+	def method_encodejson_members_signature(names, stringtype):
+		decorator = ""
+		if len(names) > 0:
+			decorator = CppFormat.class_decorator(names) + "::"
+		return "void " + decorator \
+			+ "EncodeJSONMembers(detail::" + CppFormat.stringtype_w(stringtype) + "JSONWriter & writer) const"
+
+	def json_key_literal(name):
+		# C++ string literal content of the quoted and escaped JSON name
+		escaped = name.replace("\\", "\\\\").replace("\"", "\\\"")
+		for c, e in [("\b", "\\b"), ("\f", "\\f"), ("\n", "\\n"), ("\r", "\\r"), ("\t", "\\t")]:
+			escaped = escaped.replace(c, e)
+		return ("\"" + escaped + "\"").replace("\\", "\\\\").replace("\"", "\\\"")
+
 	headerfilename = staticmethod(headerfilename)
 	bodyfilename = staticmethod(bodyfilename)
 	arrayelement_classname = staticmethod(arrayelement_classname)
 	classname = staticmethod(classname)
 	fieldname = staticmethod(fieldname)
+	accessorname = staticmethod(accessorname)
+	field_ref = staticmethod(field_ref)
+	field_test = staticmethod(field_test)
+	field_value_ref = staticmethod(field_value_ref)
+	field_value = staticmethod(field_value)
+	field_reset = staticmethod(field_reset)
+	field_raw_test = staticmethod(field_raw_test)
+	field_raw_value = staticmethod(field_raw_value)
+	field_raw_ref = staticmethod(field_raw_ref)
+	lazytype = staticmethod(lazytype)
+	fieldstringtype = staticmethod(fieldstringtype)
+	vectortype = staticmethod(vectortype)
+	converted = staticmethod(converted)
 	indent = staticmethod(indent)
 	class_decorator = staticmethod(class_decorator)
 	namespace_begin = staticmethod(namespace_begin)
 	namespace_end = staticmethod(namespace_end)
 	stringtype_w = staticmethod(stringtype_w)
+	chartype = staticmethod(chartype)
 	stringtype_L = staticmethod(stringtype_L)
 	method_decodejson_istream_signature = staticmethod(method_decodejson_istream_signature)
+	method_decodejson_range_signature = staticmethod(method_decodejson_range_signature)
+	method_decodejson_file_signature = staticmethod(method_decodejson_file_signature)
+	method_decodejson_stream_signature = staticmethod(method_decodejson_stream_signature)
+	method_decodejson_parallel_signature = staticmethod(method_decodejson_parallel_signature)
+	method_decodejson_file_parallel_signature = staticmethod(method_decodejson_file_parallel_signature)
 	method_decodejson_object_signature = staticmethod(method_decodejson_object_signature)
 	method_decodejson_array_signature = staticmethod(method_decodejson_array_signature)
+	method_decodejson_reader_signature = staticmethod(method_decodejson_reader_signature)
+	method_decodejson_member_signature = staticmethod(method_decodejson_member_signature)
 	method_encodejson_ostream_signature = staticmethod(method_encodejson_ostream_signature)
+	method_encodejson_stream_signature = staticmethod(method_encodejson_stream_signature)
+	method_encodejson_parallel_signature = staticmethod(method_encodejson_parallel_signature)
+	method_encodejson_range_signature = staticmethod(method_encodejson_range_signature)
+	method_clear_signature = staticmethod(method_clear_signature)
 	method_encodejson_object_or_array_signature = staticmethod(method_encodejson_object_or_array_signature)
+	method_encodejson_writer_signature = staticmethod(method_encodejson_writer_signature)
+	method_encodejson_members_signature = staticmethod(method_encodejson_members_signature)
+	json_key_literal = staticmethod(json_key_literal)
 
 class CppHeaderHandler(JSONBaseHandler):
 
-	file_begin_template = string.Template(
+	file_begin_template = CppTemplate(
 """
 /*
  * The MIT License (MIT)
@@ -232,6 +580,7 @@ class CppHeaderHandler(JSONBaseHandler):
 #include <ostream>
 #include <string>
 #include <vector>
+#include <boost/function.hpp>
 #include <boost/optional.hpp>
 #include <json_spirit.h>
 
@@ -243,66 +592,309 @@ class CppHeaderHandler(JSONBaseHandler):
 #endif
 """
 
-	class_begin_template = string.Template(
+	class_begin_template = CppTemplate(
 """
 ${indent}class ${classname} ${inherit_base_class}
 ${indent}{
 ${indent}public:
 ${indent}  void DecodeJSON(std::${w}istream & is);
-${indent}  ${method_decodejson_signature};
-${indent}  void EncodeJSON(std::${w}ostream & os, bool isPrettyPrint = false) const;
-${indent}  ${method_encodejson_signature};
+${indent}  void DecodeJSON(const ${char} * begin, const ${char} * end);
+${indent}  void DecodeJSONFile(const char * path);
+${decode_stream_methods}${indent}  ${method_decodejson_signature};
+${decoder_methods}${indent}  void EncodeJSON(std::${w}ostream & os, bool isPrettyPrint = false) const;
+${encode_stream_methods}${indent}  ${method_encodejson_signature};
+${encoder_methods}${indent}  // ${clear_comment}
+${indent}  void Clear();
+
+"""
+	)
+
+	decode_stream_methods_of_class_template = CppTemplate(
+"""${indent}  // decodes each line of NDJSON into this object and calls callback(*this)
+${indent}  void DecodeJSONStream(std::${w}istream & is, const boost::function<void (${classname} &)> & callback);
+"""
+	)
+
+	encode_stream_methods_of_class_template = CppTemplate(
+"""${indent}  // writes one line of NDJSON
+${indent}  void EncodeJSONStream(std::${w}ostream & os) const;
+"""
+	)
+
+	# what Clear() keeps, by layout
+	clear_comments = {
+		"optional": "same as a new object, boost::optional fields are released, --layout=compact keeps their capacity",
+		"compact": "same as a new object, but strings, arrays and nested objects keep their capacity"
+	}
+
+	reader_methods_of_class_template = CppTemplate(
+"""${indent}  void DecodeJSON(detail::${w}JSONReader & reader);
+"""
+	)
+
+	member_methods_of_object_template = CppTemplate(
+"""${indent}  bool DecodeJSONMember(const ${stringtype} & name, detail::${w}JSONReader & reader);
+"""
+	)
+
+	writer_methods_of_class_template = CppTemplate(
+"""${indent}  void EncodeJSON(detail::${w}JSONWriter & writer) const;
+"""
+	)
+
+	members_methods_of_object_template = CppTemplate(
+"""${indent}  void EncodeJSONMembers(detail::${w}JSONWriter & writer) const;
+"""
+	)
+
+	parallel_methods_of_array_template = CppTemplate(
+"""${indent}  // parts of the elements are decoded and encoded on threads, 0 threads for one per processor
+${indent}  void DecodeJSONParallel(const ${char} * begin, const ${char} * end, unsigned int threads = 0);
+${indent}  void DecodeJSONFileParallel(const char * path, unsigned int threads = 0);
+${indent}  void EncodeJSONParallel(std::${w}ostream & os, unsigned int threads = 0) const;
+${indent}  // elements [first, last) as an array
+${indent}  void EncodeJSON(std::${w}string & text, std::size_t first, std::size_t last) const;
 
 """
 	)
 
-	class_end_template = string.Template(
+	class_end_template = CppTemplate(
 """${indent}};
 
 """
 	)
 
-	field_of_object_template = string.Template(
+	field_of_object_template = CppTemplate(
 """${indent}boost::optional<${type}> ${name};
 """
 	)
 
-	element_type_of_array_template = string.Template(
+	constructor_of_compact_object_template = CppTemplate(
+"""${indent}  ${classname}() : ${initializers} {}
+"""
+	)
+
+	accessors_of_compact_field_template = CppTemplate(
+"""${indent}  bool has_${accessor}() const { return 0 != (m_has_bits[${index}] & ${mask}); }
+${indent}  const ${type} & ${accessor}() const { return ${name}; }
+${indent}  ${type} & mutable_${accessor}() { m_has_bits[${index}] |= ${mask}; return ${name}; }
+${indent}  void set_${accessor}(const ${type} & value) { mutable_${accessor}() = value; }
+${indent}  void clear_${accessor}() { m_has_bits[${index}] &= ${clear_mask}; ${name} = ${type}(); }
+"""
+	)
+
+	accessors_of_lazy_field_template = CppTemplate(
+"""${indent}  bool has_${accessor}() const { return 0 != (m_has_bits[${index}] & ${mask}); }
+${indent}  const ${type} & ${accessor}() const { return ${name}.get(); }
+${indent}  ${type} & mutable_${accessor}() { m_has_bits[${index}] |= ${mask}; return ${name}.get(); }
+${indent}  void set_${accessor}(const ${type} & value) { mutable_${accessor}() = value; }
+${indent}  void clear_${accessor}() { m_has_bits[${index}] &= ${clear_mask}; ${name} = ${lazytype}(); }
+${indent}  // JSON text kept by DecodeJSON() until ${accessor}() or mutable_${accessor}() decodes it
+${indent}  bool has_raw_${accessor}() const { return ${name}.is_raw(); }
+${indent}  const ${rawtype} & raw_${accessor}() const { return ${name}.raw(); }
+${indent}  ${rawtype} & mutable_raw_${accessor}() { m_has_bits[${index}] |= ${mask}; return ${name}.mutable_raw(); }
+"""
+	)
+
+	private_of_compact_object_template = CppTemplate(
+"""${indent}private:
+"""
+	)
+
+	field_of_compact_object_template = CppTemplate(
+"""${indent}  ${type} ${name};
+"""
+	)
+
+	has_bits_of_compact_object_template = CppTemplate(
+"""${indent}  unsigned char m_has_bits[${size}];
+"""
+	)
+
+	# storage order of compact fields, wider types first to save padding
+	compact_field_ranks = {"int": 1, "bool": 2}
+
+	element_type_of_array_template = CppTemplate(
 """${indent}typedef boost::optional<${type}> ArrayElementType;
 """
 	)
 
-	array_type_of_array_template = string.Template(
-"""${indent}  typedef std::vector<ArrayElementType> ArrayType;
+	array_type_of_array_template = CppTemplate(
+"""${indent}  typedef ${vectortype} ArrayType;
+${indent}  ArrayType m_array;
+"""
+	)
+
+	element_type_of_compact_array_template = CppTemplate(
+"""${indent}typedef ${type} ArrayElementType;
+"""
+	)
+
+	array_type_of_compact_array_template = CppTemplate(
+"""${indent}  typedef ${vectortype} ArrayType;
 ${indent}  ArrayType m_array;
+${indent}  ${boolvectortype} m_null;
+
+${indent}  bool is_null(ArrayType::size_type i) const { return i < m_null.size() && m_null[i]; }
+${indent}  void push_back(const ArrayElementType & value) { m_array.push_back(value); if (!m_null.empty()) { m_null.push_back(false); } }
+${indent}  void push_back_null() { m_null.resize(m_array.size(), false); m_array.push_back(ArrayElementType()); m_null.push_back(true); }
 """
 	)
 
-	def __init__(self, namespace, stringtype):
+	def __init__(self, namespace, stringtype, codeoptions = None):
+		if codeoptions == None:
+			codeoptions = CppCodeOptions()
 		self.namespace = namespace
 		self.stringtype = stringtype
+		self.codeoptions = codeoptions
+		# directory of "detail/" headers relative to this header
+		self.detaildir = "detail/"
 		self.filename = ""
 		self.classname = ""
 		self.file_begin = ""
-		self.class_decl = ""
+		self.class_decl = []
 		self.file_end = CppHeaderHandler.file_end
 		self.dep_types = set()
+		# [(type, JSON name)] of objects being declared in compact layout
+		self.compact_fields = []
+		if codeoptions.arraylayout == "compact":
+			self.element_type_template = CppHeaderHandler.element_type_of_compact_array_template
+			self.array_type_template = CppHeaderHandler.array_type_of_compact_array_template
+		else:
+			self.element_type_template = CppHeaderHandler.element_type_of_array_template
+			self.array_type_template = CppHeaderHandler.array_type_of_array_template
+
+	def includes(self):
+		# generated headers included by this header
+		ret = [CppFormat.headerfilename(dep_type) for dep_type in sorted(self.dep_types)]
+		if self.codeoptions.decoder == "stream":
+			ret.append(self.detaildir + CppJSONReader.filename)
+		if self.codeoptions.encoder == "stream":
+			ret.append(self.detaildir + CppJSONWriter.filename)
+		if self.codeoptions.allocator == "arena":
+			ret.append(self.detaildir + CppArena.filename)
+		if self.codeoptions.parallel:
+			ret.append(self.detaildir + CppParallel.filename)
+		if self.codeoptions.lazy:
+			ret.append(self.detaildir + CppLazy.filename)
+		return ret
+
+	def stream_methods(self, template, indent, classname, is_top):
+		# DecodeJSONStream() and EncodeJSONStream() of the class a header is named after
+		if not is_top:
+			return ""
+
+		return template.substitute({
+				"indent": indent,
+				"classname": classname,
+				"w": CppFormat.stringtype_w(self.stringtype)
+			})
+
+	def decoder_methods(self, indent, is_object):
+		# declarations of methods the decoder variant adds
+		if self.codeoptions.decoder != "stream":
+			return ""
+
+		ret = CppHeaderHandler.reader_methods_of_class_template.substitute({
+				"indent": indent,
+				"w": CppFormat.stringtype_w(self.stringtype)
+			})
+		if is_object:
+			ret += CppHeaderHandler.member_methods_of_object_template.substitute({
+					"indent": indent,
+					"stringtype": self.stringtype,
+					"w": CppFormat.stringtype_w(self.stringtype)
+				})
+		return ret
+
+	def encoder_methods(self, indent, is_object):
+		# declarations of methods the encoder variant adds
+		if self.codeoptions.encoder != "stream":
+			return ""
+
+		ret = CppHeaderHandler.writer_methods_of_class_template.substitute({
+				"indent": indent,
+				"w": CppFormat.stringtype_w(self.stringtype)
+			})
+		if is_object:
+			ret += CppHeaderHandler.members_methods_of_object_template.substitute({
+					"indent": indent,
+					"w": CppFormat.stringtype_w(self.stringtype)
+				})
+		return ret
+
+	def add_field(self, parent_names, cpptype, name, lazy = False):
+		if self.codeoptions.layout == "compact":
+			# declared at object end when the number of fields is known
+			self.compact_fields[-1].append((cpptype, name, lazy))
+			return None
+
+		self.class_decl.append(CppHeaderHandler.field_of_object_template.substitute({
+				"indent": CppFormat.indent(len(parent_names)),
+				"type": cpptype,
+				"name": CppFormat.fieldname(name)
+			}))
+
+	def compact_members(self, indent, classname, fields):
+		# accessors, plain fields and one presence bit per field
+		if len(fields) == 0:
+			return []
+
+		storage = sorted(fields, key = lambda field: CppHeaderHandler.compact_field_ranks.get(field[0], 0))
+		initializers = [CppFormat.fieldname(name) + "()" for (cpptype, name, lazy) in storage]
+		initializers.append("m_has_bits()")
+
+		ret = [CppHeaderHandler.constructor_of_compact_object_template.substitute({
+				"indent": indent,
+				"classname": classname,
+				"initializers": ", ".join(initializers)
+			})]
+		for i, (cpptype, name, lazy) in enumerate(fields):
+			mask = 1 << (i % 8)
+			accessors_template = CppHeaderHandler.accessors_of_compact_field_template
+			if lazy:
+				accessors_template = CppHeaderHandler.accessors_of_lazy_field_template
+			ret.append(accessors_template.substitute({
+					"indent": indent,
+					"type": cpptype,
+					"lazytype": CppFormat.lazytype(cpptype, self.stringtype, self.codeoptions.allocator),
+					"rawtype": CppFormat.fieldstringtype(self.stringtype, self.codeoptions.allocator),
+					"name": CppFormat.fieldname(name),
+					"accessor": CppFormat.accessorname(name),
+					"index": str(i / 8),
+					"mask": "0x%02x" % mask,
+					"clear_mask": "0x%02x" % (0xff ^ mask)
+				}))
+		ret.append(CppHeaderHandler.private_of_compact_object_template.substitute({"indent": indent}))
+		for (cpptype, name, lazy) in storage:
+			if lazy:
+				cpptype = CppFormat.lazytype(cpptype, self.stringtype, self.codeoptions.allocator)
+			ret.append(CppHeaderHandler.field_of_compact_object_template.substitute({
+					"indent": indent,
+					"type": cpptype,
+					"name": CppFormat.fieldname(name)
+				}))
+		ret.append(CppHeaderHandler.has_bits_of_compact_object_template.substitute({
+				"indent": indent,
+				"size": str((len(fields) + 7) / 8)
+			}))
+		return ret
+
+	def chunks(self):
+		dep_includes = "\n".join(["#include \"" + f + "\"" for f in self.includes()]) + "\n\n"
+		ret = [self.file_begin, dep_includes, CppFormat.namespace_begin(self.namespace)]
+		ret.extend(self.class_decl)
+		ret.extend([CppFormat.namespace_end(self.namespace), self.file_end])
+		return ret
 
 	def content(self):
-		dep_includes = "\n".join(["#include \"" + CppFormat.headerfilename(dep_type) + "\"" \
-					for dep_type in sorted(self.dep_types)] ) \
-				+ "\n\n"
-		return self.file_begin \
-			+ dep_includes \
-			+ CppFormat.namespace_begin(self.namespace) \
-			+ self.class_decl \
-			+ CppFormat.namespace_end(self.namespace) \
-			+ self.file_end
+		return "".join(self.chunks())
+
+	def save(self, writer):
+		writer(self.filename, self.chunks())
 
 	def save_to_dir(self, dirpath):
-		f = open(os.path.join(dirpath, self.filename), "w")
-		f.write(self.content())
-		f.close()
+		self.save(FileWriter(dirpath))
 
 	def handle_object_start(self, parent_names, name, object_type_name = None, base_type_name = None):
 		gen_class = (object_type_name == None) or ( len(parent_names) == 0 )
@@ -327,41 +919,48 @@ ${indent}  ArrayType m_array;
 		if not gen_class:
 			return None
 
-		self.class_decl += CppHeaderHandler.class_begin_template.substitute({
+		self.class_decl.append(CppHeaderHandler.class_begin_template.substitute({
 				"indent": CppFormat.indent(len(parent_names)),
 				"classname" : classname,
 				"inherit_base_class": inherit_base_class,
 				"w": CppFormat.stringtype_w(self.stringtype),
+				"char": CppFormat.chartype(self.stringtype),
 				"method_decodejson_signature": CppFormat.method_decodejson_object_signature([], self.stringtype),
-				"method_encodejson_signature": CppFormat.method_encodejson_object_or_array_signature([], self.stringtype)
-			})
+				"decode_stream_methods": self.stream_methods(CppHeaderHandler.decode_stream_methods_of_class_template,
+					CppFormat.indent(len(parent_names)), classname, len(parent_names) == 0),
+				"decoder_methods": self.decoder_methods(CppFormat.indent(len(parent_names)), True),
+				"encode_stream_methods": self.stream_methods(CppHeaderHandler.encode_stream_methods_of_class_template,
+					CppFormat.indent(len(parent_names)), classname, len(parent_names) == 0),
+				"encoder_methods": self.encoder_methods(CppFormat.indent(len(parent_names)), True),
+				"method_encodejson_signature": CppFormat.method_encodejson_object_or_array_signature([], self.stringtype),
+				"clear_comment": CppHeaderHandler.clear_comments[self.codeoptions.layout]
+			}))
+		self.compact_fields.append([])
 
 	def handle_object_end(self, parent_names, name, object_type_name = None):
 		gen_class = (object_type_name == None) or ( len(parent_names) == 0 )
 
 		if gen_class:
-			self.class_decl += CppHeaderHandler.class_end_template.substitute({
+			self.class_decl.extend(self.compact_members(CppFormat.indent(len(parent_names)),
+					CppFormat.classname(name, parent_names), self.compact_fields.pop()))
+			self.class_decl.append(CppHeaderHandler.class_end_template.substitute({
 					"indent": CppFormat.indent(len(parent_names))
-				})
+				}))
 
 		if len(parent_names) > 0:
 			if self.is_parent_array(name):
 				if gen_class:
-					self.class_decl += CppHeaderHandler.element_type_of_array_template.substitute({
+					self.class_decl.append(self.element_type_template.substitute({
 							"indent": CppFormat.indent(len(parent_names)),
 							"type": CppFormat.classname(name, parent_names)
-						})
+						}))
 			else:
 				if object_type_name == None:
 					classname = CppFormat.classname(name)
 				else:
 					classname = CppFormat.classname(object_type_name)
 
-				self.class_decl += CppHeaderHandler.field_of_object_template.substitute({
-						"indent": CppFormat.indent(len(parent_names)),
-						"type": classname,
-						"name": CppFormat.fieldname(name)
-					})
+				self.add_field(parent_names, classname, name, self.codeoptions.lazy)
 
 	def handle_array_start(self, parent_names, name, element_type_name = None):
 		if element_type_name != None:
@@ -378,29 +977,46 @@ ${indent}  ArrayType m_array;
 		if len(parent_names) > 0 and element_type_name != None:
 			return None
 
-		self.class_decl += CppHeaderHandler.class_begin_template.substitute({
+		self.class_decl.append(CppHeaderHandler.class_begin_template.substitute({
 				"indent": CppFormat.indent(len(parent_names)),
 				"classname" : CppFormat.classname(name),
 				"inherit_base_class": "",
 				"w": CppFormat.stringtype_w(self.stringtype),
+				"char": CppFormat.chartype(self.stringtype),
 				"method_decodejson_signature": CppFormat.method_decodejson_array_signature([], self.stringtype),
-				"method_encodejson_signature": CppFormat.method_encodejson_object_or_array_signature([], self.stringtype)
-			})
+				"decode_stream_methods": self.stream_methods(CppHeaderHandler.decode_stream_methods_of_class_template,
+					CppFormat.indent(len(parent_names)), CppFormat.classname(name), len(parent_names) == 0),
+				"decoder_methods": self.decoder_methods(CppFormat.indent(len(parent_names)), False),
+				"encode_stream_methods": self.stream_methods(CppHeaderHandler.encode_stream_methods_of_class_template,
+					CppFormat.indent(len(parent_names)), CppFormat.classname(name), len(parent_names) == 0),
+				"encoder_methods": self.encoder_methods(CppFormat.indent(len(parent_names)), False),
+				"method_encodejson_signature": CppFormat.method_encodejson_object_or_array_signature([], self.stringtype),
+				"clear_comment": CppHeaderHandler.clear_comments[self.codeoptions.layout]
+			}))
+
+		if len(parent_names) == 0 and self.codeoptions.parallel:
+			self.class_decl.append(CppHeaderHandler.parallel_methods_of_array_template.substitute({
+					"indent": CppFormat.indent(len(parent_names)),
+					"w": CppFormat.stringtype_w(self.stringtype),
+					"char": CppFormat.chartype(self.stringtype)
+				}))
 
 	def handle_array_end(self, parent_names, name, element_type_name = None):
 		if len(parent_names) == 0 or element_type_name == None:
 			if element_type_name != None:
-				self.class_decl += CppHeaderHandler.element_type_of_array_template.substitute({
+				self.class_decl.append(self.element_type_template.substitute({
 						"indent": CppFormat.indent(len(parent_names) + 1),
 						"type": CppFormat.classname(element_type_name)
-					})
+					}))
 
-			self.class_decl += CppHeaderHandler.array_type_of_array_template.substitute({
-					"indent": CppFormat.indent(len(parent_names))
-				})
-			self.class_decl += CppHeaderHandler.class_end_template.substitute({
+			self.class_decl.append(self.array_type_template.substitute({
+					"indent": CppFormat.indent(len(parent_names)),
+					"vectortype": CppFormat.vectortype("ArrayElementType", self.codeoptions.allocator),
+					"boolvectortype": CppFormat.vectortype("bool", self.codeoptions.allocator)
+				}))
+			self.class_decl.append(CppHeaderHandler.class_end_template.substitute({
 					"indent": CppFormat.indent(len(parent_names))
-				})
+				}))
 
 		if len(parent_names) > 0:
 			if element_type_name == None:
@@ -409,16 +1025,12 @@ ${indent}  ArrayType m_array;
 				classname = CppFormat.classname(element_type_name, parent_names)
 
 			if self.is_parent_array(name):
-				self.class_decl += CppHeaderHandler.element_type_of_array_template.substitute({
+				self.class_decl.append(self.element_type_template.substitute({
 						"indent": CppFormat.indent(len(parent_names)),
 						"type": classname
-					})
+					}))
 			else:
-				self.class_decl += CppHeaderHandler.field_of_object_template.substitute({
-						"indent": CppFormat.indent(len(parent_names)),
-						"type": classname,
-						"name": CppFormat.fieldname(name)
-					})
+				self.add_field(parent_names, classname, name, self.codeoptions.lazy)
 
 	def handle_boolean(self, parent_names, name):
 		self.handle_simple_type(parent_names, name, "bool")
@@ -433,25 +1045,21 @@ ${indent}  ArrayType m_array;
 		self.handle_simple_type(parent_names, name, "boost::int64_t")
 
 	def handle_string(self, parent_names, name):
-		self.handle_simple_type(parent_names, name, self.stringtype)
+		self.handle_simple_type(parent_names, name, CppFormat.fieldstringtype(self.stringtype, self.codeoptions.allocator))
 
 	def handle_simple_type(self, parent_names, name, cpptype):
 		if self.is_parent_array(name):
-			self.class_decl += CppHeaderHandler.element_type_of_array_template.substitute({
+			self.class_decl.append(self.element_type_template.substitute({
 					"indent": CppFormat.indent(len(parent_names)),
 					"type": cpptype
-				})
+				}))
 		else:
-			self.class_decl += CppHeaderHandler.field_of_object_template.substitute({
-					"indent": CppFormat.indent(len(parent_names)),
-					"type": cpptype,
-					"name": CppFormat.fieldname(name)
-				})
+			self.add_field(parent_names, cpptype, name)
 
 
 class CppBodyConstant:
 
-	file_begin_template = string.Template(
+	file_begin_template = CppTemplate(
 """
 /*
  * The MIT License (MIT)
@@ -479,6 +1087,7 @@ class CppBodyConstant:
 
 
 #include "${headerfilename}"
+#include "${detaildir}MappedFile.h"
 
 """
 	)
@@ -488,7 +1097,7 @@ class CppBodyConstant:
 
 	###############################
 	# decodejson
-	method_decodejson_istream_for_object_template = string.Template(
+	method_decodejson_istream_for_object_template = CppTemplate(
 """${method_signature}
 {
   json_spirit::${w}Value value;
@@ -498,7 +1107,54 @@ class CppBodyConstant:
 """
 	)
 
-	method_decodejson_object_begin_template = string.Template(
+	method_decodejson_range_for_value_template = CppTemplate(
+"""${method_signature}
+{
+  json_spirit::${w}Value value;
+  json_spirit::read(std::${w}string(begin, end), value);
+  DecodeJSON(value);
+}
+"""
+	)
+
+	method_decodejson_file_template = CppTemplate(
+"""${method_signature}
+{
+  detail::MappedFile file(path);
+  DecodeJSON(file.begin(), file.end());
+}
+"""
+	)
+
+	method_decodejson_wfile_template = CppTemplate(
+"""${method_signature}
+{
+  detail::MappedFile file(path);
+  // bytes are widened one by one as std::wifstream does in "C" locale
+  std::wstring text(file.begin(), file.end());
+  DecodeJSON(text.data(), text.data() + text.size());
+}
+"""
+	)
+
+	method_decodejson_stream_for_value_template = CppTemplate(
+"""${method_signature}
+{
+  std::${w}string line;
+  while (std::getline(is, line))
+  {
+    if (line.find_first_not_of(${L}" \\t\\r") == std::${w}string::npos) continue;
+    json_spirit::${w}Value value;
+    if (!json_spirit::read(line, value)) throw std::runtime_error("JSON decoding failed: invalid record");
+    Clear();
+    DecodeJSON(value);
+    callback(*this);
+  }
+}
+"""
+	)
+
+	method_decodejson_object_begin_template = CppTemplate(
 """${method_signature}
 {
   ${call_base_method}
@@ -512,81 +1168,53 @@ class CppBodyConstant:
 """
 	)
 
-	method_decodejson_object_do_bool_template = string.Template(
-"""    if (pair.name_ == ${L}"${jsonname}")
-    {
-      ${fieldname} = pair.value_.get_bool();
-    }
-    else
+	method_decodejson_object_do_bool_template = CppTemplate(
+"""${field_ref} = pair.value_.get_bool();
 """
 	)
 
-	method_decodejson_object_do_int_template = string.Template(
-"""    if (pair.name_ == ${L}"${jsonname}")
-    {
-      ${fieldname} = pair.value_.get_int();
-    }
-    else
+	method_decodejson_object_do_int_template = CppTemplate(
+"""${field_ref} = pair.value_.get_int();
 """
 	)
 
-	method_decodejson_object_do_int64_template = string.Template(
-"""    if (pair.name_ == ${L}"${jsonname}")
-    {
-      ${fieldname} = pair.value_.get_int64();
-    }
-    else
+	method_decodejson_object_do_int64_template = CppTemplate(
+"""${field_ref} = pair.value_.get_int64();
 """
 	)
 
-	method_decodejson_object_do_float_template = string.Template(
-"""    if (pair.name_ == ${L}"${jsonname}")
-    {
-      ${fieldname} = pair.value_.get_real();
-    }
-    else
+	method_decodejson_object_do_float_template = CppTemplate(
+"""${field_ref} = pair.value_.get_real();
 """
 	)
 
-	method_decodejson_object_do_string_template = string.Template(
-"""    if (pair.name_ == ${L}"${jsonname}")
-    {
-      ${fieldname} = pair.value_.get_str();
-    }
-    else
+	method_decodejson_object_do_string_template = CppTemplate(
+"""${field_ref} = pair.value_.get_str();
 """
 	)
 
-	method_decodejson_object_do_object_template = string.Template(
-"""    if (pair.name_ == ${L}"${jsonname}")
-    {
-      ${classname} value;
-      value.DecodeJSON(pair.value_);
-      ${fieldname} = value;
-    }
-    else
+	method_decodejson_object_do_arena_string_template = CppTemplate(
+"""${field_ref} = detail::ToArenaString(pair.value_.get_str());
 """
 	)
 
-	method_decodejson_object_do_array_template = string.Template(
-"""    if (pair.name_ == ${L}"${jsonname}")
-    {
-      ${classname} value;
-      value.DecodeJSON(pair.value_);
-      ${fieldname} = value;
-    }
-    else
+	method_decodejson_object_do_object_template = CppTemplate(
+"""${field_reset}
+(${field_value_ref}).DecodeJSON(pair.value_);
 """
 	)
 
-	method_decodejson_object_end = """    {
-      // do nothing
-    }
-  }
+	method_decodejson_object_do_array_template = CppTemplate(
+"""${field_reset}
+(${field_value_ref}).DecodeJSON(pair.value_);
+"""
+	)
+
+	method_decodejson_object_end = """  }
 }
 """
 
-	method_decodejson_istream_for_array_template = string.Template(
+	method_decodejson_istream_for_array_template = CppTemplate(
 """${method_signature}
 {
   json_spirit::${w}Value value;
@@ -596,26 +1224,47 @@ class CppBodyConstant:
 """
 	)
 
-	method_decodejson_array_begin_template = string.Template(
+	method_decodejson_array_begin_template = CppTemplate(
 """${method_signature}
 {
   const json_spirit::${w}Array & array(val.get_array());
+  m_array.reserve(m_array.size() + array.size());
   for (json_spirit::${w}Array::const_iterator it = array.begin();
        array.end() != it; ++it)
   {
     const json_spirit::${w}Value & value(*it);
-    ArrayElementType element;
+    m_array.push_back(ArrayElementType());
+    ArrayElementType & element(m_array.back());
     if (!value.is_null())
     {
 """
 	)
 
 	method_decodejson_array_end = """    }
-    m_array.push_back(element);
   }
 }
 """
 
+	method_decodejson_compact_array_begin_template = CppTemplate(
+"""${method_signature}
+{
+  const json_spirit::${w}Array & array(val.get_array());
+  m_array.reserve(m_array.size() + array.size());
+  for (json_spirit::${w}Array::const_iterator it = array.begin();
+       array.end() != it; ++it)
+  {
+    const json_spirit::${w}Value & value(*it);
+    if (value.is_null())
+    {
+      push_back_null();
+    }
+    else
+    {
+      push_back(ArrayElementType());
+      ArrayType::reference element(m_array.back());
+"""
+	)
+
 	method_decodejson_array_do_bool = """      element = value.get_bool();
 """
 
@@ -631,20 +1280,203 @@ class CppBodyConstant:
 	method_decodejson_array_do_string = """      element = value.get_str();
 """
 
-	method_decodejson_array_do_object_or_array_template = string.Template(
-"""      ${classname} e;
-      e.DecodeJSON(value);
-      element = e;
+	method_decodejson_array_do_arena_string = """      element = detail::ToArenaString(value.get_str());
+"""
+
+	method_decodejson_array_do_object_or_array_template = CppTemplate(
+"""      element = ${classname}();
+      (*element).DecodeJSON(value);
+"""
+	)
+
+	method_decodejson_compact_array_do_object_or_array_template = CppTemplate(
+"""      element.DecodeJSON(value);
 """
 	)
 
 	###############################
-	# encodejson
-	method_encodejson_ostream_for_object_or_array_template = string.Template(
+	# decodejson with detail::JSONReader
+	method_decodejson_istream_for_reader_template = CppTemplate(
 """${method_signature}
 {
-  json_spirit::${w}Value value;
-  EncodeJSON(value);
+  detail::${w}JSONReader reader(is);
+  DecodeJSON(reader);
+}
+"""
+	)
+
+	method_decodejson_range_for_reader_template = CppTemplate(
+"""${method_signature}
+{
+  detail::${w}JSONReader reader(begin, end);
+  DecodeJSON(reader);
+}
+"""
+	)
+
+	method_decodejson_stream_for_reader_template = CppTemplate(
+"""${method_signature}
+{
+  detail::${w}JSONReader reader(is);
+  while (!reader.AtEnd())
+  {
+    Clear();
+    DecodeJSON(reader);
+    callback(*this);
+  }
+}
+"""
+	)
+
+	method_decodejson_reader_for_object_template = CppTemplate(
+"""${method_signature}
+{
+  ${stringtype} name;
+  reader.BeginObject();
+  for (bool first = true; reader.NextMember(first, name); first = false)
+  {
+    if (reader.IsNull()) continue;
+    if (!DecodeJSONMember(name, reader)) reader.Skip();
+  }
+}
+"""
+	)
+
+	method_decodejson_member_begin_template = CppTemplate(
+"""${method_signature}
+{
+"""
+	)
+
+	method_decodejson_member_end_template = CppTemplate(
+"""  return ${fallback};
+}
+"""
+	)
+
+	method_decodejson_member_do_bool_template = CppTemplate(
+"""${field_ref} = reader.ReadBool();
+return true;
+"""
+	)
+
+	method_decodejson_member_do_int_template = CppTemplate(
+"""${field_ref} = reader.ReadInt();
+return true;
+"""
+	)
+
+	method_decodejson_member_do_int64_template = CppTemplate(
+"""${field_ref} = reader.ReadInt64();
+return true;
+"""
+	)
+
+	method_decodejson_member_do_float_template = CppTemplate(
+"""${field_ref} = reader.ReadReal();
+return true;
+"""
+	)
+
+	method_decodejson_member_do_string_template = CppTemplate(
+"""${field_ref} = reader.ReadString();
+return true;
+"""
+	)
+
+	method_decodejson_member_do_string_in_place_template = CppTemplate(
+"""reader.ReadString(${field_ref});
+return true;
+"""
+	)
+
+	method_decodejson_member_do_arena_string_template = CppTemplate(
+"""${field_ref} = reader.ReadStringAs<detail::${w}ArenaString>();
+return true;
+"""
+	)
+
+	method_decodejson_member_do_object_or_array_template = CppTemplate(
+"""${field_reset}
+(${field_value_ref}).DecodeJSON(reader);
+return true;
+"""
+	)
+
+	method_decodejson_member_do_lazy_template = CppTemplate(
+"""reader.ReadRaw(${field_raw_ref});
+return true;
+"""
+	)
+
+	method_decodejson_reader_array_begin_template = CppTemplate(
+"""${method_signature}
+{
+  reader.BeginArray();
+  for (bool first = true; reader.NextElement(first); first = false)
+  {
+    m_array.push_back(ArrayElementType());
+    ArrayElementType & element(m_array.back());
+    if (!reader.IsNull())
+    {
+"""
+	)
+
+	method_decodejson_reader_compact_array_begin_template = CppTemplate(
+"""${method_signature}
+{
+  reader.BeginArray();
+  for (bool first = true; reader.NextElement(first); first = false)
+  {
+    if (reader.IsNull())
+    {
+      push_back_null();
+    }
+    else
+    {
+      push_back(ArrayElementType());
+      ArrayType::reference element(m_array.back());
+"""
+	)
+
+	method_decodejson_reader_array_do_bool = """      element = reader.ReadBool();
+"""
+
+	method_decodejson_reader_array_do_int = """      element = reader.ReadInt();
+"""
+
+	method_decodejson_reader_array_do_int64 = """      element = reader.ReadInt64();
+"""
+
+	method_decodejson_reader_array_do_float = """      element = reader.ReadReal();
+"""
+
+	method_decodejson_reader_array_do_string = """      element = reader.ReadString();
+"""
+
+	method_decodejson_reader_array_do_arena_string_template = CppTemplate(
+"""      element = reader.ReadStringAs<detail::${w}ArenaString>();
+"""
+	)
+
+	method_decodejson_reader_array_do_object_or_array_template = CppTemplate(
+"""      element = ${classname}();
+      (*element).DecodeJSON(reader);
+"""
+	)
+
+	method_decodejson_reader_compact_array_do_object_or_array_template = CppTemplate(
+"""      element.DecodeJSON(reader);
+"""
+	)
+
+	###############################
+	# encodejson
+	method_encodejson_ostream_for_object_or_array_template = CppTemplate(
+"""${method_signature}
+{
+  json_spirit::${w}Value value;
+  EncodeJSON(value);
   unsigned int options = json_spirit::remove_trailing_zeros;
   if (isPrettyPrint)
   {
@@ -655,7 +1487,16 @@ class CppBodyConstant:
 """
 	)
 
-	method_encodejson_object_begin_template = string.Template(
+	method_encodejson_stream_template = CppTemplate(
+"""${method_signature}
+{
+  EncodeJSON(os);
+  os.put(os.widen('\\n'));
+}
+"""
+	)
+
+	method_encodejson_object_begin_template = CppTemplate(
 """${method_signature}
 {
   ${call_base_method}
@@ -671,26 +1512,39 @@ class CppBodyConstant:
 }
 """
 
-	method_encodejson_object_do_simple_type_template = string.Template(
-"""  if (${fieldname}) { val.get_obj().push_back(json_spirit::${w}Pair(${L}"${jsonname}", *${fieldname})); }
+	method_encodejson_object_do_simple_type_template = CppTemplate(
+"""  if (${field_test}) { val.get_obj().push_back(json_spirit::${w}Pair(${L}"${jsonname}", ${field_value})); }
+"""
+	)
+
+	method_encodejson_object_do_object_or_array_template = CppTemplate(
+"""  if (${field_test})
+  {
+    val.get_obj().push_back(json_spirit::${w}Pair(${L}"${jsonname}", json_spirit::${w}Value()));
+    (${field_value}).EncodeJSON(val.get_obj().back().value_);
+  }
 """
 	)
 
-	method_encodejson_object_do_object_or_array_template = string.Template(
-"""  if (${fieldname})
+	method_encodejson_object_do_lazy_template = CppTemplate(
+"""  if (${field_test})
   {
-    json_spirit::${w}Value child;
-    (*${fieldname}).EncodeJSON(child);
-    val.get_obj().push_back(json_spirit::${w}Pair(${L}"${jsonname}", child));
+    val.get_obj().push_back(json_spirit::${w}Pair(${L}"${jsonname}", json_spirit::${w}Value()));
+    if (!${field_raw_test}) { (${field_value}).EncodeJSON(val.get_obj().back().value_); }
+    else if (!json_spirit::read(${field_raw_value}, val.get_obj().back().value_))
+    {
+      throw std::runtime_error("JSON encoding failed: invalid text of lazy field");
+    }
   }
 """
 	)
 
-	method_encodejson_array_begin_template = string.Template(
+	method_encodejson_array_begin_template = CppTemplate(
 """${method_signature}
 {
   val = json_spirit::${w}Array();
   json_spirit::${w}Array & array(val.get_array());
+  array.reserve(m_array.size());
   for (ArrayType::const_iterator it = m_array.begin();
        m_array.end() != it; ++it)
   {
@@ -698,31 +1552,247 @@ class CppBodyConstant:
 """
 	)
 
+	method_encodejson_compact_array_begin_template = CppTemplate(
+"""${method_signature}
+{
+  val = json_spirit::${w}Array();
+  json_spirit::${w}Array & array(val.get_array());
+  array.reserve(m_array.size());
+  for (ArrayType::size_type i = 0; i < m_array.size(); ++i)
+  {
+    const ArrayElementType & value(m_array[i]);
+"""
+	)
+
 	method_encodejson_array_end = """  }
 }
 """
 
-	method_encodejson_array_do_simple_type_template = string.Template(
+	method_encodejson_range_begin_template = CppTemplate(
+"""${method_signature}
+{
+  json_spirit::${w}Value val = json_spirit::${w}Array();
+  json_spirit::${w}Array & array(val.get_array());
+  array.reserve(last - first);
+  for (std::size_t i = first; i < last; ++i)
+  {
+    const ArrayElementType & value(m_array[i]);
+"""
+	)
+
+	method_encodejson_range_end = """  }
+  text = json_spirit::write(val, json_spirit::remove_trailing_zeros);
+}
+"""
+
+	method_encodejson_array_do_simple_type_template = CppTemplate(
 """
-    if (value) { array.push_back(json_spirit::${w}Value(*value)); }
+    if (value) { array.push_back(json_spirit::${w}Value(${value})); }
     else { array.push_back(json_spirit::${w}Value()); }
 """
 	)
 
-	method_encodejson_array_do_object_or_array_template = string.Template(
-"""    if (value)
+	method_encodejson_array_do_object_or_array_template = CppTemplate(
+"""    array.push_back(json_spirit::${w}Value());
+    if (value) { (*value).EncodeJSON(array.back()); }
+
+"""
+	)
+
+	method_encodejson_compact_array_do_simple_type_template = CppTemplate(
+"""    if (is_null(i)) { array.push_back(json_spirit::${w}Value()); }
+    else { array.push_back(json_spirit::${w}Value(${value})); }
+"""
+	)
+
+	method_encodejson_compact_array_do_object_or_array_template = CppTemplate(
+"""    array.push_back(json_spirit::${w}Value());
+    if (!is_null(i)) { value.EncodeJSON(array.back()); }
+"""
+	)
+
+	###############################
+	# encodejson with detail::JSONWriter
+	method_encodejson_ostream_for_writer_template = CppTemplate(
+"""${method_signature}
+{
+  detail::${w}JSONWriter writer(os, isPrettyPrint);
+  EncodeJSON(writer);
+}
+"""
+	)
+
+	method_encodejson_writer_for_object_template = CppTemplate(
+"""${method_signature}
+{
+  writer.BeginObject();
+  EncodeJSONMembers(writer);
+  writer.EndObject();
+}
+"""
+	)
+
+	method_encodejson_members_begin_template = CppTemplate(
+"""${method_signature}
+{
+${call_base_method}"""
+	)
+
+	method_encodejson_members_end = """}
+"""
+
+	method_encodejson_members_do_simple_type_template = CppTemplate(
+"""  if (${field_test}) { writer.Key(${L}"${jsonkey}"); writer.Value(${field_value}); }
+"""
+	)
+
+	method_encodejson_members_do_object_or_array_template = CppTemplate(
+"""  if (${field_test}) { writer.Key(${L}"${jsonkey}"); (${field_value}).EncodeJSON(writer); }
+"""
+	)
+
+	method_encodejson_members_do_lazy_template = CppTemplate(
+"""  if (${field_test})
+  {
+    writer.Key(${L}"${jsonkey}");
+    if (${field_raw_test}) { writer.Raw(${field_raw_value}); }
+    else { (${field_value}).EncodeJSON(writer); }
+  }
+"""
+	)
+
+	method_encodejson_writer_array_begin_template = CppTemplate(
+"""${method_signature}
+{
+  writer.BeginArray();
+  for (ArrayType::const_iterator it = m_array.begin();
+       m_array.end() != it; ++it)
+  {
+    const ArrayElementType & value(*it);
+"""
+	)
+
+	method_encodejson_writer_array_end = """  }
+  writer.EndArray();
+}
+"""
+
+	method_encodejson_writer_range_begin_template = CppTemplate(
+"""${method_signature}
+{
+  detail::${w}JSONWriter writer(text);
+  writer.BeginArray();
+  for (std::size_t i = first; i < last; ++i)
+  {
+    const ArrayElementType & value(m_array[i]);
+"""
+	)
+
+	method_encodejson_writer_array_do_simple_type = """    if (value) { writer.Value(*value); }
+    else { writer.Null(); }
+"""
+
+	method_encodejson_writer_array_do_object_or_array = """    if (value) { (*value).EncodeJSON(writer); }
+    else { writer.Null(); }
+"""
+
+	method_encodejson_writer_compact_array_begin_template = CppTemplate(
+"""${method_signature}
+{
+  writer.BeginArray();
+  for (ArrayType::size_type i = 0; i < m_array.size(); ++i)
+  {
+    const ArrayElementType & value(m_array[i]);
+"""
+	)
+
+	method_encodejson_writer_compact_array_do_simple_type = """    if (is_null(i)) { writer.Null(); }
+    else { writer.Value(value); }
+"""
+
+	method_encodejson_writer_compact_array_do_object_or_array = """    if (is_null(i)) { writer.Null(); }
+    else { value.EncodeJSON(writer); }
+"""
+
+	###############################
+	# parallel
+	method_decodejson_parallel_template = CppTemplate(
+"""${method_signature}
+{
+  std::vector<boost::shared_ptr<${classname}> > parts;
+  detail::DecodeArrayParts(begin, end, detail::ThreadCount(threads), parts);
+  std::size_t size = 0;
+  for (std::size_t i = 0; i < parts.size(); ++i)
+  {
+    size += parts[i]->m_array.size();
+  }
+
+  Clear();
+  m_array.resize(size);
+  std::size_t offset = 0;
+  for (std::size_t i = 0; i < parts.size(); ++i)
+  {
+    ${classname} & part(*parts[i]);
+    for (ArrayType::size_type j = 0; j < part.m_array.size(); ++j, ++offset)
     {
-      json_spirit::${w}Value child;
-      (*value).EncodeJSON(child);
-      array.push_back(child);
-    }
-    else { array.push_back(json_spirit::${w}Value()); }
+${merge_element}    }
+  }
+}
+"""
+	)
+
+	method_decodejson_parallel_do_simple_type = """      m_array[offset] = part.m_array[j];
+"""
+
+	method_decodejson_parallel_do_object_or_array = """      using std::swap;
+      swap(m_array[offset], part.m_array[j]);
+"""
 
+	method_decodejson_parallel_do_null = """      if (part.is_null(j)) { m_null.resize(size, false); m_null[offset] = true; }
 """
+
+	method_decodejson_file_parallel_template = CppTemplate(
+"""${method_signature}
+{
+  detail::MappedFile file(path);
+  DecodeJSONParallel(file.begin(), file.end(), threads);
+}
+"""
+	)
+
+	method_decodejson_wfile_parallel_template = CppTemplate(
+"""${method_signature}
+{
+  detail::MappedFile file(path);
+  std::wstring text(file.begin(), file.end());
+  DecodeJSONParallel(text.data(), text.data() + text.size(), threads);
+}
+"""
+	)
+
+	method_encodejson_parallel_template = CppTemplate(
+"""${method_signature}
+{
+  detail::EncodeArrayParts(*this, os, detail::ThreadCount(threads));
+}
+"""
+	)
+
+	###############################
+	# clear
+	method_clear_begin_template = CppTemplate(
+"""${method_signature}
+{
+${call_base_method}"""
 	)
 
+	method_clear_end = """}
+"""
+
 class CppBodyFileHandler(JSONBaseHandler):
 	def __init__(self):
+		# directory of "detail/" headers relative to this file
+		self.detaildir = "detail/"
 		self.filename = ""
 		self.file_begin = ""
 		self.file_end = CppBodyConstant.file_end
@@ -731,24 +1801,151 @@ class CppBodyFileHandler(JSONBaseHandler):
 		if len(parent_names) == 0:
 			self.filename = CppFormat.bodyfilename(name)
 			self.file_begin = CppBodyConstant.file_begin_template.substitute({
-					"headerfilename": CppFormat.headerfilename(name)
+					"headerfilename": CppFormat.headerfilename(name),
+					"detaildir": self.detaildir
 				})
 
 	def handle_array_start(self, parent_names, name, element_type_name = None):
 		if len(parent_names) == 0:
 			self.filename = CppFormat.bodyfilename(name)
 			self.file_begin = CppBodyConstant.file_begin_template.substitute({
-					"headerfilename": CppFormat.headerfilename(name)
+					"headerfilename": CppFormat.headerfilename(name),
+					"detaildir": self.detaildir
 				})
 
+class CppDecodeDispatch:
+	# Decoding an object matches every key against the fields. Keys are dispatched
+	# by switch on length, then on the character telling fields apart, so that
+	# one full string comparison confirms the field instead of one per field.
+
+	def is_ascii(jsonname):
+		return len([c for c in jsonname if ord(c) >= 0x80]) == 0
+
+	def char_literal(c):
+		if c == "'" or c == "\\":
+			return "'\\" + c + "'"
+		if 0x20 <= ord(c) < 0x7f:
+			return "'" + c + "'"
+		return str(ord(c))
+
+	def indent_body(body, indent):
+		return "".join([indent + line + "\n" for line in body.splitlines()])
+
+	def render_field(jsonname, body, indent, L, lines):
+		lines.append(indent + "if (name == " + L + "\"" + jsonname + "\")\n")
+		lines.append(indent + "{\n")
+		lines.append(CppDecodeDispatch.indent_body(body, indent + "  "))
+		lines.append(indent + "}\n")
+
+	def render_group(fields, indent, L, lines):
+		# fields of same key length
+		if len(fields) == 1:
+			jsonname, body = fields[0]
+			CppDecodeDispatch.render_field(jsonname, body, indent, L, lines)
+			return None
+
+		# the character position splitting fields into most groups, first one on tie
+		length = len(fields[0][0])
+		best_pos = 0
+		best_count = 0
+		for pos in xrange(length):
+			count = len(set([jsonname[pos] for jsonname, body in fields]))
+			if count > best_count:
+				best_pos = pos
+				best_count = count
+
+		groups = {}
+		for jsonname, body in fields:
+			groups.setdefault(jsonname[best_pos], []).append((jsonname, body))
+
+		lines.append(indent + "switch (name[" + str(best_pos) + "])\n")
+		lines.append(indent + "{\n")
+		for c in sorted(groups.keys()):
+			lines.append(indent + "case " + CppDecodeDispatch.char_literal(c) + ":\n")
+			CppDecodeDispatch.render_group(groups[c], indent + "  ", L, lines)
+			lines.append(indent + "  break;\n")
+		lines.append(indent + "}\n")
+
+	def render_chain(fields, L, name_expr, indent):
+		# keys out of ASCII are compared one by one
+		lines = []
+		for jsonname, body in fields:
+			lines.append(indent + "if (" + name_expr + " == " + L + "\"" + jsonname + "\")\n")
+			lines.append(indent + "{\n")
+			lines.append(CppDecodeDispatch.indent_body(body, indent + "  "))
+			lines.append(indent + "}\n")
+			lines.append(indent + "else\n")
+		lines.append(indent + "{\n" + indent + "  // do nothing\n" + indent + "}\n")
+		return "".join(lines)
+
+	def render(fields, stringtype, name_expr = "pair.name_", indent = "    "):
+		# fields is [(JSON name, decoding statements)] in declaration order,
+		# name_expr is the C++ expression of the key
+		L = CppFormat.stringtype_L(stringtype)
+
+		# only first field of a duplicated name is ever matched
+		unique_fields = []
+		jsonnames = set()
+		for jsonname, body in fields:
+			if jsonname not in jsonnames:
+				jsonnames.add(jsonname)
+				unique_fields.append((jsonname, body))
+
+		if len(unique_fields) == 0:
+			return ""
+
+		if len([jsonname for jsonname, body in unique_fields if not CppDecodeDispatch.is_ascii(jsonname)]) > 0:
+			return CppDecodeDispatch.render_chain(unique_fields, L, name_expr, indent)
+
+		groups = {}
+		for jsonname, body in unique_fields:
+			groups.setdefault(len(jsonname), []).append((jsonname, body))
+
+		lines = []
+		if name_expr != "name":
+			lines.append(indent + "const " + stringtype + " & name(" + name_expr + ");\n")
+		lines.extend([indent + "switch (name.size())\n", indent + "{\n"])
+		for length in sorted(groups.keys()):
+			lines.append(indent + "case " + str(length) + ":\n")
+			CppDecodeDispatch.render_group(groups[length], indent + "  ", L, lines)
+			lines.append(indent + "  break;\n")
+		lines.append(indent + "default:\n" + indent + "  break;\n" + indent + "}\n")
+		return "".join(lines)
+
+	is_ascii = staticmethod(is_ascii)
+	char_literal = staticmethod(char_literal)
+	indent_body = staticmethod(indent_body)
+	render_field = staticmethod(render_field)
+	render_group = staticmethod(render_group)
+	render_chain = staticmethod(render_chain)
+	render = staticmethod(render)
+
 class CppMethodBaseHandler(JSONBaseHandler):
-	def __init__(self, stringtype):
+	def __init__(self, stringtype, codeoptions = None):
+		if codeoptions == None:
+			codeoptions = CppCodeOptions()
 		self.filename = ""
 		self.stringtype = stringtype
+		self.codeoptions = codeoptions
 		self.methods = {}
+		# array method => method doing the same for a range of elements, of --parallel
+		self.range_methods = {}
+
+	def append_element_code(self, method, code):
+		self.methods[method].append(code)
+		if self.range_methods.has_key(method):
+			self.methods[self.range_methods[method]].append(code)
+
+	def chunks(self):
+		ret = []
+		for method in sorted(self.methods.keys()):
+			if len(ret) > 0:
+				ret.append("\n")
+			ret.extend(self.methods[method])
+		return ret
 
 	def content(self):
-		return "\n".join([self.methods.get(method) for method in sorted(self.methods.keys())])
+		return "".join(self.chunks())
 
 	def handle_object_start(self, parent_names, name, object_type_name = None, base_type_name = None):
 		if len(parent_names) == 0:
@@ -759,8 +1956,49 @@ class CppMethodBaseHandler(JSONBaseHandler):
 			self.filename = CppFormat.bodyfilename(name)
 
 class CppMethodDecodeHandler(CppMethodBaseHandler):
-	def __init__(self, stringtype):
-		CppMethodBaseHandler.__init__(self, stringtype)
+	def __init__(self, stringtype, decode_istream = True, codeoptions = None):
+		CppMethodBaseHandler.__init__(self, stringtype, codeoptions)
+		# False when DecodeJSON(std::istream &) is generated by another decoder
+		self.decode_istream = decode_istream
+		# object decoding method => [(JSON name, decoding statements)], rendered at object end
+		self.object_fields = {}
+		if self.codeoptions.arraylayout == "compact":
+			self.array_begin_template = CppBodyConstant.method_decodejson_compact_array_begin_template
+			self.array_do_object_or_array_template = CppBodyConstant.method_decodejson_compact_array_do_object_or_array_template
+		else:
+			self.array_begin_template = CppBodyConstant.method_decodejson_array_begin_template
+			self.array_do_object_or_array_template = CppBodyConstant.method_decodejson_array_do_object_or_array_template
+
+	def add_input_methods(self, names, istream_template):
+		# DecodeJSON() from std::istream and memory, DecodeJSONFile()
+		if self.decode_istream:
+			method_decodejson_istream = CppFormat.method_decodejson_istream_signature(names, self.stringtype)
+			self.methods[method_decodejson_istream] = [istream_template.substitute({
+					"method_signature": method_decodejson_istream,
+					"w": CppFormat.stringtype_w(self.stringtype)
+				})]
+
+			method_decodejson_range = CppFormat.method_decodejson_range_signature(names, self.stringtype)
+			self.methods[method_decodejson_range] = [CppBodyConstant.method_decodejson_range_for_value_template.substitute({
+					"method_signature": method_decodejson_range,
+					"w": CppFormat.stringtype_w(self.stringtype)
+				})]
+
+		if self.decode_istream and len(names) == 1:
+			method_decodejson_stream = CppFormat.method_decodejson_stream_signature(names, self.stringtype)
+			self.methods[method_decodejson_stream] = [CppBodyConstant.method_decodejson_stream_for_value_template.substitute({
+					"method_signature": method_decodejson_stream,
+					"w": CppFormat.stringtype_w(self.stringtype),
+					"L": CppFormat.stringtype_L(self.stringtype)
+				})]
+
+		file_template = CppBodyConstant.method_decodejson_file_template
+		if CppFormat.stringtype_w(self.stringtype) != "":
+			file_template = CppBodyConstant.method_decodejson_wfile_template
+		method_decodejson_file = CppFormat.method_decodejson_file_signature(names, self.stringtype)
+		self.methods[method_decodejson_file] = [file_template.substitute({
+				"method_signature": method_decodejson_file
+			})]
 
 	def handle_object_start(self, parent_names, name, object_type_name = None, base_type_name = None):
 		CppMethodBaseHandler.handle_object_start(self, parent_names, name, object_type_name)
@@ -774,7 +2012,7 @@ class CppMethodDecodeHandler(CppMethodBaseHandler):
 					classname = CppFormat.classname(object_type_name)
 
 				parent_method_decodejson_array = CppFormat.method_decodejson_array_signature(parent_names, self.stringtype)
-				self.methods[parent_method_decodejson_array] += CppBodyConstant.method_decodejson_array_do_object_or_array_template.substitute({"classname": classname})
+				self.methods[parent_method_decodejson_array].append(self.array_do_object_or_array_template.substitute({"classname": classname}))
 			else:
 				if object_type_name == None:
 					classname = CppFormat.classname(name)
@@ -782,12 +2020,10 @@ class CppMethodDecodeHandler(CppMethodBaseHandler):
 					classname = CppFormat.classname(object_type_name)
 
 				parent_method_decodejson_object = CppFormat.method_decodejson_object_signature(parent_names, self.stringtype)
-				self.methods[parent_method_decodejson_object] += CppBodyConstant.method_decodejson_object_do_object_template.substitute({
-						"jsonname": name,
-						"fieldname": CppFormat.fieldname(name),
-						"classname": classname,
-						"L": CppFormat.stringtype_L(self.stringtype)
-					})
+				self.object_fields[parent_method_decodejson_object].append((name, CppBodyConstant.method_decodejson_object_do_object_template.substitute({
+						"field_reset": CppFormat.field_reset(name, self.codeoptions.layout, classname, self.codeoptions.lazy),
+						"field_value_ref": CppFormat.field_value_ref(name, self.codeoptions.layout)
+					})))
 
 		if not gen_class:
 			return None
@@ -795,22 +2031,19 @@ class CppMethodDecodeHandler(CppMethodBaseHandler):
 		names = parent_names[:]
 		names.append(name)
 
-		method_decodejson_istream = CppFormat.method_decodejson_istream_signature(names, self.stringtype)
-		self.methods[method_decodejson_istream] = CppBodyConstant.method_decodejson_istream_for_object_template.substitute({
-				"method_signature": method_decodejson_istream,
-				"w": CppFormat.stringtype_w(self.stringtype)
-			})
+		self.add_input_methods(names, CppBodyConstant.method_decodejson_istream_for_object_template)
 
 		call_base_method = ""
 		if base_type_name != None:
 			call_base_method = CppFormat.classname(base_type_name) + "::DecodeJSON(val);"
 
 		method_decodejson_object = CppFormat.method_decodejson_object_signature(names, self.stringtype)
-		self.methods[method_decodejson_object] = CppBodyConstant.method_decodejson_object_begin_template.substitute({
+		self.methods[method_decodejson_object] = [CppBodyConstant.method_decodejson_object_begin_template.substitute({
 				"call_base_method": call_base_method,
 				"method_signature": method_decodejson_object,
 				"w": CppFormat.stringtype_w(self.stringtype)
-			})
+			})]
+		self.object_fields[method_decodejson_object] = []
 
 	def handle_object_end(self, parent_names, name, object_type_name = None):
 		gen_class = (object_type_name == None) or ( len(parent_names) == 0 )
@@ -820,7 +2053,8 @@ class CppMethodDecodeHandler(CppMethodBaseHandler):
 		names = parent_names[:]
 		names.append(name)
 		method_decodejson_object = CppFormat.method_decodejson_object_signature(names, self.stringtype)
-		self.methods[method_decodejson_object] += CppBodyConstant.method_decodejson_object_end
+		self.methods[method_decodejson_object].append(CppDecodeDispatch.render(self.object_fields.pop(method_decodejson_object), self.stringtype))
+		self.methods[method_decodejson_object].append(CppBodyConstant.method_decodejson_object_end)
 
 	def handle_array_start(self, parent_names, name, element_type_name = None):
 		CppMethodBaseHandler.handle_array_start(self, parent_names, name, element_type_name)
@@ -833,7 +2067,7 @@ class CppMethodDecodeHandler(CppMethodBaseHandler):
 					classname = CppFormat.classname(element_type_name)
 
 				parent_method_decodejson_array = CppFormat.method_decodejson_array_signature(parent_names, self.stringtype)
-				self.methods[parent_method_decodejson_array] += CppBodyConstant.method_decodejson_array_do_object_or_array_template.substitute({"classname": classname})
+				self.methods[parent_method_decodejson_array].append(self.array_do_object_or_array_template.substitute({"classname": classname}))
 			else:
 				if element_type_name == None:
 					classname = CppFormat.classname(name)
@@ -841,12 +2075,10 @@ class CppMethodDecodeHandler(CppMethodBaseHandler):
 					classname = CppFormat.classname(element_type_name)
 
 				parent_method_decodejson_object = CppFormat.method_decodejson_object_signature(parent_names, self.stringtype)
-				self.methods[parent_method_decodejson_object] += CppBodyConstant.method_decodejson_object_do_array_template.substitute({
-						"jsonname": name,
-						"fieldname": CppFormat.fieldname(name),
-						"classname": classname,
-						"L": CppFormat.stringtype_L(self.stringtype)
-					})
+				self.object_fields[parent_method_decodejson_object].append((name, CppBodyConstant.method_decodejson_object_do_array_template.substitute({
+						"field_reset": CppFormat.field_reset(name, self.codeoptions.layout, classname, self.codeoptions.lazy),
+						"field_value_ref": CppFormat.field_value_ref(name, self.codeoptions.layout)
+					})))
 
 		if len(parent_names) > 0 and element_type_name != None:
 			return None
@@ -854,17 +2086,13 @@ class CppMethodDecodeHandler(CppMethodBaseHandler):
 		names = parent_names[:]
 		names.append(name)
 
-		method_decodejson_istream = CppFormat.method_decodejson_istream_signature(names, self.stringtype)
-		self.methods[method_decodejson_istream] = CppBodyConstant.method_decodejson_istream_for_array_template.substitute({
-				"method_signature": method_decodejson_istream,
-				"w": CppFormat.stringtype_w(self.stringtype)
-			})
+		self.add_input_methods(names, CppBodyConstant.method_decodejson_istream_for_array_template)
 
 		method_decodejson_array = CppFormat.method_decodejson_array_signature(names, self.stringtype)
-		self.methods[method_decodejson_array] = CppBodyConstant.method_decodejson_array_begin_template.substitute({
+		self.methods[method_decodejson_array] = [self.array_begin_template.substitute({
 				"method_signature": method_decodejson_array,
 				"w": CppFormat.stringtype_w(self.stringtype)
-			})
+			})]
 
 	def handle_array_end(self, parent_names, name, element_type_name = None):
 		if len(parent_names) > 0 and element_type_name != None:
@@ -873,19 +2101,17 @@ class CppMethodDecodeHandler(CppMethodBaseHandler):
 		names = parent_names[:]
 		names.append(name)
 		method_decodejson_array = CppFormat.method_decodejson_array_signature(names, self.stringtype)
-		self.methods[method_decodejson_array] += CppBodyConstant.method_decodejson_array_end
+		self.methods[method_decodejson_array].append(CppBodyConstant.method_decodejson_array_end)
 
 	def handle_simple_type_for_decodejson(self, parent_names, name, array_string, object_template):
 		if self.is_parent_array(name):
 			parent_method_decodejson_array = CppFormat.method_decodejson_array_signature(parent_names, self.stringtype)
-			self.methods[parent_method_decodejson_array] += array_string
+			self.methods[parent_method_decodejson_array].append(array_string)
 		else:
 			parent_method_decodejson_object = CppFormat.method_decodejson_object_signature(parent_names, self.stringtype)
-			self.methods[parent_method_decodejson_object] += object_template.substitute({
-					"jsonname": name,
-					"fieldname": CppFormat.fieldname(name),
-					"L": CppFormat.stringtype_L(self.stringtype)
-				})
+			self.object_fields[parent_method_decodejson_object].append((name, object_template.substitute({
+					"field_ref": CppFormat.field_ref(name, self.codeoptions.layout)
+				})))
 
 	def handle_boolean(self, parent_names, name):
 		self.handle_simple_type_for_decodejson(parent_names, name,
@@ -912,14 +2138,261 @@ class CppMethodDecodeHandler(CppMethodBaseHandler):
 			)
 
 	def handle_string(self, parent_names, name):
+		if self.codeoptions.allocator == "arena":
+			self.handle_simple_type_for_decodejson(parent_names, name,
+					CppBodyConstant.method_decodejson_array_do_arena_string,
+					CppBodyConstant.method_decodejson_object_do_arena_string_template
+				)
+			return None
+
 		self.handle_simple_type_for_decodejson(parent_names, name,
 				CppBodyConstant.method_decodejson_array_do_string,
 				CppBodyConstant.method_decodejson_object_do_string_template
 			)
 
+class CppMethodStreamDecodeHandler(CppMethodBaseHandler):
+	# DecodeJSON(detail::JSONReader &) decodes while parsing. Object members are
+	# decoded by DecodeJSONMember(), which passes members it does not know to the
+	# base class, so that derived classes decode base members in the same pass.
+	def __init__(self, stringtype, codeoptions = None):
+		CppMethodBaseHandler.__init__(self, stringtype, codeoptions)
+		# member decoding method => [(JSON name, decoding statements)], rendered at object end
+		self.object_fields = {}
+		# member decoding method => returned value for unknown members
+		self.object_fallbacks = {}
+		if self.codeoptions.arraylayout == "compact":
+			self.array_begin_template = CppBodyConstant.method_decodejson_reader_compact_array_begin_template
+			self.array_do_object_or_array_template = CppBodyConstant.method_decodejson_reader_compact_array_do_object_or_array_template
+		else:
+			self.array_begin_template = CppBodyConstant.method_decodejson_reader_array_begin_template
+			self.array_do_object_or_array_template = CppBodyConstant.method_decodejson_reader_array_do_object_or_array_template
+
+	def member_do_object_or_array(self, name, classname):
+		# with --lazy, the field keeps JSON text to decode on first access
+		if self.codeoptions.lazy:
+			return CppBodyConstant.method_decodejson_member_do_lazy_template.substitute({
+					"field_raw_ref": CppFormat.field_raw_ref(name)
+				})
+		return CppBodyConstant.method_decodejson_member_do_object_or_array_template.substitute({
+				"field_reset": CppFormat.field_reset(name, self.codeoptions.layout, classname),
+				"field_value_ref": CppFormat.field_value_ref(name, self.codeoptions.layout)
+			})
+
+	def handle_object_start(self, parent_names, name, object_type_name = None, base_type_name = None):
+		CppMethodBaseHandler.handle_object_start(self, parent_names, name, object_type_name)
+		gen_class = (object_type_name == None) or ( len(parent_names) == 0 )
+
+		if len(parent_names) > 0:
+			if self.is_parent_array(name):
+				if object_type_name == None:
+					classname = CppFormat.classname(name, parent_names)
+				else:
+					classname = CppFormat.classname(object_type_name)
+
+				parent_method_decodejson_reader = CppFormat.method_decodejson_reader_signature(parent_names, self.stringtype)
+				self.methods[parent_method_decodejson_reader].append(self.array_do_object_or_array_template.substitute({"classname": classname}))
+			else:
+				if object_type_name == None:
+					classname = CppFormat.classname(name)
+				else:
+					classname = CppFormat.classname(object_type_name)
+
+				parent_method_decodejson_member = CppFormat.method_decodejson_member_signature(parent_names, self.stringtype)
+				self.object_fields[parent_method_decodejson_member].append((name, self.member_do_object_or_array(name, classname)))
+
+		if not gen_class:
+			return None
+
+		names = parent_names[:]
+		names.append(name)
+
+		method_decodejson_istream = CppFormat.method_decodejson_istream_signature(names, self.stringtype)
+		self.methods[method_decodejson_istream] = [CppBodyConstant.method_decodejson_istream_for_reader_template.substitute({
+				"method_signature": method_decodejson_istream,
+				"w": CppFormat.stringtype_w(self.stringtype)
+			})]
+
+		method_decodejson_range = CppFormat.method_decodejson_range_signature(names, self.stringtype)
+		self.methods[method_decodejson_range] = [CppBodyConstant.method_decodejson_range_for_reader_template.substitute({
+				"method_signature": method_decodejson_range,
+				"w": CppFormat.stringtype_w(self.stringtype)
+			})]
+
+		if len(parent_names) == 0:
+			method_decodejson_stream = CppFormat.method_decodejson_stream_signature(names, self.stringtype)
+			self.methods[method_decodejson_stream] = [CppBodyConstant.method_decodejson_stream_for_reader_template.substitute({
+					"method_signature": method_decodejson_stream,
+					"w": CppFormat.stringtype_w(self.stringtype)
+				})]
+
+		method_decodejson_reader = CppFormat.method_decodejson_reader_signature(names, self.stringtype)
+		self.methods[method_decodejson_reader] = [CppBodyConstant.method_decodejson_reader_for_object_template.substitute({
+				"method_signature": method_decodejson_reader,
+				"stringtype": self.stringtype
+			})]
+
+		fallback = "false"
+		if base_type_name != None:
+			fallback = CppFormat.classname(base_type_name) + "::DecodeJSONMember(name, reader)"
+
+		method_decodejson_member = CppFormat.method_decodejson_member_signature(names, self.stringtype)
+		self.methods[method_decodejson_member] = [CppBodyConstant.method_decodejson_member_begin_template.substitute({
+				"method_signature": method_decodejson_member
+			})]
+		self.object_fields[method_decodejson_member] = []
+		self.object_fallbacks[method_decodejson_member] = fallback
+
+	def handle_object_end(self, parent_names, name, object_type_name = None):
+		gen_class = (object_type_name == None) or ( len(parent_names) == 0 )
+		if not gen_class:
+			return None
+
+		names = parent_names[:]
+		names.append(name)
+		method_decodejson_member = CppFormat.method_decodejson_member_signature(names, self.stringtype)
+		self.methods[method_decodejson_member].append(CppDecodeDispatch.render(self.object_fields.pop(method_decodejson_member), self.stringtype, "name", "  "))
+		self.methods[method_decodejson_member].append(CppBodyConstant.method_decodejson_member_end_template.substitute({
+				"fallback": self.object_fallbacks.pop(method_decodejson_member)
+			}))
+
+	def handle_array_start(self, parent_names, name, element_type_name = None):
+		CppMethodBaseHandler.handle_array_start(self, parent_names, name, element_type_name)
+
+		if len(parent_names) > 0:
+			if self.is_parent_array(name):
+				if element_type_name == None:
+					classname = CppFormat.classname(name, parent_names)
+				else:
+					classname = CppFormat.classname(element_type_name)
+
+				parent_method_decodejson_reader = CppFormat.method_decodejson_reader_signature(parent_names, self.stringtype)
+				self.methods[parent_method_decodejson_reader].append(self.array_do_object_or_array_template.substitute({"classname": classname}))
+			else:
+				if element_type_name == None:
+					classname = CppFormat.classname(name)
+				else:
+					classname = CppFormat.classname(element_type_name)
+
+				parent_method_decodejson_member = CppFormat.method_decodejson_member_signature(parent_names, self.stringtype)
+				self.object_fields[parent_method_decodejson_member].append((name, self.member_do_object_or_array(name, classname)))
+
+		if len(parent_names) > 0 and element_type_name != None:
+			return None
+
+		names = parent_names[:]
+		names.append(name)
+
+		method_decodejson_istream = CppFormat.method_decodejson_istream_signature(names, self.stringtype)
+		self.methods[method_decodejson_istream] = [CppBodyConstant.method_decodejson_istream_for_reader_template.substitute({
+				"method_signature": method_decodejson_istream,
+				"w": CppFormat.stringtype_w(self.stringtype)
+			})]
+
+		method_decodejson_range = CppFormat.method_decodejson_range_signature(names, self.stringtype)
+		self.methods[method_decodejson_range] = [CppBodyConstant.method_decodejson_range_for_reader_template.substitute({
+				"method_signature": method_decodejson_range,
+				"w": CppFormat.stringtype_w(self.stringtype)
+			})]
+
+		if len(parent_names) == 0:
+			method_decodejson_stream = CppFormat.method_decodejson_stream_signature(names, self.stringtype)
+			self.methods[method_decodejson_stream] = [CppBodyConstant.method_decodejson_stream_for_reader_template.substitute({
+					"method_signature": method_decodejson_stream,
+					"w": CppFormat.stringtype_w(self.stringtype)
+				})]
+
+		method_decodejson_reader = CppFormat.method_decodejson_reader_signature(names, self.stringtype)
+		self.methods[method_decodejson_reader] = [self.array_begin_template.substitute({
+				"method_signature": method_decodejson_reader
+			})]
+
+	def handle_array_end(self, parent_names, name, element_type_name = None):
+		if len(parent_names) > 0 and element_type_name != None:
+			return None
+
+		names = parent_names[:]
+		names.append(name)
+		method_decodejson_reader = CppFormat.method_decodejson_reader_signature(names, self.stringtype)
+		self.methods[method_decodejson_reader].append(CppBodyConstant.method_decodejson_array_end)
+
+	def handle_simple_type_for_decodejson(self, parent_names, name, array_string, member_template):
+		if self.is_parent_array(name):
+			parent_method_decodejson_reader = CppFormat.method_decodejson_reader_signature(parent_names, self.stringtype)
+			self.methods[parent_method_decodejson_reader].append(array_string)
+		else:
+			parent_method_decodejson_member = CppFormat.method_decodejson_member_signature(parent_names, self.stringtype)
+			self.object_fields[parent_method_decodejson_member].append((name, member_template.substitute({
+					"field_ref": CppFormat.field_ref(name, self.codeoptions.layout),
+					"w": CppFormat.stringtype_w(self.stringtype)
+				})))
+
+	def handle_boolean(self, parent_names, name):
+		self.handle_simple_type_for_decodejson(parent_names, name,
+				CppBodyConstant.method_decodejson_reader_array_do_bool,
+				CppBodyConstant.method_decodejson_member_do_bool_template
+			)
+
+	def handle_float(self, parent_names, name):
+		self.handle_simple_type_for_decodejson(parent_names, name,
+				CppBodyConstant.method_decodejson_reader_array_do_float,
+				CppBodyConstant.method_decodejson_member_do_float_template
+			)
+
+	def handle_int(self, parent_names, name):
+		self.handle_simple_type_for_decodejson(parent_names, name,
+				CppBodyConstant.method_decodejson_reader_array_do_int,
+				CppBodyConstant.method_decodejson_member_do_int_template
+			)
+
+	def handle_int64(self, parent_names, name):
+		self.handle_simple_type_for_decodejson(parent_names, name,
+				CppBodyConstant.method_decodejson_reader_array_do_int64,
+				CppBodyConstant.method_decodejson_member_do_int64_template
+			)
+
+	def handle_string(self, parent_names, name):
+		member_template = CppBodyConstant.method_decodejson_member_do_string_template
+		if self.codeoptions.layout == "compact":
+			# keeps capacity of the string cleared by Clear()
+			member_template = CppBodyConstant.method_decodejson_member_do_string_in_place_template
+		elif self.codeoptions.allocator == "arena":
+			member_template = CppBodyConstant.method_decodejson_member_do_arena_string_template
+
+		if self.codeoptions.allocator == "arena":
+			self.handle_simple_type_for_decodejson(parent_names, name,
+					CppBodyConstant.method_decodejson_reader_array_do_arena_string_template.substitute({
+						"w": CppFormat.stringtype_w(self.stringtype)
+					}),
+					member_template
+				)
+			return None
+
+		self.handle_simple_type_for_decodejson(parent_names, name,
+				CppBodyConstant.method_decodejson_reader_array_do_string,
+				member_template
+			)
+
 class CppMethodEncodeHandler(CppMethodBaseHandler):
-	def __init__(self, stringtype):
-		CppMethodBaseHandler.__init__(self, stringtype)
+	def __init__(self, stringtype, encode_ostream = True, codeoptions = None):
+		CppMethodBaseHandler.__init__(self, stringtype, codeoptions)
+		# False when EncodeJSON(std::ostream &, bool) is generated by another encoder
+		self.encode_ostream = encode_ostream
+		if self.codeoptions.arraylayout == "compact":
+			self.array_begin_template = CppBodyConstant.method_encodejson_compact_array_begin_template
+			self.array_do_simple_type_template = CppBodyConstant.method_encodejson_compact_array_do_simple_type_template
+			self.array_do_object_or_array_template = CppBodyConstant.method_encodejson_compact_array_do_object_or_array_template
+			self.array_element_value = "value"
+		else:
+			self.array_begin_template = CppBodyConstant.method_encodejson_array_begin_template
+			self.array_do_simple_type_template = CppBodyConstant.method_encodejson_array_do_simple_type_template
+			self.array_do_object_or_array_template = CppBodyConstant.method_encodejson_array_do_object_or_array_template
+			self.array_element_value = "*value"
+
+	def raw_value(self, name):
+		# text of a lazy field as json_spirit reads it
+		if self.codeoptions.allocator == "arena":
+			return CppFormat.converted("detail::ToStdString", CppFormat.field_raw_value(name))
+		return CppFormat.field_raw_value(name)
 
 	def handle_object_start(self, parent_names, name, object_type_name = None, base_type_name = None):
 		CppMethodBaseHandler.handle_object_start(self, parent_names, name, object_type_name)
@@ -928,17 +2401,23 @@ class CppMethodEncodeHandler(CppMethodBaseHandler):
 		if len(parent_names) > 0:
 			if self.is_parent_array(name):
 				parent_method_encodejson_array = CppFormat.method_encodejson_object_or_array_signature(parent_names, self.stringtype)
-				self.methods[parent_method_encodejson_array] += CppBodyConstant.method_encodejson_array_do_object_or_array_template.substitute({
+				self.append_element_code(parent_method_encodejson_array, self.array_do_object_or_array_template.substitute({
 					"w": CppFormat.stringtype_w(self.stringtype)
-					})
+					}))
 			else:
 				parent_method_encodejson_object = CppFormat.method_encodejson_object_or_array_signature(parent_names, self.stringtype)
-				self.methods[parent_method_encodejson_object] += CppBodyConstant.method_encodejson_object_do_object_or_array_template.substitute({
+				member_template = CppBodyConstant.method_encodejson_object_do_object_or_array_template
+				if self.codeoptions.lazy:
+					member_template = CppBodyConstant.method_encodejson_object_do_lazy_template
+				self.methods[parent_method_encodejson_object].append(member_template.substitute({
 						"jsonname": name,
-						"fieldname": CppFormat.fieldname(name),
+						"field_test": CppFormat.field_test(name, self.codeoptions.layout),
+						"field_value": CppFormat.field_value(name, self.codeoptions.layout),
+						"field_raw_test": CppFormat.field_raw_test(name),
+						"field_raw_value": self.raw_value(name),
 						"w": CppFormat.stringtype_w(self.stringtype),
 						"L": CppFormat.stringtype_L(self.stringtype)
-					})
+					}))
 
 		if not gen_class:
 			return None
@@ -946,22 +2425,29 @@ class CppMethodEncodeHandler(CppMethodBaseHandler):
 		names = parent_names[:]
 		names.append(name)
 
-		method_encodejson_ostream = CppFormat.method_encodejson_ostream_signature(names, self.stringtype)
-		self.methods[method_encodejson_ostream] = CppBodyConstant.method_encodejson_ostream_for_object_or_array_template.substitute({
-				"method_signature": method_encodejson_ostream,
-				"w": CppFormat.stringtype_w(self.stringtype)
-			})
+		if self.encode_ostream:
+			method_encodejson_ostream = CppFormat.method_encodejson_ostream_signature(names, self.stringtype)
+			self.methods[method_encodejson_ostream] = [CppBodyConstant.method_encodejson_ostream_for_object_or_array_template.substitute({
+					"method_signature": method_encodejson_ostream,
+					"w": CppFormat.stringtype_w(self.stringtype)
+				})]
+
+		if len(parent_names) == 0:
+			method_encodejson_stream = CppFormat.method_encodejson_stream_signature(names, self.stringtype)
+			self.methods[method_encodejson_stream] = [CppBodyConstant.method_encodejson_stream_template.substitute({
+					"method_signature": method_encodejson_stream
+				})]
 
 		call_base_method = ""
 		if base_type_name != None:
 			call_base_method = CppFormat.classname(base_type_name) + "::EncodeJSON(val);"
 
 		method_encodejson_object = CppFormat.method_encodejson_object_or_array_signature(names, self.stringtype)
-		self.methods[method_encodejson_object] = CppBodyConstant.method_encodejson_object_begin_template.substitute({
+		self.methods[method_encodejson_object] = [CppBodyConstant.method_encodejson_object_begin_template.substitute({
 				"method_signature": method_encodejson_object,
 				"w": CppFormat.stringtype_w(self.stringtype),
 				"call_base_method": call_base_method
-			})
+			})]
 
 	def handle_object_end(self, parent_names, name, object_type_name = None):
 		gen_class = (object_type_name == None) or ( len(parent_names) == 0 )
@@ -971,7 +2457,7 @@ class CppMethodEncodeHandler(CppMethodBaseHandler):
 		names = parent_names[:]
 		names.append(name)
 		method_encodejson_object = CppFormat.method_encodejson_object_or_array_signature(names, self.stringtype)
-		self.methods[method_encodejson_object] += CppBodyConstant.method_encodejson_object_end
+		self.methods[method_encodejson_object].append(CppBodyConstant.method_encodejson_object_end)
 
 	def handle_array_start(self, parent_names, name, element_type_name = None):
 		CppMethodBaseHandler.handle_array_start(self, parent_names, name, element_type_name)
@@ -979,17 +2465,23 @@ class CppMethodEncodeHandler(CppMethodBaseHandler):
 		if len(parent_names) > 0:
 			if self.is_parent_array(name):
 				parent_method_encodejson_array = CppFormat.method_encodejson_object_or_array_signature(parent_names, self.stringtype)
-				self.methods[parent_method_encodejson_array] += CppBodyConstant.method_encodejson_array_do_object_or_array_template.substitute({
+				self.append_element_code(parent_method_encodejson_array, self.array_do_object_or_array_template.substitute({
 					"w": CppFormat.stringtype_w(self.stringtype)
-					})
+					}))
 			else:
 				parent_method_encodejson_object = CppFormat.method_encodejson_object_or_array_signature(parent_names, self.stringtype)
-				self.methods[parent_method_encodejson_object] += CppBodyConstant.method_encodejson_object_do_object_or_array_template.substitute({
+				member_template = CppBodyConstant.method_encodejson_object_do_object_or_array_template
+				if self.codeoptions.lazy:
+					member_template = CppBodyConstant.method_encodejson_object_do_lazy_template
+				self.methods[parent_method_encodejson_object].append(member_template.substitute({
 						"jsonname": name,
-						"fieldname": CppFormat.fieldname(name),
+						"field_test": CppFormat.field_test(name, self.codeoptions.layout),
+						"field_value": CppFormat.field_value(name, self.codeoptions.layout),
+						"field_raw_test": CppFormat.field_raw_test(name),
+						"field_raw_value": self.raw_value(name),
 						"w": CppFormat.stringtype_w(self.stringtype),
 						"L": CppFormat.stringtype_L(self.stringtype)
-					})
+					}))
 
 		if len(parent_names) > 0 and element_type_name != None:
 			return None
@@ -997,17 +2489,32 @@ class CppMethodEncodeHandler(CppMethodBaseHandler):
 		names = parent_names[:]
 		names.append(name)
 
-		method_encodejson_ostream = CppFormat.method_encodejson_ostream_signature(names, self.stringtype)
-		self.methods[method_encodejson_ostream] = CppBodyConstant.method_encodejson_ostream_for_object_or_array_template.substitute({
-				"method_signature": method_encodejson_ostream,
-				"w": CppFormat.stringtype_w(self.stringtype)
-			})
+		if self.encode_ostream:
+			method_encodejson_ostream = CppFormat.method_encodejson_ostream_signature(names, self.stringtype)
+			self.methods[method_encodejson_ostream] = [CppBodyConstant.method_encodejson_ostream_for_object_or_array_template.substitute({
+					"method_signature": method_encodejson_ostream,
+					"w": CppFormat.stringtype_w(self.stringtype)
+				})]
+
+		if len(parent_names) == 0:
+			method_encodejson_stream = CppFormat.method_encodejson_stream_signature(names, self.stringtype)
+			self.methods[method_encodejson_stream] = [CppBodyConstant.method_encodejson_stream_template.substitute({
+					"method_signature": method_encodejson_stream
+				})]
 
 		method_encodejson_array = CppFormat.method_encodejson_object_or_array_signature(names, self.stringtype)
-		self.methods[method_encodejson_array] = CppBodyConstant.method_encodejson_array_begin_template.substitute({
+		self.methods[method_encodejson_array] = [self.array_begin_template.substitute({
 				"method_signature": method_encodejson_array,
 				"w": CppFormat.stringtype_w(self.stringtype)
-			})
+			})]
+
+		if len(parent_names) == 0 and self.codeoptions.parallel and self.encode_ostream:
+			method_encodejson_range = CppFormat.method_encodejson_range_signature(names, self.stringtype)
+			self.methods[method_encodejson_range] = [CppBodyConstant.method_encodejson_range_begin_template.substitute({
+					"method_signature": method_encodejson_range,
+					"w": CppFormat.stringtype_w(self.stringtype)
+				})]
+			self.range_methods[method_encodejson_array] = method_encodejson_range
 
 	def handle_array_end(self, parent_names, name, element_type_name = None):
 		if len(parent_names) > 0 and element_type_name != None:
@@ -1016,22 +2523,27 @@ class CppMethodEncodeHandler(CppMethodBaseHandler):
 		names = parent_names[:]
 		names.append(name)
 		method_encodejson_array = CppFormat.method_encodejson_object_or_array_signature(names, self.stringtype)
-		self.methods[method_encodejson_array] += CppBodyConstant.method_encodejson_array_end
+		self.methods[method_encodejson_array].append(CppBodyConstant.method_encodejson_array_end)
+		if self.range_methods.has_key(method_encodejson_array):
+			self.methods[self.range_methods[method_encodejson_array]].append(CppBodyConstant.method_encodejson_range_end)
 
-	def handle_simple_type_for_encodejson(self, parent_names, name):
+	def handle_simple_type_for_encodejson(self, parent_names, name, convert = ""):
+		# convert is the function turning the value into a json_spirit type
 		if self.is_parent_array(name):
 			parent_method_encodejson_array = CppFormat.method_encodejson_object_or_array_signature(parent_names, self.stringtype)
-			self.methods[parent_method_encodejson_array] += CppBodyConstant.method_encodejson_array_do_simple_type_template.substitute({
+			self.append_element_code(parent_method_encodejson_array, self.array_do_simple_type_template.substitute({
+				"value": CppFormat.converted(convert, self.array_element_value),
 				"w": CppFormat.stringtype_w(self.stringtype)
-				})
+				}))
 		else:
 			parent_method_encodejson_object = CppFormat.method_encodejson_object_or_array_signature(parent_names, self.stringtype)
-			self.methods[parent_method_encodejson_object] += CppBodyConstant.method_encodejson_object_do_simple_type_template.substitute({
+			self.methods[parent_method_encodejson_object].append(CppBodyConstant.method_encodejson_object_do_simple_type_template.substitute({
 					"jsonname": name,
-					"fieldname": CppFormat.fieldname(name),
+					"field_test": CppFormat.field_test(name, self.codeoptions.layout),
+					"field_value": CppFormat.converted(convert, CppFormat.field_value(name, self.codeoptions.layout)),
 					"w": CppFormat.stringtype_w(self.stringtype),
 					"L": CppFormat.stringtype_L(self.stringtype)
-				})
+				}))
 
 	def handle_boolean(self, parent_names, name):
 		self.handle_simple_type_for_encodejson(parent_names, name)
@@ -1046,87 +2558,2327 @@ class CppMethodEncodeHandler(CppMethodBaseHandler):
 		self.handle_simple_type_for_encodejson(parent_names, name)
 
 	def handle_string(self, parent_names, name):
+		if self.codeoptions.allocator == "arena":
+			self.handle_simple_type_for_encodejson(parent_names, name, "detail::ToStdString")
+			return None
+
 		self.handle_simple_type_for_encodejson(parent_names, name)
 
-class CppBodyBuilder:
-	def __init__(self, namespace, stringtype):
-		self.namespace = namespace
-		self.stringtype = stringtype
-		self.filehandler = CppBodyFileHandler()
-		self.methoddecodehandler = CppMethodDecodeHandler(stringtype)
-		self.methodencodehandler = CppMethodEncodeHandler(stringtype)
+class CppMethodStreamEncodeHandler(CppMethodBaseHandler):
+	# EncodeJSON(detail::JSONWriter &) writes straight to the writer. Object members
+	# are written by EncodeJSONMembers(), which writes base class members first.
+	def __init__(self, stringtype, codeoptions = None):
+		CppMethodBaseHandler.__init__(self, stringtype, codeoptions)
+		if self.codeoptions.arraylayout == "compact":
+			self.array_begin_template = CppBodyConstant.method_encodejson_writer_compact_array_begin_template
+			self.array_do_simple_type = CppBodyConstant.method_encodejson_writer_compact_array_do_simple_type
+			self.array_do_object_or_array = CppBodyConstant.method_encodejson_writer_compact_array_do_object_or_array
+		else:
+			self.array_begin_template = CppBodyConstant.method_encodejson_writer_array_begin_template
+			self.array_do_simple_type = CppBodyConstant.method_encodejson_writer_array_do_simple_type
+			self.array_do_object_or_array = CppBodyConstant.method_encodejson_writer_array_do_object_or_array
+		self.members_do_object_or_array_template = CppBodyConstant.method_encodejson_members_do_object_or_array_template
+		if self.codeoptions.lazy:
+			self.members_do_object_or_array_template = CppBodyConstant.method_encodejson_members_do_lazy_template
 
-		self.methodhandlers = [self.methoddecodehandler, self.methodencodehandler]
-		self.handlers = [self.filehandler]
-		self.handlers.extend(self.methodhandlers)
+	def handle_object_start(self, parent_names, name, object_type_name = None, base_type_name = None):
+		CppMethodBaseHandler.handle_object_start(self, parent_names, name, object_type_name)
+		gen_class = (object_type_name == None) or ( len(parent_names) == 0 )
 
-	def content(self):
-		method_content = "\n".join([m.content() for m in self.methodhandlers])
-		return self.filehandler.file_begin \
-			+ CppFormat.namespace_begin(self.namespace) \
-			+ method_content \
-			+ CppFormat.namespace_end(self.namespace) \
-			+ self.filehandler.file_end
+		if len(parent_names) > 0:
+			self.handle_child(parent_names, name, self.members_do_object_or_array_template,
+					self.array_do_object_or_array)
 
-	def save_to_dir(self, dirpath):
-		f = open(os.path.join(dirpath, self.filehandler.filename), "w")
-		f.write(self.content())
-		f.close()
+		if not gen_class:
+			return None
 
-class CppTest:
-	content_template = string.Template(
-"""
-/*
- * The MIT License (MIT)
- *
- * Copyright (c) 2013 Yuanyang Wu
- *
- * Permission is hereby granted, free of charge, to any person obtaining a
- * copy of this software and associated documentation files (the "Software"),
- * to deal in the Software without restriction, including without limitation
- * the rights to use, copy, modify, merge, publish, distribute, sublicense,
- * and/or sell copies of the Software, and to permit persons to whom the
- * Software is furnished to do so, subject to the following conditions:
- *
- * The above copyright notice and this permission notice shall be included
- * in all copies or substantial portions of the Software.
- *
- * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
- * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
- * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
- * THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
- * OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
- * ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
- * OTHER DEALINGS IN THE SOFTWARE.
- */
+		names = parent_names[:]
+		names.append(name)
 
+		method_encodejson_ostream = CppFormat.method_encodejson_ostream_signature(names, self.stringtype)
+		self.methods[method_encodejson_ostream] = [CppBodyConstant.method_encodejson_ostream_for_writer_template.substitute({
+				"method_signature": method_encodejson_ostream,
+				"w": CppFormat.stringtype_w(self.stringtype)
+			})]
 
-#include <iostream>
-#include <fstream>
-#include "${headerfilename}"
+		method_encodejson_writer = CppFormat.method_encodejson_writer_signature(names, self.stringtype)
+		self.methods[method_encodejson_writer] = [CppBodyConstant.method_encodejson_writer_for_object_template.substitute({
+				"method_signature": method_encodejson_writer
+			})]
 
-int main(int argc, char ** argv)
-{
-  std::${w}ifstream is(argv[1]);
-  ${namespace}::${classname} val;
-  val.DecodeJSON(is);
-  val.EncodeJSON(std::${w}cout, true);
-  return 0;
-}
-"""
-	)
+		call_base_method = ""
+		if base_type_name != None:
+			call_base_method = "  " + CppFormat.classname(base_type_name) + "::EncodeJSONMembers(writer);\n"
 
-	def __init__(self, classname, namespace, stringtype):
-		self.filename = "main.cpp"
-		self.content = CppTest.content_template.substitute({
-				"headerfilename": CppFormat.headerfilename(classname),
-				"namespace": namespace,
-				"w": CppFormat.stringtype_w(stringtype),
-				"classname": CppFormat.classname(classname)
-			})
+		method_encodejson_members = CppFormat.method_encodejson_members_signature(names, self.stringtype)
+		self.methods[method_encodejson_members] = [CppBodyConstant.method_encodejson_members_begin_template.substitute({
+				"method_signature": method_encodejson_members,
+				"call_base_method": call_base_method
+			})]
 
-	def savefile(self, filepath):
-		f = open(filepath, "w")
-		f.write(self.content)
-		f.close()
+	def handle_object_end(self, parent_names, name, object_type_name = None):
+		gen_class = (object_type_name == None) or ( len(parent_names) == 0 )
+		if not gen_class:
+			return None
+
+		names = parent_names[:]
+		names.append(name)
+		method_encodejson_members = CppFormat.method_encodejson_members_signature(names, self.stringtype)
+		self.methods[method_encodejson_members].append(CppBodyConstant.method_encodejson_members_end)
+
+	def handle_array_start(self, parent_names, name, element_type_name = None):
+		CppMethodBaseHandler.handle_array_start(self, parent_names, name, element_type_name)
+
+		if len(parent_names) > 0:
+			self.handle_child(parent_names, name, self.members_do_object_or_array_template,
+					self.array_do_object_or_array)
+
+		if len(parent_names) > 0 and element_type_name != None:
+			return None
+
+		names = parent_names[:]
+		names.append(name)
+
+		method_encodejson_ostream = CppFormat.method_encodejson_ostream_signature(names, self.stringtype)
+		self.methods[method_encodejson_ostream] = [CppBodyConstant.method_encodejson_ostream_for_writer_template.substitute({
+				"method_signature": method_encodejson_ostream,
+				"w": CppFormat.stringtype_w(self.stringtype)
+			})]
 
+		method_encodejson_writer = CppFormat.method_encodejson_writer_signature(names, self.stringtype)
+		self.methods[method_encodejson_writer] = [self.array_begin_template.substitute({
+				"method_signature": method_encodejson_writer
+			})]
+
+		if len(parent_names) == 0 and self.codeoptions.parallel:
+			method_encodejson_range = CppFormat.method_encodejson_range_signature(names, self.stringtype)
+			self.methods[method_encodejson_range] = [CppBodyConstant.method_encodejson_writer_range_begin_template.substitute({
+					"method_signature": method_encodejson_range,
+					"w": CppFormat.stringtype_w(self.stringtype)
+				})]
+			self.range_methods[method_encodejson_writer] = method_encodejson_range
+
+	def handle_array_end(self, parent_names, name, element_type_name = None):
+		if len(parent_names) > 0 and element_type_name != None:
+			return None
+
+		names = parent_names[:]
+		names.append(name)
+		method_encodejson_writer = CppFormat.method_encodejson_writer_signature(names, self.stringtype)
+		self.append_element_code(method_encodejson_writer, CppBodyConstant.method_encodejson_writer_array_end)
+
+	def handle_child(self, parent_names, name, member_template, array_string):
+		if self.is_parent_array(name):
+			parent_method_encodejson_writer = CppFormat.method_encodejson_writer_signature(parent_names, self.stringtype)
+			self.append_element_code(parent_method_encodejson_writer, array_string)
+		else:
+			parent_method_encodejson_members = CppFormat.method_encodejson_members_signature(parent_names, self.stringtype)
+			self.methods[parent_method_encodejson_members].append(member_template.substitute({
+					"jsonkey": CppFormat.json_key_literal(name),
+					"field_test": CppFormat.field_test(name, self.codeoptions.layout),
+					"field_value": CppFormat.field_value(name, self.codeoptions.layout),
+					"field_raw_test": CppFormat.field_raw_test(name),
+					"field_raw_value": CppFormat.field_raw_value(name),
+					"L": CppFormat.stringtype_L(self.stringtype)
+				}))
+
+	def handle_simple_type_for_encodejson(self, parent_names, name):
+		self.handle_child(parent_names, name, CppBodyConstant.method_encodejson_members_do_simple_type_template,
+				self.array_do_simple_type)
+
+	def handle_boolean(self, parent_names, name):
+		self.handle_simple_type_for_encodejson(parent_names, name)
+
+	def handle_float(self, parent_names, name):
+		self.handle_simple_type_for_encodejson(parent_names, name)
+
+	def handle_int(self, parent_names, name):
+		self.handle_simple_type_for_encodejson(parent_names, name)
+
+	def handle_int64(self, parent_names, name):
+		self.handle_simple_type_for_encodejson(parent_names, name)
+
+	def handle_string(self, parent_names, name):
+		self.handle_simple_type_for_encodejson(parent_names, name)
+
+class CppMethodClearHandler(CppMethodBaseHandler):
+	# Clear() resets every field. Fields of compact layout keep their value
+	# objects, so that strings, arrays and nested objects keep their capacity.
+	def __init__(self, stringtype, codeoptions = None):
+		CppMethodBaseHandler.__init__(self, stringtype, codeoptions)
+		# clearing method => number of fields, for the presence bitmask of compact layout
+		self.field_counts = {}
+
+	def add_field(self, parent_names, name, compact_statement):
+		method_clear = CppFormat.method_clear_signature(parent_names)
+		if self.codeoptions.layout == "compact":
+			statement = compact_statement
+		else:
+			statement = CppFormat.fieldname(name) + " = boost::none;"
+		self.methods[method_clear].append("  " + statement + "\n")
+		self.field_counts[method_clear] += 1
+
+	def handle_object_start(self, parent_names, name, object_type_name = None, base_type_name = None):
+		CppMethodBaseHandler.handle_object_start(self, parent_names, name, object_type_name)
+		gen_class = (object_type_name == None) or ( len(parent_names) == 0 )
+
+		if len(parent_names) > 0 and not self.is_parent_array(name):
+			self.add_field(parent_names, name, CppFormat.fieldname(name) + ".Clear();")
+
+		if not gen_class:
+			return None
+
+		names = parent_names[:]
+		names.append(name)
+
+		call_base_method = ""
+		if base_type_name != None:
+			call_base_method = "  " + CppFormat.classname(base_type_name) + "::Clear();\n"
+
+		method_clear = CppFormat.method_clear_signature(names)
+		self.methods[method_clear] = [CppBodyConstant.method_clear_begin_template.substitute({
+				"method_signature": method_clear,
+				"call_base_method": call_base_method
+			})]
+		self.field_counts[method_clear] = 0
+
+	def handle_object_end(self, parent_names, name, object_type_name = None):
+		gen_class = (object_type_name == None) or ( len(parent_names) == 0 )
+		if not gen_class:
+			return None
+
+		names = parent_names[:]
+		names.append(name)
+		method_clear = CppFormat.method_clear_signature(names)
+		if self.codeoptions.layout == "compact":
+			for i in xrange((self.field_counts.pop(method_clear) + 7) / 8):
+				self.methods[method_clear].append("  m_has_bits[" + str(i) + "] = 0;\n")
+		self.methods[method_clear].append(CppBodyConstant.method_clear_end)
+
+	def handle_array_start(self, parent_names, name, element_type_name = None):
+		CppMethodBaseHandler.handle_array_start(self, parent_names, name, element_type_name)
+
+		if len(parent_names) > 0 and not self.is_parent_array(name):
+			self.add_field(parent_names, name, CppFormat.fieldname(name) + ".Clear();")
+
+		if len(parent_names) > 0 and element_type_name != None:
+			return None
+
+		names = parent_names[:]
+		names.append(name)
+
+		method_clear = CppFormat.method_clear_signature(names)
+		self.methods[method_clear] = [CppBodyConstant.method_clear_begin_template.substitute({
+				"method_signature": method_clear,
+				"call_base_method": ""
+			})]
+		self.methods[method_clear].append("  m_array.clear();\n")
+		if self.codeoptions.arraylayout == "compact":
+			self.methods[method_clear].append("  m_null.clear();\n")
+		self.methods[method_clear].append(CppBodyConstant.method_clear_end)
+
+	def handle_simple_type_for_clear(self, parent_names, name, cpptype):
+		if not self.is_parent_array(name):
+			self.add_field(parent_names, name, CppFormat.fieldname(name) + " = " + cpptype + "();")
+
+	def handle_boolean(self, parent_names, name):
+		self.handle_simple_type_for_clear(parent_names, name, "bool")
+
+	def handle_float(self, parent_names, name):
+		self.handle_simple_type_for_clear(parent_names, name, "double")
+
+	def handle_int(self, parent_names, name):
+		self.handle_simple_type_for_clear(parent_names, name, "int")
+
+	def handle_int64(self, parent_names, name):
+		self.handle_simple_type_for_clear(parent_names, name, "boost::int64_t")
+
+	def handle_string(self, parent_names, name):
+		if not self.is_parent_array(name):
+			self.add_field(parent_names, name, CppFormat.fieldname(name) + ".clear();")
+
+class CppMethodParallelHandler(CppMethodBaseHandler):
+	# DecodeJSONParallel() and EncodeJSONParallel() of top level arrays, "--parallel"
+	def __init__(self, stringtype, codeoptions = None):
+		CppMethodBaseHandler.__init__(self, stringtype, codeoptions)
+		self.merge_element = ""
+
+	def handle_child(self, parent_names, name, merge_element):
+		if len(parent_names) == 1 and self.is_parent_array(name):
+			self.merge_element = merge_element
+			if self.codeoptions.arraylayout == "compact":
+				self.merge_element += CppBodyConstant.method_decodejson_parallel_do_null
+
+	def handle_object_start(self, parent_names, name, object_type_name = None, base_type_name = None):
+		CppMethodBaseHandler.handle_object_start(self, parent_names, name, object_type_name)
+		self.handle_child(parent_names, name, CppBodyConstant.method_decodejson_parallel_do_object_or_array)
+
+	def handle_array_start(self, parent_names, name, element_type_name = None):
+		CppMethodBaseHandler.handle_array_start(self, parent_names, name, element_type_name)
+		self.handle_child(parent_names, name, CppBodyConstant.method_decodejson_parallel_do_object_or_array)
+		if len(parent_names) > 0:
+			return None
+
+		names = [name]
+		file_template = CppBodyConstant.method_decodejson_file_parallel_template
+		if CppFormat.stringtype_w(self.stringtype) != "":
+			file_template = CppBodyConstant.method_decodejson_wfile_parallel_template
+		method_decodejson_file_parallel = CppFormat.method_decodejson_file_parallel_signature(names, self.stringtype)
+		self.methods[method_decodejson_file_parallel] = [file_template.substitute({
+				"method_signature": method_decodejson_file_parallel
+			})]
+
+		method_encodejson_parallel = CppFormat.method_encodejson_parallel_signature(names, self.stringtype)
+		self.methods[method_encodejson_parallel] = [CppBodyConstant.method_encodejson_parallel_template.substitute({
+				"method_signature": method_encodejson_parallel
+			})]
+
+	def handle_array_end(self, parent_names, name, element_type_name = None):
+		if len(parent_names) > 0:
+			return None
+
+		names = [name]
+		method_decodejson_parallel = CppFormat.method_decodejson_parallel_signature(names, self.stringtype)
+		self.methods[method_decodejson_parallel] = [CppBodyConstant.method_decodejson_parallel_template.substitute({
+				"method_signature": method_decodejson_parallel,
+				"classname": CppFormat.classname(name),
+				"merge_element": self.merge_element
+			})]
+
+	def handle_boolean(self, parent_names, name):
+		self.handle_child(parent_names, name, CppBodyConstant.method_decodejson_parallel_do_simple_type)
+
+	def handle_float(self, parent_names, name):
+		self.handle_child(parent_names, name, CppBodyConstant.method_decodejson_parallel_do_simple_type)
+
+	def handle_int(self, parent_names, name):
+		self.handle_child(parent_names, name, CppBodyConstant.method_decodejson_parallel_do_simple_type)
+
+	def handle_int64(self, parent_names, name):
+		self.handle_child(parent_names, name, CppBodyConstant.method_decodejson_parallel_do_simple_type)
+
+	def handle_string(self, parent_names, name):
+		self.handle_child(parent_names, name, CppBodyConstant.method_decodejson_parallel_do_simple_type)
+
+class CppBodyBuilder:
+	def __init__(self, namespace, stringtype, codeoptions = None):
+		if codeoptions == None:
+			codeoptions = CppCodeOptions()
+		self.namespace = namespace
+		self.stringtype = stringtype
+		self.filehandler = CppBodyFileHandler()
+		is_stream_decoder = (codeoptions.decoder == "stream")
+		self.methoddecodehandler = CppMethodDecodeHandler(stringtype, not is_stream_decoder, codeoptions)
+		is_stream_encoder = (codeoptions.encoder == "stream")
+		self.methodencodehandler = CppMethodEncodeHandler(stringtype, not is_stream_encoder, codeoptions)
+
+		self.methodhandlers = [self.methoddecodehandler]
+		if is_stream_decoder:
+			self.methodhandlers.append(CppMethodStreamDecodeHandler(stringtype, codeoptions))
+		self.methodhandlers.append(self.methodencodehandler)
+		if is_stream_encoder:
+			self.methodhandlers.append(CppMethodStreamEncodeHandler(stringtype, codeoptions))
+		self.methodhandlers.append(CppMethodClearHandler(stringtype, codeoptions))
+		if codeoptions.parallel:
+			self.methodhandlers.append(CppMethodParallelHandler(stringtype, codeoptions))
+		self.handlers = [self.filehandler]
+		self.handlers.extend(self.methodhandlers)
+
+	def chunks(self):
+		ret = [self.filehandler.file_begin, CppFormat.namespace_begin(self.namespace)]
+		for i, m in enumerate(self.methodhandlers):
+			if i > 0:
+				ret.append("\n")
+			ret.extend(m.chunks())
+		ret.extend([CppFormat.namespace_end(self.namespace), self.filehandler.file_end])
+		return ret
+
+	def content(self):
+		return "".join(self.chunks())
+
+	def save(self, writer):
+		writer(self.filehandler.filename, self.chunks())
+
+	def save_to_dir(self, dirpath):
+		self.save(FileWriter(dirpath))
+
+class CppTest:
+	content_template = CppTemplate(
+"""
+/*
+ * The MIT License (MIT)
+ *
+ * Copyright (c) 2013 Yuanyang Wu
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a
+ * copy of this software and associated documentation files (the "Software"),
+ * to deal in the Software without restriction, including without limitation
+ * the rights to use, copy, modify, merge, publish, distribute, sublicense,
+ * and/or sell copies of the Software, and to permit persons to whom the
+ * Software is furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included
+ * in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+ * THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+ * OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ * ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+ * OTHER DEALINGS IN THE SOFTWARE.
+ */
+
+
+#include <clocale>
+#include <iostream>
+#include <fstream>
+#include <sstream>
+#include <stdexcept>
+#include <boost/ref.hpp>
+#include "${headerfilename}"
+
+// compares records decoded by DecodeJSONStream() with expected text
+struct RecordChecker
+{
+  explicit RecordChecker(const std::${w}string & expected)
+    : expected(expected), count(0), same(true)
+  {
+  }
+
+  void operator()(${namespace}::${classname} & record)
+  {
+    std::${w}ostringstream text;
+    record.EncodeJSON(text);
+    same = same && (text.str() == expected);
+    ++count;
+  }
+
+  std::${w}string expected;
+  int count;
+  bool same;
+};
+
+int main(int argc, char ** argv)
+{
+  // C locale of the environment, JSON numbers must not follow its decimal point
+  std::setlocale(LC_ALL, "");
+${arena_scope}  ${namespace}::${classname} val;
+  val.DecodeJSONFile(argv[1]);
+
+  // decoding from std::istream gives the same
+  std::${w}ifstream is(argv[1]);
+  ${namespace}::${classname} isVal;
+  isVal.DecodeJSON(is);
+  std::${w}ostringstream fileText;
+  std::${w}ostringstream isText;
+  val.EncodeJSON(fileText);
+  isVal.EncodeJSON(isText);
+  if (fileText.str() != isText.str())
+  {
+    std::cerr << "DecodeJSONFile() and DecodeJSON(std::istream &) differ" << std::endl;
+    return 1;
+  }
+
+  // records decoded into one reused object are the same as val
+  std::${w}stringstream records;
+  val.EncodeJSONStream(records);
+  val.EncodeJSONStream(records);
+  RecordChecker checker(fileText.str());
+  ${namespace}::${classname} record;
+  record.DecodeJSONStream(records, boost::ref(checker));
+  if (checker.count != 2 || !checker.same)
+  {
+    std::cerr << "DecodeJSONStream() and EncodeJSONStream() differ" << std::endl;
+    return 1;
+  }
+
+  // a truncated record throws after the records before it are passed on
+  std::${w}stringstream truncated;
+  val.EncodeJSONStream(truncated);
+  truncated << fileText.str().substr(0, fileText.str().size() - 1) << std::endl;
+  val.EncodeJSONStream(truncated);
+  RecordChecker truncatedChecker(fileText.str());
+  try
+  {
+    record.DecodeJSONStream(truncated, boost::ref(truncatedChecker));
+    std::cerr << "DecodeJSONStream() accepted a truncated record" << std::endl;
+    return 1;
+  }
+  catch (const std::runtime_error &)
+  {
+  }
+  if (truncatedChecker.count != 1 || !truncatedChecker.same)
+  {
+    std::cerr << "DecodeJSONStream() passed on a truncated record" << std::endl;
+    return 1;
+  }
+
+${parallel_check}  val.EncodeJSON(std::${w}cout, true);
+  return 0;
+}
+"""
+	)
+
+	parallel_check_template = CppTemplate(
+"""  // parts decoded and encoded on threads are the same as val
+  ${namespace}::${classname} parallelVal;
+  parallelVal.DecodeJSONFileParallel(argv[1], 3);
+  std::${w}ostringstream parallelText;
+  parallelVal.EncodeJSON(parallelText);
+  val.EncodeJSONParallel(parallelText, 3);
+  if (parallelText.str() != fileText.str() + fileText.str())
+  {
+    std::cerr << "DecodeJSONParallel() or EncodeJSONParallel() differs" << std::endl;
+    return 1;
+  }
+
+"""
+	)
+
+	arena_scope_template = CppTemplate(
+"""  // strings and arrays of both decoded values are in arena
+  ${namespace}::detail::Arena arena;
+  ${namespace}::detail::ArenaScope scope(arena);
+
+"""
+	)
+
+	def __init__(self, classname, namespace, stringtype, codeoptions = None, is_array = False):
+		if codeoptions == None:
+			codeoptions = CppCodeOptions()
+		arena_scope = ""
+		if codeoptions.allocator == "arena":
+			arena_scope = CppTest.arena_scope_template.substitute({"namespace": namespace})
+		parallel_check = ""
+		if codeoptions.parallel and is_array:
+			parallel_check = CppTest.parallel_check_template.substitute({
+					"namespace": namespace,
+					"w": CppFormat.stringtype_w(stringtype),
+					"classname": CppFormat.classname(classname)
+				})
+		self.filename = "main.cpp"
+		self.content = CppTest.content_template.substitute({
+				"headerfilename": CppFormat.headerfilename(classname),
+				"arena_scope": arena_scope,
+				"parallel_check": parallel_check,
+				"namespace": namespace,
+				"w": CppFormat.stringtype_w(stringtype),
+				"classname": CppFormat.classname(classname)
+			})
+
+	def save(self, writer):
+		writer(self.filename, [self.content])
+
+	def savefile(self, filepath):
+		FileUtil.save_if_changed(filepath, self.content)
+
+
+class CppDetailHeader:
+	# header-only helper in "detail/", subclass gives filename and content_template
+	def __init__(self, namespace):
+		if namespace == "":
+			namespace = "detail"
+		else:
+			namespace = namespace + "::" + "detail"
+
+		# relative to the directory of generated files
+		self.filepath = "detail/" + self.filename
+		self.content = self.content_template.substitute({
+				"namespace_": namespace.replace("::", "_"),
+				"namespace_begin": CppFormat.namespace_begin(namespace),
+				"namespace_end": CppFormat.namespace_end(namespace)
+			})
+
+	def save(self, writer):
+		writer(self.filepath, [self.content])
+
+class CppJSONReader(CppDetailHeader):
+	# pull parser used by "--decoder=stream"
+	filename = "JSONReader.h"
+
+	content_template = CppTemplate(
+"""
+/*
+ * The MIT License (MIT)
+ *
+ * Copyright (c) 2013 Yuanyang Wu
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a
+ * copy of this software and associated documentation files (the "Software"),
+ * to deal in the Software without restriction, including without limitation
+ * the rights to use, copy, modify, merge, publish, distribute, sublicense,
+ * and/or sell copies of the Software, and to permit persons to whom the
+ * Software is furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included
+ * in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+ * THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+ * OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ * ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+ * OTHER DEALINGS IN THE SOFTWARE.
+ */
+
+
+#ifndef _${namespace_}_JSONREADER_H_
+#define _${namespace_}_JSONREADER_H_
+
+#include <clocale>
+#include <cstddef>
+#include <cstdlib>
+#include <istream>
+#include <limits>
+#include <stdexcept>
+#include <string>
+#include <boost/cstdint.hpp>
+
+${namespace_begin}
+// Reads JSON text from the stream buffer or memory token by token, so that
+// generated classes are decoded without building a json_spirit Value first.
+// Escapes and number conversion follow json_spirit, errors throw std::runtime_error.
+template <class Char>
+class BasicJSONReader
+{
+public:
+  typedef std::basic_string<Char> String;
+
+  explicit BasicJSONReader(std::basic_istream<Char> & is)
+    : m_memory(0, 0), m_buf(*is.rdbuf())
+  {
+  }
+
+  // reads [begin, end) in place, the text is not copied
+  BasicJSONReader(const Char * begin, const Char * end)
+    : m_memory(begin, end), m_buf(m_memory)
+  {
+  }
+
+  // true when only whitespace is left, as after the last record of a stream
+  bool AtEnd()
+  {
+    return Traits::eq_int_type(Peek(), Traits::eof());
+  }
+
+  void BeginObject()
+  {
+    Expect('{');
+  }
+
+  // reads the name of next member, false at the end of object
+  bool NextMember(bool first, String & name)
+  {
+    if (Peek() == '}')
+    {
+      m_buf.sbumpc();
+      return false;
+    }
+    if (!first)
+    {
+      Expect(',');
+    }
+    ReadString(name);
+    Expect(':');
+    return true;
+  }
+
+  void BeginArray()
+  {
+    Expect('[');
+  }
+
+  // false at the end of array
+  bool NextElement(bool first)
+  {
+    if (Peek() == ']')
+    {
+      m_buf.sbumpc();
+      return false;
+    }
+    if (!first)
+    {
+      Expect(',');
+    }
+    return true;
+  }
+
+  // consumes null
+  bool IsNull()
+  {
+    if (Peek() != 'n')
+    {
+      return false;
+    }
+    ExpectLiteral("null");
+    return true;
+  }
+
+  bool ReadBool()
+  {
+    int_type c = Peek();
+    if (c == 't')
+    {
+      ExpectLiteral("true");
+      return true;
+    }
+    if (c == 'f')
+    {
+      ExpectLiteral("false");
+      return false;
+    }
+    Fail("value type is not bool");
+    return false;
+  }
+
+  int ReadInt()
+  {
+    return static_cast<int>(ReadInt64());
+  }
+
+  // digits are converted here, strtoll() would saturate on overflow
+  boost::int64_t ReadInt64()
+  {
+    if (ReadNumber())
+    {
+      Fail("value type is real not int");
+    }
+    bool negative = (m_number[0] == '-');
+    std::size_t i = negative ? 1 : 0;
+    if (i == m_number.size())
+    {
+      Fail("invalid int");
+    }
+    boost::uint64_t limit = static_cast<boost::uint64_t>(std::numeric_limits<boost::int64_t>::max()) + (negative ? 1 : 0);
+    boost::uint64_t u = 0;
+    for (; i < m_number.size(); ++i)
+    {
+      char c = m_number[i];
+      if (c < '0' || c > '9')
+      {
+        Fail("invalid int");
+      }
+      unsigned int digit = c - '0';
+      if (u > (limit - digit) / 10)
+      {
+        Fail("int is out of range");
+      }
+      u = u * 10 + digit;
+    }
+    return negative ? static_cast<boost::int64_t>(0 - u) : static_cast<boost::int64_t>(u);
+  }
+
+  double ReadReal()
+  {
+    ReadNumber();
+    // strtod() takes the decimal point of the C locale
+    const char * point = std::localeconv()->decimal_point;
+    if (point[0] != '.' || point[1] != 0)
+    {
+      std::string::size_type dot = m_number.find('.');
+      if (dot != std::string::npos)
+      {
+        m_number.replace(dot, 1, point);
+      }
+    }
+    char * end = 0;
+    double value = strtod(m_number.c_str(), &end);
+    if (*end != 0)
+    {
+      Fail("invalid real");
+    }
+    return value;
+  }
+
+  String ReadString()
+  {
+    String s;
+    ReadString(s);
+    return s;
+  }
+
+  // reads into a string of another allocator, like detail::ArenaString
+  template <class S>
+  S ReadStringAs()
+  {
+    S s;
+    ReadString(s);
+    return s;
+  }
+
+  template <class S>
+  void ReadString(S & s)
+  {
+    Expect('"');
+    s.clear();
+    for (;;)
+    {
+      int_type c = m_buf.sbumpc();
+      if (c == '"')
+      {
+        return;
+      }
+      if (c == '\\\\')
+      {
+        s += ReadEscape();
+      }
+      else if (Traits::eq_int_type(c, Traits::eof()))
+      {
+        Fail("unterminated string");
+      }
+      else
+      {
+        s += Traits::to_char_type(c);
+      }
+    }
+  }
+
+  // copies the text of next value of any type without white spaces between
+  // tokens, checking its structure no more than Skip()
+  template <class S>
+  void ReadRaw(S & raw)
+  {
+    raw.clear();
+    std::size_t depth = 0;
+    int_type c = Peek();
+    do
+    {
+      if (c == '{' || c == '[')
+      {
+        raw += Traits::to_char_type(m_buf.sbumpc());
+        ++depth;
+      }
+      else if (depth > 0 && (c == '}' || c == ']' || c == ',' || c == ':'))
+      {
+        raw += Traits::to_char_type(m_buf.sbumpc());
+        if (c == '}' || c == ']')
+        {
+          --depth;
+        }
+      }
+      else if (c == '"')
+      {
+        CopyString(raw);
+      }
+      else
+      {
+        CopyToken(raw);
+      }
+      if (depth > 0)
+      {
+        c = Peek();
+      }
+    } while (depth > 0);
+  }
+
+  // skips next value of any type without checking its structure
+  void Skip()
+  {
+    std::size_t depth = 0;
+    do
+    {
+      int_type c = Peek();
+      if (c == '{' || c == '[')
+      {
+        m_buf.sbumpc();
+        ++depth;
+      }
+      else if (depth > 0 && (c == '}' || c == ']'))
+      {
+        m_buf.sbumpc();
+        --depth;
+      }
+      else if (depth > 0 && (c == ',' || c == ':'))
+      {
+        m_buf.sbumpc();
+      }
+      else if (c == '"')
+      {
+        SkipString();
+      }
+      else
+      {
+        SkipToken();
+      }
+    } while (depth > 0);
+  }
+
+private:
+  typedef std::char_traits<Char> Traits;
+  typedef typename Traits::int_type int_type;
+
+  void Fail(const char * what)
+  {
+    throw std::runtime_error(std::string("JSON decoding failed: ") + what);
+  }
+
+  // next character after white spaces, not consumed
+  int_type Peek()
+  {
+    int_type c = m_buf.sgetc();
+    while (c == ' ' || c == '\\n' || c == '\\r' || c == '\\t')
+    {
+      c = m_buf.snextc();
+    }
+    return c;
+  }
+
+  void Expect(Char expected)
+  {
+    if (!Traits::eq_int_type(Peek(), Traits::to_int_type(expected)))
+    {
+      Fail("unexpected character");
+    }
+    m_buf.sbumpc();
+  }
+
+  void ExpectLiteral(const char * literal)
+  {
+    for (; *literal != 0; ++literal)
+    {
+      if (!Traits::eq_int_type(m_buf.sbumpc(), Traits::to_int_type(static_cast<Char>(*literal))))
+      {
+        Fail("invalid literal");
+      }
+    }
+  }
+
+  Char ReadEscape()
+  {
+    int_type c = m_buf.sbumpc();
+    switch (c)
+    {
+    case 't': return '\\t';
+    case 'b': return '\\b';
+    case 'f': return '\\f';
+    case 'n': return '\\n';
+    case 'r': return '\\r';
+    case '\\\\': return '\\\\';
+    case '/': return '/';
+    case '"': return '"';
+    case 'x': return ReadHex(2);
+    case 'u': return ReadHex(4);
+    default: break;
+    }
+    Fail("invalid escape");
+    return Char();
+  }
+
+  Char ReadHex(int digits)
+  {
+    unsigned long code = 0;
+    for (int i = 0; i < digits; ++i)
+    {
+      int_type c = m_buf.sbumpc();
+      code <<= 4;
+      if (c >= '0' && c <= '9') code += c - '0';
+      else if (c >= 'a' && c <= 'f') code += c - 'a' + 10;
+      else if (c >= 'A' && c <= 'F') code += c - 'A' + 10;
+      else Fail("invalid hex digit");
+    }
+    // same truncation as json_spirit for characters out of Char
+    return static_cast<Char>(code);
+  }
+
+  static bool IsNumberChar(int_type c)
+  {
+    return (c >= '0' && c <= '9') || c == '-' || c == '+' || c == '.' || c == 'e' || c == 'E';
+  }
+
+  // copies the number to m_number, returns true for fraction or exponent
+  bool ReadNumber()
+  {
+    m_number.clear();
+    bool isReal = false;
+    for (int_type c = Peek(); IsNumberChar(c); c = m_buf.snextc())
+    {
+      if (c == '.' || c == 'e' || c == 'E')
+      {
+        isReal = true;
+      }
+      m_number += static_cast<char>(c);
+    }
+    if (m_number.empty())
+    {
+      Fail("value type is not number");
+    }
+    return isReal;
+  }
+
+  void SkipString()
+  {
+    m_buf.sbumpc();
+    for (;;)
+    {
+      int_type c = m_buf.sbumpc();
+      if (c == '"')
+      {
+        return;
+      }
+      if (c == '\\\\')
+      {
+        c = m_buf.sbumpc();
+      }
+      if (Traits::eq_int_type(c, Traits::eof()))
+      {
+        Fail("unterminated string");
+      }
+    }
+  }
+
+  // string with quotes and escapes as is
+  template <class S>
+  void CopyString(S & raw)
+  {
+    raw += Traits::to_char_type(m_buf.sbumpc());
+    for (;;)
+    {
+      int_type c = m_buf.sbumpc();
+      if (Traits::eq_int_type(c, Traits::eof()))
+      {
+        Fail("unterminated string");
+      }
+      raw += Traits::to_char_type(c);
+      if (c == '"')
+      {
+        return;
+      }
+      if (c == '\\\\')
+      {
+        c = m_buf.sbumpc();
+        if (Traits::eq_int_type(c, Traits::eof()))
+        {
+          Fail("unterminated string");
+        }
+        raw += Traits::to_char_type(c);
+      }
+    }
+  }
+
+  template <class S>
+  void CopyToken(S & raw)
+  {
+    std::size_t n = 0;
+    for (int_type c = m_buf.sgetc(); IsTokenChar(c); c = m_buf.snextc())
+    {
+      raw += Traits::to_char_type(c);
+      ++n;
+    }
+    if (n == 0)
+    {
+      Fail("unexpected character");
+    }
+  }
+
+  static bool IsTokenChar(int_type c)
+  {
+    return (c >= '0' && c <= '9') || (c >= 'a' && c <= 'z') || (c >= 'A' && c <= 'Z')
+      || c == '-' || c == '+' || c == '.';
+  }
+
+  // number, true, false or null
+  void SkipToken()
+  {
+    std::size_t n = 0;
+    for (int_type c = m_buf.sgetc(); IsTokenChar(c); c = m_buf.snextc())
+    {
+      ++n;
+    }
+    if (n == 0)
+    {
+      Fail("unexpected character");
+    }
+  }
+
+  // read-only get area over memory
+  class MemoryBuffer : public std::basic_streambuf<Char>
+  {
+  public:
+    MemoryBuffer(const Char * begin, const Char * end)
+    {
+      this->setg(const_cast<Char *>(begin), const_cast<Char *>(begin), const_cast<Char *>(end));
+    }
+  };
+
+  MemoryBuffer m_memory;
+  std::basic_streambuf<Char> & m_buf;
+  // text of the number being read, kept to reuse its capacity
+  std::string m_number;
+};
+
+typedef BasicJSONReader<char> JSONReader;
+typedef BasicJSONReader<wchar_t> wJSONReader;
+${namespace_end}
+
+#endif
+"""
+	)
+
+class CppJSONWriter(CppDetailHeader):
+	# buffered writer used by "--encoder=stream"
+	filename = "JSONWriter.h"
+
+	content_template = CppTemplate(
+"""
+/*
+ * The MIT License (MIT)
+ *
+ * Copyright (c) 2013 Yuanyang Wu
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a
+ * copy of this software and associated documentation files (the "Software"),
+ * to deal in the Software without restriction, including without limitation
+ * the rights to use, copy, modify, merge, publish, distribute, sublicense,
+ * and/or sell copies of the Software, and to permit persons to whom the
+ * Software is furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included
+ * in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+ * THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+ * OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ * ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+ * OTHER DEALINGS IN THE SOFTWARE.
+ */
+
+
+#ifndef _${namespace_}_JSONWRITER_H_
+#define _${namespace_}_JSONWRITER_H_
+
+#include <clocale>
+#include <cstddef>
+#include <cstdio>
+#include <cstring>
+#include <cwctype>
+#include <ostream>
+#include <string>
+#include <boost/cstdint.hpp>
+
+${namespace_begin}
+// Writes JSON text of the generated classes without building a json_spirit
+// Value. Output is the same as json_spirit::write() with remove_trailing_zeros,
+// and pretty_print when isPrettyPrint is true.
+template <class Char>
+class BasicJSONWriter
+{
+public:
+  typedef std::basic_string<Char> String;
+
+  // output is buffered and written to os when the buffer is full, by Flush()
+  // or on destruction
+  explicit BasicJSONWriter(std::basic_ostream<Char> & os, bool isPrettyPrint = false)
+    : m_os(&os), m_buf(m_ownBuf), m_pretty(isPrettyPrint), m_depth(0), m_first(true), m_afterKey(false)
+  {
+    m_buf.reserve(FlushSize);
+  }
+
+  // output is appended to buffer
+  explicit BasicJSONWriter(String & buffer, bool isPrettyPrint = false)
+    : m_os(0), m_buf(buffer), m_pretty(isPrettyPrint), m_depth(0), m_first(true), m_afterKey(false)
+  {
+  }
+
+  ~BasicJSONWriter()
+  {
+    Flush();
+  }
+
+  void Flush()
+  {
+    if (m_os != 0 && !m_buf.empty())
+    {
+      m_os->write(m_buf.data(), m_buf.size());
+      m_buf.clear();
+    }
+  }
+
+  void BeginObject()
+  {
+    BeginValue();
+    m_buf += '{';
+    BeginContainer();
+  }
+
+  void EndObject()
+  {
+    EndContainer();
+    m_buf += '}';
+  }
+
+  void BeginArray()
+  {
+    BeginValue();
+    m_buf += '[';
+    BeginContainer();
+  }
+
+  void EndArray()
+  {
+    EndContainer();
+    m_buf += ']';
+  }
+
+  // quoted is the name already quoted and escaped, like "\\"name\\""
+  template <std::size_t N>
+  void Key(const Char (&quoted)[N])
+  {
+    BeginValue();
+    m_buf.append(quoted, N - 1);
+    if (m_pretty)
+    {
+      Append(" : ");
+    }
+    else
+    {
+      m_buf += ':';
+    }
+    m_afterKey = true;
+  }
+
+  void Null()
+  {
+    BeginValue();
+    Append("null");
+  }
+
+  void Value(bool value)
+  {
+    BeginValue();
+    Append(value ? "true" : "false");
+  }
+
+  void Value(int value)
+  {
+    Value(static_cast<boost::int64_t>(value));
+  }
+
+  void Value(boost::int64_t value)
+  {
+    BeginValue();
+    char buf[24];
+    char * end = buf + sizeof(buf);
+    char * begin = end;
+    boost::uint64_t u = static_cast<boost::uint64_t>(value);
+    if (value < 0)
+    {
+      u = 0 - u;
+    }
+    do
+    {
+      *--begin = static_cast<char>('0' + u % 10);
+      u /= 10;
+    } while (u != 0);
+    if (value < 0)
+    {
+      *--begin = '-';
+    }
+    m_buf.append(begin, end);
+  }
+
+  void Value(double value)
+  {
+    BeginValue();
+    // 16 digits with trailing zeros removed like json_spirit
+    char buf[40];
+    int n = snprintf(buf, sizeof(buf), "%#.16g", value);
+    if (n < 0 || n >= static_cast<int>(sizeof(buf)))
+    {
+      n = 0;
+      buf[0] = 0;
+    }
+    // snprintf() writes the decimal point of the C locale
+    const char * point = std::localeconv()->decimal_point;
+    if (point[0] != '.' || point[1] != 0)
+    {
+      char * found = std::strstr(buf, point);
+      if (found != 0)
+      {
+        std::size_t length = std::strlen(point);
+        *found = '.';
+        std::memmove(found + 1, found + length, std::strlen(found + length) + 1);
+        n -= static_cast<int>(length - 1);
+      }
+    }
+    std::size_t expStart = 0;
+    while (expStart < static_cast<std::size_t>(n) && buf[expStart] != 'e')
+    {
+      ++expStart;
+    }
+    std::size_t mantissaEnd = expStart;
+    if (expStart > 0)
+    {
+      std::size_t last = expStart - 1;
+      while (last != 0 && buf[last] == '0')
+      {
+        --last;
+      }
+      if (last != 0)
+      {
+        mantissaEnd = last + (buf[last] == '.' ? 2 : 1);
+      }
+    }
+    m_buf.append(buf, buf + mantissaEnd);
+    m_buf.append(buf + expStart, buf + n);
+  }
+
+  // text already encoded as JSON, like the one kept by detail::Lazy
+  template <class S>
+  void Raw(const S & text)
+  {
+    BeginValue();
+    m_buf.append(text.data(), text.size());
+  }
+
+  // strings of any allocator, like detail::ArenaString
+  template <class Allocator>
+  void Value(const std::basic_string<Char, std::char_traits<Char>, Allocator> & value)
+  {
+    BeginValue();
+    m_buf += '"';
+    for (typename std::basic_string<Char, std::char_traits<Char>, Allocator>::const_iterator it = value.begin();
+         value.end() != it; ++it)
+    {
+      const Char c = *it;
+      switch (c)
+      {
+      case '"': Append("\\\\\\""); break;
+      case '\\\\': Append("\\\\\\\\"); break;
+      case '\\b': Append("\\\\b"); break;
+      case '\\f': Append("\\\\f"); break;
+      case '\\n': Append("\\\\n"); break;
+      case '\\r': Append("\\\\r"); break;
+      case '\\t': Append("\\\\t"); break;
+      default:
+        if (c >= 0x20 && c < 0x7f)
+        {
+          m_buf += c;
+        }
+        else
+        {
+          AppendNonAscii(c);
+        }
+        break;
+      }
+    }
+    m_buf += '"';
+  }
+
+private:
+  enum { FlushSize = 65536 };
+
+  void Append(const char * s)
+  {
+    for (; *s != 0; ++s)
+    {
+      m_buf += static_cast<Char>(*s);
+    }
+  }
+
+  // same as json_spirit without raw_utf8
+  void AppendNonAscii(Char c)
+  {
+    const wint_t u = (c >= 0) ? c : 256 + c;
+    if (iswprint(u))
+    {
+      m_buf += c;
+      return;
+    }
+
+    static const char hex[] = "0123456789ABCDEF";
+    Append("\\\\u");
+    m_buf += static_cast<Char>(hex[(u >> 12) & 0xF]);
+    m_buf += static_cast<Char>(hex[(u >> 8) & 0xF]);
+    m_buf += static_cast<Char>(hex[(u >> 4) & 0xF]);
+    m_buf += static_cast<Char>(hex[u & 0xF]);
+  }
+
+  void NewLine()
+  {
+    if (m_pretty)
+    {
+      m_buf += '\\n';
+    }
+  }
+
+  void Indent()
+  {
+    if (m_pretty)
+    {
+      m_buf.append(4 * m_depth, ' ');
+    }
+  }
+
+  // separator and indentation in front of a member or an element
+  void BeginValue()
+  {
+    if (m_afterKey)
+    {
+      m_afterKey = false;
+      return;
+    }
+    if (m_os != 0 && m_buf.size() >= FlushSize)
+    {
+      Flush();
+    }
+    if (m_depth == 0)
+    {
+      return;
+    }
+    if (!m_first)
+    {
+      m_buf += ',';
+      NewLine();
+    }
+    Indent();
+    m_first = false;
+  }
+
+  void BeginContainer()
+  {
+    NewLine();
+    ++m_depth;
+    m_first = true;
+  }
+
+  void EndContainer()
+  {
+    if (!m_first)
+    {
+      NewLine();
+    }
+    --m_depth;
+    Indent();
+    // the container is an item of its parent
+    m_first = false;
+  }
+
+  std::basic_ostream<Char> * m_os;
+  String m_ownBuf;
+  String & m_buf;
+  bool m_pretty;
+  std::size_t m_depth;
+  bool m_first;
+  bool m_afterKey;
+};
+
+typedef BasicJSONWriter<char> JSONWriter;
+typedef BasicJSONWriter<wchar_t> wJSONWriter;
+${namespace_end}
+
+#endif
+"""
+	)
+
+class CppMappedFile(CppDetailHeader):
+	# read-only file mapping used by DecodeJSONFile()
+	filename = "MappedFile.h"
+
+	content_template = CppTemplate(
+"""
+/*
+ * The MIT License (MIT)
+ *
+ * Copyright (c) 2013 Yuanyang Wu
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a
+ * copy of this software and associated documentation files (the "Software"),
+ * to deal in the Software without restriction, including without limitation
+ * the rights to use, copy, modify, merge, publish, distribute, sublicense,
+ * and/or sell copies of the Software, and to permit persons to whom the
+ * Software is furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included
+ * in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+ * THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+ * OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ * ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+ * OTHER DEALINGS IN THE SOFTWARE.
+ */
+
+
+#ifndef _${namespace_}_MAPPEDFILE_H_
+#define _${namespace_}_MAPPEDFILE_H_
+
+#include <cstddef>
+#include <stdexcept>
+#include <string>
+#ifdef _WIN32
+#include <windows.h>
+#else
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+
+${namespace_begin}
+// Maps a whole file read-only, so that it is decoded from memory without
+// reading it through a stream. Errors throw std::runtime_error.
+class MappedFile
+{
+public:
+  explicit MappedFile(const char * path)
+    : m_data(0), m_size(0)
+#ifdef _WIN32
+    , m_file(INVALID_HANDLE_VALUE), m_mapping(0)
+#else
+    , m_fd(-1)
+#endif
+  {
+    Open(path);
+  }
+
+  ~MappedFile()
+  {
+    Close();
+  }
+
+  const char * begin() const
+  {
+    return m_data;
+  }
+
+  const char * end() const
+  {
+    return m_data + m_size;
+  }
+
+private:
+  MappedFile(const MappedFile &);
+  MappedFile & operator=(const MappedFile &);
+
+  void Fail(const char * what, const char * path)
+  {
+    Close();
+    throw std::runtime_error(std::string(what) + path);
+  }
+
+#ifdef _WIN32
+  void Open(const char * path)
+  {
+    m_file = ::CreateFileA(path, GENERIC_READ, FILE_SHARE_READ, 0, OPEN_EXISTING, FILE_FLAG_SEQUENTIAL_SCAN, 0);
+    if (m_file == INVALID_HANDLE_VALUE)
+    {
+      Fail("cannot open ", path);
+    }
+    LARGE_INTEGER size;
+    if (!::GetFileSizeEx(m_file, &size))
+    {
+      Fail("cannot get size of ", path);
+    }
+    m_size = static_cast<std::size_t>(size.QuadPart);
+    if (m_size == 0)
+    {
+      // empty files can not be mapped
+      return;
+    }
+    m_mapping = ::CreateFileMappingA(m_file, 0, PAGE_READONLY, 0, 0, 0);
+    if (m_mapping == 0)
+    {
+      Fail("cannot map ", path);
+    }
+    m_data = static_cast<const char *>(::MapViewOfFile(m_mapping, FILE_MAP_READ, 0, 0, 0));
+    if (m_data == 0)
+    {
+      Fail("cannot map ", path);
+    }
+  }
+
+  void Close()
+  {
+    if (m_data != 0)
+    {
+      ::UnmapViewOfFile(m_data);
+      m_data = 0;
+    }
+    if (m_mapping != 0)
+    {
+      ::CloseHandle(m_mapping);
+      m_mapping = 0;
+    }
+    if (m_file != INVALID_HANDLE_VALUE)
+    {
+      ::CloseHandle(m_file);
+      m_file = INVALID_HANDLE_VALUE;
+    }
+  }
+#else
+  void Open(const char * path)
+  {
+    m_fd = ::open(path, O_RDONLY);
+    if (m_fd < 0)
+    {
+      Fail("cannot open ", path);
+    }
+    struct stat st;
+    if (::fstat(m_fd, &st) != 0)
+    {
+      Fail("cannot get size of ", path);
+    }
+    m_size = static_cast<std::size_t>(st.st_size);
+    if (m_size == 0)
+    {
+      // empty files can not be mapped
+      return;
+    }
+    void * data = ::mmap(0, m_size, PROT_READ, MAP_PRIVATE, m_fd, 0);
+    if (data == MAP_FAILED)
+    {
+      Fail("cannot map ", path);
+    }
+    m_data = static_cast<const char *>(data);
+    ::posix_madvise(data, m_size, POSIX_MADV_SEQUENTIAL);
+  }
+
+  void Close()
+  {
+    if (m_data != 0)
+    {
+      ::munmap(const_cast<char *>(m_data), m_size);
+      m_data = 0;
+    }
+    if (m_fd >= 0)
+    {
+      ::close(m_fd);
+      m_fd = -1;
+    }
+  }
+#endif
+
+  const char * m_data;
+  std::size_t m_size;
+#ifdef _WIN32
+  HANDLE m_file;
+  HANDLE m_mapping;
+#else
+  int m_fd;
+#endif
+};
+${namespace_end}
+
+#endif
+"""
+	)
+
+class CppArena(CppDetailHeader):
+	# monotonic memory and STL allocator used by "--allocator=arena"
+	filename = "Arena.h"
+
+	content_template = CppTemplate(
+"""
+/*
+ * The MIT License (MIT)
+ *
+ * Copyright (c) 2013 Yuanyang Wu
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a
+ * copy of this software and associated documentation files (the "Software"),
+ * to deal in the Software without restriction, including without limitation
+ * the rights to use, copy, modify, merge, publish, distribute, sublicense,
+ * and/or sell copies of the Software, and to permit persons to whom the
+ * Software is furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included
+ * in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+ * THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+ * OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ * ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+ * OTHER DEALINGS IN THE SOFTWARE.
+ */
+
+
+#ifndef _${namespace_}_ARENA_H_
+#define _${namespace_}_ARENA_H_
+
+#include <cstddef>
+#include <new>
+#include <string>
+#if __cplusplus >= 201103L
+#include <type_traits>
+#define _${namespace_}_ARENA_THREAD_LOCAL thread_local
+#elif defined(_MSC_VER)
+#define _${namespace_}_ARENA_THREAD_LOCAL __declspec(thread)
+#else
+#define _${namespace_}_ARENA_THREAD_LOCAL __thread
+#endif
+
+${namespace_begin}
+// Monotonic memory for decoded messages. Allocate() takes memory from large
+// blocks and nothing is freed before Release() or destruction, which free all
+// blocks at once. Objects using the memory must not be used after that.
+// An Arena is used by one thread at a time.
+class Arena
+{
+public:
+  explicit Arena(std::size_t blockSize = 65536)
+    : m_blocks(0), m_next(0), m_end(0), m_blockSize(blockSize)
+  {
+  }
+
+  ~Arena()
+  {
+    FreeBlocks(m_blocks);
+  }
+
+  void * Allocate(std::size_t size)
+  {
+    size = (size + Alignment - 1) / Alignment * Alignment;
+    if (static_cast<std::size_t>(m_end - m_next) < size)
+    {
+      AddBlock(size);
+    }
+    void * p = m_next;
+    m_next += size;
+    return p;
+  }
+
+  // frees all memory but the largest block, which is reused by next message
+  void Release()
+  {
+    if (m_blocks != 0)
+    {
+      FreeBlocks(m_blocks->next);
+      m_blocks->next = 0;
+      m_next = BlockData(m_blocks);
+    }
+  }
+
+  // arena made current in this thread by ArenaScope, 0 for the heap
+  static Arena * Current()
+  {
+    return CurrentRef();
+  }
+
+private:
+  friend class ArenaScope;
+
+  struct Block
+  {
+    Block * next;
+    std::size_t size;
+  };
+
+  // allocations are aligned for any field type
+  enum { Alignment = 16 };
+  enum { HeaderSize = (sizeof(Block) + Alignment - 1) / Alignment * Alignment };
+
+  Arena(const Arena &);
+  Arena & operator=(const Arena &);
+
+  static Arena *& CurrentRef()
+  {
+    static _${namespace_}_ARENA_THREAD_LOCAL Arena * current = 0;
+    return current;
+  }
+
+  static char * BlockData(Block * block)
+  {
+    return reinterpret_cast<char *>(block) + HeaderSize;
+  }
+
+  void AddBlock(std::size_t size)
+  {
+    // each block is twice the last one, so that a message needs few of them
+    std::size_t blockSize = (m_blocks == 0) ? m_blockSize : m_blocks->size * 2;
+    if (blockSize < size)
+    {
+      blockSize = size;
+    }
+    Block * block = static_cast<Block *>(::operator new(HeaderSize + blockSize));
+    block->next = m_blocks;
+    block->size = blockSize;
+    m_blocks = block;
+    m_next = BlockData(block);
+    m_end = m_next + blockSize;
+  }
+
+  static void FreeBlocks(Block * block)
+  {
+    while (block != 0)
+    {
+      Block * next = block->next;
+      ::operator delete(block);
+      block = next;
+    }
+  }
+
+  // last added block first
+  Block * m_blocks;
+  char * m_next;
+  char * m_end;
+  std::size_t m_blockSize;
+};
+
+// Makes arena current in this thread while alive. Strings and arrays of
+// generated classes created meanwhile, by decoding or otherwise, take their
+// memory from it.
+class ArenaScope
+{
+public:
+  explicit ArenaScope(Arena & arena)
+    : m_previous(Arena::CurrentRef())
+  {
+    Arena::CurrentRef() = &arena;
+  }
+
+  ~ArenaScope()
+  {
+    Arena::CurrentRef() = m_previous;
+  }
+
+private:
+  ArenaScope(const ArenaScope &);
+  ArenaScope & operator=(const ArenaScope &);
+
+  Arena * m_previous;
+};
+
+// STL allocator of the arena current when it is created, or of the heap when
+// there is none. deallocate() leaves arena memory to the arena.
+template <class T>
+class ArenaAllocator
+{
+public:
+  typedef T value_type;
+  typedef T * pointer;
+  typedef const T * const_pointer;
+  typedef T & reference;
+  typedef const T & const_reference;
+  typedef std::size_t size_type;
+  typedef std::ptrdiff_t difference_type;
+#if __cplusplus >= 201103L
+  typedef std::true_type propagate_on_container_swap;
+#endif
+
+  template <class U>
+  struct rebind
+  {
+    typedef ArenaAllocator<U> other;
+  };
+
+  ArenaAllocator()
+    : m_arena(Arena::Current())
+  {
+  }
+
+  template <class U>
+  ArenaAllocator(const ArenaAllocator<U> & other)
+    : m_arena(other.arena())
+  {
+  }
+
+  // a copied container uses the arena current at the time of copy
+  ArenaAllocator select_on_container_copy_construction() const
+  {
+    return ArenaAllocator();
+  }
+
+  pointer address(reference x) const
+  {
+    return &x;
+  }
+
+  const_pointer address(const_reference x) const
+  {
+    return &x;
+  }
+
+  pointer allocate(size_type n, const void * = 0)
+  {
+    if (m_arena == 0)
+    {
+      return static_cast<pointer>(::operator new(n * sizeof(T)));
+    }
+    return static_cast<pointer>(m_arena->Allocate(n * sizeof(T)));
+  }
+
+  void deallocate(pointer p, size_type)
+  {
+    if (m_arena == 0)
+    {
+      ::operator delete(p);
+    }
+  }
+
+  size_type max_size() const
+  {
+    return static_cast<size_type>(-1) / sizeof(T);
+  }
+
+  void construct(pointer p, const T & value)
+  {
+    new (static_cast<void *>(p)) T(value);
+  }
+
+  void destroy(pointer p)
+  {
+    p->~T();
+  }
+
+  Arena * arena() const
+  {
+    return m_arena;
+  }
+
+private:
+  Arena * m_arena;
+};
+
+template <class T, class U>
+bool operator==(const ArenaAllocator<T> & a, const ArenaAllocator<U> & b)
+{
+  return a.arena() == b.arena();
+}
+
+template <class T, class U>
+bool operator!=(const ArenaAllocator<T> & a, const ArenaAllocator<U> & b)
+{
+  return a.arena() != b.arena();
+}
+
+typedef std::basic_string<char, std::char_traits<char>, ArenaAllocator<char> > ArenaString;
+typedef std::basic_string<wchar_t, std::char_traits<wchar_t>, ArenaAllocator<wchar_t> > wArenaString;
+
+// json_spirit values hold strings of std::allocator
+template <class Char>
+std::basic_string<Char, std::char_traits<Char>, ArenaAllocator<Char> > ToArenaString(const std::basic_string<Char> & s)
+{
+  return std::basic_string<Char, std::char_traits<Char>, ArenaAllocator<Char> >(s.data(), s.size());
+}
+
+template <class Char>
+std::basic_string<Char> ToStdString(const std::basic_string<Char, std::char_traits<Char>, ArenaAllocator<Char> > & s)
+{
+  return std::basic_string<Char>(s.data(), s.size());
+}
+${namespace_end}
+
+#endif
+"""
+	)
+
+class CppParallel(CppDetailHeader):
+	# thread helpers of DecodeJSONParallel() and EncodeJSONParallel(), "--parallel"
+	filename = "Parallel.h"
+
+	content_template = CppTemplate(
+"""
+/*
+ * The MIT License (MIT)
+ *
+ * Copyright (c) 2013 Yuanyang Wu
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a
+ * copy of this software and associated documentation files (the "Software"),
+ * to deal in the Software without restriction, including without limitation
+ * the rights to use, copy, modify, merge, publish, distribute, sublicense,
+ * and/or sell copies of the Software, and to permit persons to whom the
+ * Software is furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included
+ * in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+ * THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+ * OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ * ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+ * OTHER DEALINGS IN THE SOFTWARE.
+ */
+
+
+#ifndef _${namespace_}_PARALLEL_H_
+#define _${namespace_}_PARALLEL_H_
+
+#include <cstddef>
+#include <exception>
+#include <ostream>
+#include <stdexcept>
+#include <string>
+#include <utility>
+#include <vector>
+#include <boost/shared_ptr.hpp>
+#include <boost/thread/thread.hpp>
+
+${namespace_begin}
+// 0 threads means one per processor
+inline unsigned int ThreadCount(unsigned int threads)
+{
+  if (threads == 0)
+  {
+    threads = boost::thread::hardware_concurrency();
+  }
+  return (threads == 0) ? 1 : threads;
+}
+
+// runs task(i) of one index, keeping the error for the calling thread
+template <class Task>
+class ParallelTask
+{
+public:
+  ParallelTask(Task & task, std::size_t index, std::string & error)
+    : m_task(&task), m_index(index), m_error(&error)
+  {
+  }
+
+  void operator()()
+  {
+    try
+    {
+      (*m_task)(m_index);
+    }
+    catch (const std::exception & e)
+    {
+      *m_error = std::string("parallel task failed: ") + e.what();
+    }
+    catch (...)
+    {
+      *m_error = "parallel task failed";
+    }
+  }
+
+private:
+  Task * m_task;
+  std::size_t m_index;
+  std::string * m_error;
+};
+
+// runs task(0) .. task(count - 1) on count threads, task(0) on the calling one.
+// The first error of a task is thrown as std::runtime_error after all finish.
+template <class Task>
+void ParallelFor(std::size_t count, Task & task)
+{
+  std::vector<std::string> errors(count);
+  boost::thread_group threads;
+  try
+  {
+    for (std::size_t i = 1; i < count; ++i)
+    {
+      threads.create_thread(ParallelTask<Task>(task, i, errors[i]));
+    }
+  }
+  catch (...)
+  {
+    threads.join_all();
+    throw;
+  }
+  if (count > 0)
+  {
+    ParallelTask<Task>(task, 0, errors[0])();
+  }
+  threads.join_all();
+
+  for (std::size_t i = 0; i < count; ++i)
+  {
+    if (!errors[i].empty())
+    {
+      throw std::runtime_error(errors[i]);
+    }
+  }
+}
+
+template <class Char>
+bool IsJSONSpace(Char c)
+{
+  return c == ' ' || c == '\\t' || c == '\\n' || c == '\\r';
+}
+
+// Splits the elements of JSON array text into at most count ranges of about
+// the same length, cutting at commas between elements. Elements themselves
+// are checked when the ranges are decoded.
+template <class Char>
+void SplitArray(const Char * begin, const Char * end, std::size_t count,
+    std::vector<std::pair<const Char *, const Char *> > & ranges)
+{
+  ranges.clear();
+  const Char * p = begin;
+  while (p != end && IsJSONSpace(*p))
+  {
+    ++p;
+  }
+  if (p == end || *p != '[')
+  {
+    throw std::runtime_error("JSON decoding failed: text is not an array");
+  }
+
+  const Char * elements = ++p;
+  const Char * first = elements;
+  const std::size_t size = end - elements;
+  std::size_t depth = 0;
+  bool inString = false;
+  for (; p != end; ++p)
+  {
+    const Char c = *p;
+    if (inString)
+    {
+      if (c == '\\\\')
+      {
+        if (++p == end)
+        {
+          break;
+        }
+      }
+      else if (c == '"')
+      {
+        inString = false;
+      }
+      continue;
+    }
+
+    if (c == '"')
+    {
+      inString = true;
+    }
+    else if (c == '[' || c == '{')
+    {
+      ++depth;
+    }
+    else if (c == ']' || c == '}')
+    {
+      if (depth > 0)
+      {
+        --depth;
+        continue;
+      }
+      if (c != ']')
+      {
+        throw std::runtime_error("JSON decoding failed: unexpected character");
+      }
+      ranges.push_back(std::make_pair(first, p));
+      while (++p != end && IsJSONSpace(*p))
+      {
+      }
+      if (p != end)
+      {
+        throw std::runtime_error("JSON decoding failed: text after the array");
+      }
+      return;
+    }
+    else if (c == ',' && depth == 0 && ranges.size() + 1 < count
+        && static_cast<std::size_t>(p - elements) >= size / count * (ranges.size() + 1))
+    {
+      ranges.push_back(std::make_pair(first, p));
+      first = p + 1;
+    }
+  }
+  throw std::runtime_error("JSON decoding failed: unterminated array");
+}
+
+// decodes range i as a new Array, which is created on the decoding thread
+// so that an Arena current in the calling thread is only used by that thread
+template <class Array, class Char>
+class DecodeArrayTask
+{
+public:
+  DecodeArrayTask(const std::vector<std::pair<const Char *, const Char *> > & ranges,
+      std::vector<boost::shared_ptr<Array> > & parts)
+    : m_ranges(ranges), m_parts(parts)
+  {
+  }
+
+  void operator()(std::size_t i)
+  {
+    std::basic_string<Char> text;
+    text.reserve(m_ranges[i].second - m_ranges[i].first + 2);
+    text += Char('[');
+    text.append(m_ranges[i].first, m_ranges[i].second);
+    text += Char(']');
+    boost::shared_ptr<Array> part(new Array());
+    part->DecodeJSON(text.data(), text.data() + text.size());
+    m_parts[i] = part;
+  }
+
+private:
+  const std::vector<std::pair<const Char *, const Char *> > & m_ranges;
+  std::vector<boost::shared_ptr<Array> > & m_parts;
+};
+
+// decodes the elements of JSON array text into up to threads parts in order
+template <class Array, class Char>
+void DecodeArrayParts(const Char * begin, const Char * end, unsigned int threads,
+    std::vector<boost::shared_ptr<Array> > & parts)
+{
+  std::vector<std::pair<const Char *, const Char *> > ranges;
+  SplitArray(begin, end, threads, ranges);
+  parts.clear();
+  parts.resize(ranges.size());
+  DecodeArrayTask<Array, Char> task(ranges, parts);
+  ParallelFor(ranges.size(), task);
+}
+
+// encodes elements of part i of count parts by EncodeJSON(text, first, last)
+template <class Array, class Char>
+class EncodeArrayTask
+{
+public:
+  EncodeArrayTask(const Array & array, std::vector<std::basic_string<Char> > & parts)
+    : m_array(array), m_parts(parts)
+  {
+  }
+
+  void operator()(std::size_t i)
+  {
+    const std::size_t size = m_array.m_array.size();
+    const std::size_t count = m_parts.size();
+    m_array.EncodeJSON(m_parts[i], size * i / count, size * (i + 1) / count);
+  }
+
+private:
+  const Array & m_array;
+  std::vector<std::basic_string<Char> > & m_parts;
+};
+
+// writes array as one JSON array, its parts encoded on up to threads threads
+template <class Array, class Char>
+void EncodeArrayParts(const Array & array, std::basic_ostream<Char> & os, unsigned int threads)
+{
+  std::size_t count = threads;
+  if (count > array.m_array.size())
+  {
+    count = array.m_array.size();
+  }
+  if (count == 0)
+  {
+    count = 1;
+  }
+
+  std::vector<std::basic_string<Char> > parts(count);
+  EncodeArrayTask<Array, Char> task(array, parts);
+  ParallelFor(count, task);
+
+  // parts are arrays, joined without their brackets
+  os.put(os.widen('['));
+  bool isFirst = true;
+  for (std::size_t i = 0; i < count; ++i)
+  {
+    if (parts[i].size() <= 2)
+    {
+      continue;
+    }
+    if (!isFirst)
+    {
+      os.put(os.widen(','));
+    }
+    os.write(parts[i].data() + 1, parts[i].size() - 2);
+    isFirst = false;
+  }
+  os.put(os.widen(']'));
+}
+${namespace_end}
+
+#endif
+"""
+	)
+
+class CppLazy(CppDetailHeader):
+	# object and array fields decoded on first access, "--lazy"
+	filename = "Lazy.h"
+
+	content_template = CppTemplate(
+"""
+/*
+ * The MIT License (MIT)
+ *
+ * Copyright (c) 2013 Yuanyang Wu
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a
+ * copy of this software and associated documentation files (the "Software"),
+ * to deal in the Software without restriction, including without limitation
+ * the rights to use, copy, modify, merge, publish, distribute, sublicense,
+ * and/or sell copies of the Software, and to permit persons to whom the
+ * Software is furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included
+ * in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+ * THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+ * OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ * ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+ * OTHER DEALINGS IN THE SOFTWARE.
+ */
+
+
+#ifndef _${namespace_}_LAZY_H_
+#define _${namespace_}_LAZY_H_
+
+${namespace_begin}
+// Object or array T kept as its JSON text String until get() decodes it by
+// T::DecodeJSON(begin, end). Text and value are mutable so that const get()
+// decodes too, which makes const access of one Lazy unsafe from two threads.
+template <class T, class String>
+class Lazy
+{
+public:
+  const T & get() const
+  {
+    Decode();
+    return m_value;
+  }
+
+  T & get()
+  {
+    Decode();
+    return m_value;
+  }
+
+  // true when the text is not decoded yet
+  bool is_raw() const
+  {
+    return !m_raw.empty();
+  }
+
+  const String & raw() const
+  {
+    return m_raw;
+  }
+
+  // text to decode on next get(), the value decoded before is dropped
+  String & mutable_raw()
+  {
+    m_value.Clear();
+    return m_raw;
+  }
+
+  void Clear()
+  {
+    m_raw.clear();
+    m_value.Clear();
+  }
+
+private:
+  void Decode() const
+  {
+    if (m_raw.empty())
+    {
+      return;
+    }
+    m_value.Clear();
+    m_value.DecodeJSON(m_raw.data(), m_raw.data() + m_raw.size());
+    m_raw.clear();
+  }
+
+  mutable T m_value;
+  mutable String m_raw;
+};
+${namespace_end}
+
+#endif
+"""
+	)
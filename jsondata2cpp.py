@@ -24,10 +24,280 @@
 
 import string
 import os.path
+import sys
 import json
+import random
 import types
 
-from jsoncpphandler import JSONBaseHandler, CppHeaderHandler, CppBodyBuilder, CppTest
+from jsoncpphandler import JSONBaseHandler, CppCodeOptions, CppHeaderHandler, CppBodyBuilder, CppTest, FileWriter, MemoryWriter
+from jsongencache import JSONGenCache
+from jsonmanifest import JSONManifest
+from jsonprofile import JSONProfiler
+from jsonstream import JSONEventReader
+
+# A shape is a JSON value standing for all values it was merged from, so
+# JSONDataWalker walks it like a normal JSON value. Object has union of keys,
+# array has at most one element merged from all elements.
+class JSONShape:
+	container_types = [types.DictType, types.ListType]
+
+	def type_name(rawjson):
+		if type(rawjson) in [types.IntType, types.LongType]:
+			return "int"
+		return type(rawjson).__name__
+
+	def is_unknown(rawjson):
+		# null and empty object/array tell nothing about type
+		if type(rawjson) in [types.DictType, types.ListType]:
+			return len(rawjson) == 0
+		return rawjson == None
+
+	def from_json(rawjson):
+		return JSONShape.merge(None, rawjson)
+
+	def child_path(path, key):
+		if path == "":
+			return key
+		return path + "." + key
+
+	def merge(shape, rawjson, optional_paths = None, path = ""):
+		# merge JSON value (or another shape) into shape, shape may be updated in place.
+		# With optional_paths, paths of object keys missing or null in some value are added.
+		type_a = type(shape)
+		if type_a == type(rawjson) and type_a not in JSONShape.container_types:
+			# fast path for most values
+			if type_a == types.IntType and abs(rawjson) > abs(shape):
+				return rawjson
+			if rawjson != None and shape == None:
+				return rawjson
+			return shape
+
+		if JSONShape.is_unknown(rawjson):
+			if shape == None:
+				return rawjson
+			return shape
+
+		is_new = JSONShape.is_unknown(shape)
+		if is_new:
+			if type(rawjson) == types.DictType:
+				shape = {}
+			elif type(rawjson) == types.ListType:
+				shape = [None]
+			else:
+				return rawjson
+		else:
+			type_a = JSONShape.type_name(shape)
+			type_b = JSONShape.type_name(rawjson)
+			if type_a != type_b:
+				# int is widened to float
+				if set([type_a, type_b]) == set(["int", "float"]):
+					if type_a == "float":
+						return shape
+					return rawjson
+				assert False, ("Conflicting types: " + type_a + " " + repr(shape) + ", " + type_b + " " + repr(rawjson))
+
+		if type(shape) == types.DictType:
+			if optional_paths != None:
+				for key in shape.keys():
+					if (not is_new) and rawjson.get(key) == None:
+						optional_paths.add(JSONShape.child_path(path, key))
+				for key, value in rawjson.items():
+					if ((not is_new) and (not shape.has_key(key))) or value == None:
+						optional_paths.add(JSONShape.child_path(path, key))
+				for key, value in rawjson.items():
+					shape[key] = JSONShape.merge(shape.get(key), value, optional_paths, JSONShape.child_path(path, key))
+				return shape
+
+			for key, value in rawjson.items():
+				shape[key] = JSONShape.merge(shape.get(key), value)
+			return shape
+
+		if type(shape) == types.ListType:
+			merged = shape[0]
+			for value in rawjson:
+				merged = JSONShape.merge(merged, value, optional_paths, path + "[]")
+			if JSONShape.is_unknown(merged):
+				return []
+			shape[0] = merged
+			return shape
+
+		# keep the largest magnitude to choose C++ integer type
+		if JSONShape.type_name(shape) == "int" and abs(rawjson) > abs(shape):
+			return rawjson
+		return shape
+
+	type_name = staticmethod(type_name)
+	is_unknown = staticmethod(is_unknown)
+	from_json = staticmethod(from_json)
+	child_path = staticmethod(child_path)
+	merge = staticmethod(merge)
+
+# Build the shape of a JSON document from JSONEventReader events. Array
+# elements are merged as soon as they are parsed, so memory is bounded by
+# the shape instead of the document. With sample_size, only that many
+# array elements chosen by reservoir sampling are merged, the others are
+# skipped without being built.
+class JSONShapeBuilder:
+	def __init__(self, sample_size = 0, seed = 0):
+		self.sample_size = sample_size
+		self.random = random.Random(seed)
+
+	def build(self, events):
+		self.stack = []
+		self.root = None
+		skip_depth = 0
+		for event, value in events:
+			if skip_depth > 0:
+				if event in ["start_map", "start_array"]:
+					skip_depth += 1
+				elif event in ["end_map", "end_array"]:
+					skip_depth -= 1
+				continue
+
+			if event in ["start_map", "start_array", "value"] and not self.begin_value():
+				# array element not sampled
+				if event != "value":
+					skip_depth = 1
+				continue
+
+			if event == "start_map":
+				self.stack.append({"type": "map", "value": {}, "key": None})
+			elif event == "start_array":
+				self.stack.append({"type": "array", "merged": None, "count": 0, "reservoir": [], "slot": None})
+			elif event == "map_key":
+				self.stack[-1]["key"] = value
+			elif event == "end_map":
+				self.end_value(self.stack.pop()["value"])
+			elif event == "end_array":
+				frame = self.stack.pop()
+				merged = frame["merged"]
+				for element in frame["reservoir"]:
+					merged = JSONShape.merge(merged, element)
+				self.end_value(JSONShape.from_json([merged]))
+			else:
+				self.end_value(value)
+
+		return self.root
+
+	def begin_value(self):
+		if len(self.stack) == 0 or self.stack[-1]["type"] != "array":
+			return True
+
+		frame = self.stack[-1]
+		count = frame["count"]
+		frame["count"] = count + 1
+		if self.sample_size <= 0:
+			return True
+
+		if count < self.sample_size:
+			frame["reservoir"].append(None)
+			frame["slot"] = count
+			return True
+
+		slot = self.random.randint(0, count)
+		if slot < self.sample_size:
+			frame["slot"] = slot
+			return True
+		return False
+
+	def end_value(self, value):
+		if len(self.stack) == 0:
+			self.root = JSONShape.from_json(value)
+			return None
+
+		frame = self.stack[-1]
+		if frame["type"] == "map":
+			frame["value"][frame["key"]] = JSONShape.merge(frame["value"].get(frame["key"]), value)
+		elif self.sample_size > 0:
+			frame["reservoir"][frame["slot"]] = JSONShape.from_json(value)
+		else:
+			frame["merged"] = JSONShape.merge(frame["merged"], value)
+
+# Keeps walker events of values on projected paths, their ancestors and
+# descendants, so that classes have only those fields and decoders skip the
+# other values. Paths are like JSONShape paths, for example, "a.b" or "a.c[].d".
+class JSONProjection:
+	def __init__(self, paths):
+		self.paths = paths
+		# projected paths the walker has reached
+		self.found = set()
+
+	def path(parent_names, name):
+		# path of a value, parent_names[0] is the root class
+		path = ""
+		for n in parent_names[1:] + [name]:
+			if n == None:
+				path += "[]"
+			else:
+				path = JSONShape.child_path(path, n)
+		return path
+
+	def is_under(path, ancestor):
+		return ancestor == "" or path.startswith(ancestor + ".") or path.startswith(ancestor + "[]")
+
+	def is_selected(self, parent_names, name):
+		if len(parent_names) == 0:
+			return True
+
+		path = JSONProjection.path(parent_names, name)
+		selected = False
+		for projected in self.paths:
+			if path == projected:
+				self.found.add(projected)
+				return True
+			if JSONProjection.is_under(path, projected) or JSONProjection.is_under(projected, path):
+				selected = True
+		return selected
+
+	def unknown_paths(self):
+		return sorted(set(self.paths) - self.found)
+
+	def wrap_handlers(self, handlers):
+		return [JSONProjectionHandler(self, handler) for handler in handlers]
+
+	path = staticmethod(path)
+	is_under = staticmethod(is_under)
+
+class JSONProjectionHandler(JSONBaseHandler):
+	def __init__(self, projection, handler):
+		self.projection = projection
+		self.handler = handler
+
+	def handle_object_start(self, parent_names, name, object_type_name = None, base_type_name = None):
+		if self.projection.is_selected(parent_names, name):
+			self.handler.handle_object_start(parent_names, name, object_type_name, base_type_name)
+
+	def handle_object_end(self, parent_names, name, object_type_name = None):
+		if self.projection.is_selected(parent_names, name):
+			self.handler.handle_object_end(parent_names, name, object_type_name)
+
+	def handle_array_start(self, parent_names, name, element_type_name = None):
+		if self.projection.is_selected(parent_names, name):
+			self.handler.handle_array_start(parent_names, name, element_type_name)
+
+	def handle_array_end(self, parent_names, name, element_type_name = None):
+		if self.projection.is_selected(parent_names, name):
+			self.handler.handle_array_end(parent_names, name, element_type_name)
+
+	def handle_boolean(self, parent_names, name):
+		if self.projection.is_selected(parent_names, name):
+			self.handler.handle_boolean(parent_names, name)
+
+	def handle_float(self, parent_names, name):
+		if self.projection.is_selected(parent_names, name):
+			self.handler.handle_float(parent_names, name)
+
+	def handle_int(self, parent_names, name):
+		if self.projection.is_selected(parent_names, name):
+			self.handler.handle_int(parent_names, name)
+
+	def handle_int64(self, parent_names, name):
+		if self.projection.is_selected(parent_names, name):
+			self.handler.handle_int64(parent_names, name)
+
+	def handle_string(self, parent_names, name):
+		if self.projection.is_selected(parent_names, name):
+			self.handler.handle_string(parent_names, name)
 
 class JSONDataWalker:
 	def __init__(self, rawjson, rootname):
@@ -109,8 +379,13 @@ class JSONDataWalker:
 	def walk_int(self, parent_names, name, rawjson):
 		assert type(rawjson) in [types.IntType, types.LongType]
 		assert not self.is_null_type(rawjson)
+		# JSON shape keeps the value of largest magnitude
+		is_int64 = (rawjson < -2147483648) or (rawjson > 2147483647)
 		for handler in self.json_handlers:
-			handler.handle_int(parent_names, name)
+			if is_int64:
+				handler.handle_int64(parent_names, name)
+			else:
+				handler.handle_int(parent_names, name)
 
 	def walk_string(self, parent_names, name, rawjson):
 		assert type(rawjson) == types.UnicodeType
@@ -124,15 +399,23 @@ class JSONDataWalker:
 		return rawjson == None
 
 class JSONFile:
-	def __init__(self, filepath):
+	def __init__(self, filepath, stream = False, sample_size = 0):
 		self.filepath = filepath
+		self.stream = stream
+		self.sample_size = sample_size
 		self.rawjson = self.decode_json()
 		self.classname = self.generate_classname()
 		self.jsonwalker = self.generate_jsonwalker()
 
 	def decode_json(self):
-		f = open(self.filepath)
-		return json.load(f)
+		f = open(self.filepath, "rb")
+		if self.stream:
+			builder = JSONShapeBuilder(self.sample_size)
+			rawjson = builder.build(JSONEventReader(f, decode_containers = True).events())
+		else:
+			rawjson = json.load(f)
+		f.close()
+		return rawjson
 
 	def generate_classname(self):
 		return os.path.basename(self.filepath).split(".")[0]
@@ -140,6 +423,92 @@ class JSONFile:
 	def generate_jsonwalker(self):
 		return JSONDataWalker(self.rawjson, self.classname)
 
+# Infer one class from many JSON samples, either all "*.json" files in a
+# directory or all lines of a newline-delimited JSON file. Samples are split
+# among worker processes whose shapes are merged at last.
+class JSONCorpus:
+	def __init__(self, path, jobs = 1):
+		self.path = path
+		self.jobs = jobs
+		self.optional_paths = set()
+		self.rawjson = self.infer()
+		self.classname = self.generate_classname()
+		self.jsonwalker = self.generate_jsonwalker()
+
+	def split_parts(self):
+		if os.path.isdir(self.path):
+			filepaths = [os.path.join(self.path, f) for f in sorted(os.listdir(self.path)) if f.endswith(".json")]
+			return [(infer_json_files, filepaths[i::self.jobs]) for i in xrange(0, self.jobs)]
+
+		# byte ranges of NDJSON file
+		size = os.path.getsize(self.path)
+		bounds = [size * i / self.jobs for i in xrange(0, self.jobs + 1)]
+		return [(infer_ndjson_range, (self.path, bounds[i], bounds[i + 1])) for i in xrange(0, self.jobs)]
+
+	def infer(self):
+		parts = self.split_parts()
+		if self.jobs > 1:
+			import multiprocessing
+			pool = multiprocessing.Pool(self.jobs)
+			results = pool.map(infer_corpus_part, parts)
+			pool.close()
+			pool.join()
+		else:
+			results = map(infer_corpus_part, parts)
+
+		shape = None
+		for part_shape, part_optional_paths in results:
+			shape = JSONShape.merge(shape, part_shape, self.optional_paths)
+			self.optional_paths.update(part_optional_paths)
+		return shape
+
+	def generate_classname(self):
+		return os.path.basename(os.path.normpath(self.path)).split(".")[0]
+
+	def generate_jsonwalker(self):
+		return JSONDataWalker(self.rawjson, self.classname)
+
+def infer_corpus_part(part):
+	infer, arg = part
+	shape = None
+	optional_paths = set()
+	for rawjson in infer(arg):
+		shape = JSONShape.merge(shape, rawjson, optional_paths)
+	return shape, optional_paths
+
+def infer_json_files(filepaths):
+	for filepath in filepaths:
+		f = open(filepath, "rb")
+		rawjson = json.load(f)
+		f.close()
+		yield rawjson
+
+def infer_ndjson_range(filerange):
+	filepath, start, end = filerange
+	f = open(filepath, "rb")
+	# a line belongs to the range its first byte is in
+	if start > 0:
+		f.seek(start - 1)
+		f.readline()
+	while f.tell() < end:
+		line = f.readline()
+		if len(line) == 0:
+			break
+		if len(line.strip()) > 0:
+			yield json.loads(line)
+	f.close()
+
+def is_array_file(filepath):
+	# whether the JSON text of filepath is an array, by its first non-space byte
+	f = open(filepath, "rb")
+	try:
+		while True:
+			c = f.read(1)
+			if c not in (" ", "\t", "\r", "\n"):
+				return c == "["
+	finally:
+		f.close()
+
 def parse_options():
 	import optparse
 
@@ -151,8 +520,31 @@ def parse_options():
 		help="""C++ namespace seperated with "::", for example, "com::company". Default is no namespace""")
 	parser.add_option("--stringtype", dest="stringtype", default="std::string",
 		help="""C++ string type, std::string or std::wstring, default is std::string""")
+	CppCodeOptions.add_options(parser)
 	parser.add_option("--gentest", action="store_true", dest="gentest", default=False,
 		help="""generate test code "main.cpp", default is false""")
+	parser.add_option("--stream", action="store_true", dest="stream", default=False,
+		help="""read JSON file incrementally and infer array element class from all elements instead of the first one, memory is bounded by the schema instead of the file size. Default is false""")
+	parser.add_option("--sample", type="int", dest="sample_size", default=0,
+		help="""with --stream, infer array element class from at most SAMPLE_SIZE randomly sampled elements of each array. Default is 0, all elements""")
+	parser.add_option("--corpus", action="store_true", dest="corpus", default=False,
+		help="""infer class from all samples in JSONFile, which is either a directory of "*.json" files or a newline-delimited JSON file. Default is false""")
+	parser.add_option("--jobs", type="int", dest="jobs", default=1,
+		help="""with --corpus, number of processes inferring class from samples in parallel, default is 1""")
+	parser.add_option("--optionalfile", dest="optionalfile", default="",
+		help="""with --corpus, file to record paths of fields missing or null in some samples, for example, a.b[].c""")
+	parser.add_option("--project", dest="project", default="",
+		help="""comma separated paths of the only values to generate fields for, for example, "a.b,a.c[].d", other values are skipped when decoding. Default is all values""")
+	parser.add_option("--cachefile", dest="cachefile", default="",
+		help="""file to keep the incremental generation cache, code is not generated again if JSON file is unchanged since last run. Default is no cache""")
+	parser.add_option("--depfile", dest="depfile", default="",
+		help="""file to write make/ninja dependencies of the generated files on JSON file and generator. Default is no depfile""")
+	parser.add_option("--manifest", dest="manifest", default="",
+		help="""JSON file to list inputs, generated files and their generated includes. Default is no manifest""")
+	parser.add_option("--profile", action="store_true", dest="profile", default=False,
+		help="""print wall time and growth of peak memory of each phase, time of each handler and event counts to stderr. Default is false""")
+	parser.add_option("--profilefile", dest="profilefile", default="",
+		help="""with --profile, also save profile data to JSON file. Default is no file""")
 	options, reminder = parser.parse_args()
 
 	valid = True
@@ -170,50 +562,162 @@ def parse_options():
 	if valid and (options.stringtype not in ["std::string", "std::wstring"]):
 		valid = False
 
+	if valid and not CppCodeOptions.is_valid(options):
+		valid = False
+
+	if valid and (options.sample_size < 0 or (options.sample_size > 0 and not options.stream)):
+		valid = False
+
+	if valid and options.corpus and options.stream:
+		valid = False
+
+	if valid and (options.jobs < 1 or (options.jobs > 1 and not options.corpus)):
+		valid = False
+
+	if valid and options.optionalfile != "" and not options.corpus:
+		valid = False
+
+	if valid and options.profilefile != "" and not options.profile:
+		valid = False
+
+	options.project_paths = None
+	if options.project != "":
+		options.project_paths = [path.strip() for path in options.project.split(",")]
+		if options.project_paths.count("") > 0:
+			valid = False
+
 	if not valid:
 		parser.print_help()
 		exit(1)
 
 	options.jsondatafile = reminder[0]
+	options.codeoptions = CppCodeOptions.from_options(options)
 
 	return options
 
-if __name__ == "__main__":
-	options = parse_options()
-
-	j = JSONFile(options.jsondatafile)
+def generate_class(options, profiler):
+	profiler.begin("parse")
+	if options.corpus:
+		j = JSONCorpus(options.jsondatafile, options.jobs)
+		if options.optionalfile != "":
+			f = open(options.optionalfile, "w")
+			f.write("".join([p + "\n" for p in sorted(j.optional_paths)]))
+			f.close()
+	else:
+		j = JSONFile(options.jsondatafile, options.stream, options.sample_size)
+	profiler.end("parse")
 	#print("file: " + j.filepath)
 	#print("json: " + json.dumps(j.rawjson, indent=2, sort_keys=True))
 	#print("class name: " + j.classname)
 	#print
 
-	walker = j.jsonwalker
+	return generate_walker(j.jsonwalker, j.classname, options.namespace, options.stringtype,
+			FileWriter(options.dstdir), profiler, options.codeoptions, options.project_paths)
+
+def generate_walker(walker, classname, namespace, stringtype, writer, profiler = None, codeoptions = None, project_paths = None):
+	if profiler == None:
+		profiler = JSONProfiler(False)
+	if codeoptions == None:
+		codeoptions = CppCodeOptions()
 	#walker.json_handlers.append(JSONBaseHandler())
-	cppheader = CppHeaderHandler(options.namespace, options.stringtype)
+	cppheader = CppHeaderHandler(namespace, stringtype, codeoptions)
 	walker.json_handlers.append(cppheader)
 
-	cppbodybuilder = CppBodyBuilder(options.namespace, options.stringtype)
+	cppbodybuilder = CppBodyBuilder(namespace, stringtype, codeoptions)
 	walker.json_handlers.extend(cppbodybuilder.handlers)
+	projection = None
+	if project_paths != None:
+		projection = JSONProjection(project_paths)
+		walker.json_handlers = projection.wrap_handlers(walker.json_handlers)
+	walker.json_handlers = profiler.wrap_handlers(walker.json_handlers)
 	#cppbodyfile = CppBodyFileHandler()
 	#walker.json_handlers.append(cppbodyfile)
 	#cppmethoddecode = CppMethodDecodeHandler()
 	#walker.json_handlers.append(cppmethoddecode)
 	#cppmethodencode = CppMethodEncodeHandler()
 	#walker.json_handlers.append(cppmethodencode)
+	profiler.begin_type(classname)
 	walker.walk()
+	profiler.end_type()
+	if projection != None:
+		unknown_paths = projection.unknown_paths()
+		assert len(unknown_paths) == 0, ("projected paths not in JSON data: " + ", ".join(unknown_paths))
 
 	#print cppheader.filename
 	#print cppheader.content()
-	cppheader.save_to_dir(options.dstdir)
+	profiler.begin("write")
+	cppheader.save(writer)
 
 	#print cppbodybuilder.content()
-	cppbodybuilder.save_to_dir(options.dstdir)
+	cppbodybuilder.save(writer)
+	filenames = [cppheader.filename, cppbodybuilder.filehandler.filename]
+	for detailheader in codeoptions.detail_headers(namespace):
+		detailheader.save(writer)
+		filenames.append(detailheader.filepath)
+	profiler.end("write")
 	#print cppbodyfile.file_begin + cppbodyfile.file_end
 	#print cppmethodprint.content()
 	#print cppmethoddecode.content()
 	#print cppmethodencode.content()
+	return filenames, {cppheader.filename: cppheader.includes()}
+
+def generate_from_json(rawjson, rootname, namespace = "", stringtype = "std::string", writer = None, codeoptions = None, project_paths = None):
+	# library entry point generating class rootname from a decoded JSON object or array
+	# without --dstdir. returns {relative path: content}, or with writer, calls
+	# writer(relative path, chunks) for every file and returns the relative paths.
+	# round trip through json gives the unicode strings and types the walker expects
+	rawjson = json.loads(json.dumps(rawjson))
+
+	memorywriter = None
+	if writer == None:
+		memorywriter = MemoryWriter()
+		writer = memorywriter
+
+	filenames, includes = generate_walker(JSONDataWalker(rawjson, rootname), rootname, namespace, stringtype, writer, None, codeoptions, project_paths)
+
+	if memorywriter != None:
+		return memorywriter.files
+	return filenames
+
+if __name__ == "__main__":
+	options = parse_options()
+
+	profiler = JSONProfiler(options.profile)
+	profiler.begin("total")
+	classname = os.path.basename(os.path.normpath(options.jsondatafile)).split(".")[0]
+
+	cache = None
+	if options.cachefile != "":
+		cache = JSONGenCache(options.cachefile, options.namespace, options.stringtype, options.codeoptions)
+		name = "json:" + classname
+		key = cache.make_key("\n".join([classname, str(options.stream), str(options.sample_size), str(options.corpus),
+				options.project, JSONGenCache.hash_path(options.jsondatafile)]))
+
+	if (cache == None) or (not cache.is_fresh(name, key, options.dstdir)):
+		filenames, includes = generate_class(options, profiler)
+		if cache != None:
+			cache.update(name, key, options.dstdir, filenames, includes)
+			cache.save()
+	else:
+		filenames, includes = cache.get_outputs(name)
 
 	if options.gentest:
-		cpptest = CppTest(cppheader.classname, options.namespace, options.stringtype)
+		is_array = (not options.corpus) and is_array_file(options.jsondatafile)
+		cpptest = CppTest(classname, options.namespace, options.stringtype, options.codeoptions, is_array)
 		cpptest.savefile(os.path.join(options.dstdir, cpptest.filename))
-
+		filenames = filenames + [cpptest.filename]
+
+	if options.depfile != "" or options.manifest != "":
+		manifest = JSONManifest(options.dstdir)
+		manifest.add_input(options.jsondatafile)
+		manifest.add_outputs(filenames, includes)
+		if options.manifest != "":
+			manifest.save_manifest(options.manifest)
+		if options.depfile != "":
+			manifest.save_depfile(options.depfile)
+
+	profiler.end("total")
+	if options.profile:
+		sys.stderr.write(profiler.report())
+		if options.profilefile != "":
+			profiler.save(options.profilefile)
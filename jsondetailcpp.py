@@ -23,7 +23,7 @@
 import string
 import os
 
-from jsoncpphandler import CppHeaderHandler, CppBodyBuilder
+from jsoncpphandler import CppHeaderHandler, CppBodyBuilder, FileWriter
 
 class JSONArrayClassWalker:
 	def __init__(self):
@@ -67,36 +67,44 @@ class JSONDetailCppClass:
 			return False
 		return classname[len(ns):] in self.arrayclasses
 
-	def save_to_dir(self, classname, dirpath, namespace, stringtype):
+	def save_to_dir(self, classname, dirpath, namespace, stringtype, codeoptions = None):
+		return self.save(classname, FileWriter(dirpath), namespace, stringtype, codeoptions)
+
+	def save(self, classname, writer, namespace, stringtype, codeoptions = None):
 		assert self.is_detail_class(classname), ("class name \"" + classname + "\" must be among " + ", ".join(self.arrayclasses))
 
 		ns = "detail::"
 		classname = classname[len(ns):]
 
-		dirpath = os.path.join(dirpath, "detail")
-
 		if namespace == "":
 			namespace = "detail"
 		else:
 			namespace = namespace + "::" + "detail"
 
-		if not os.path.exists(dirpath):
-			os.makedirs(dirpath)
+		def detail_writer(filename, chunks):
+			writer(os.path.join("detail", filename), chunks)
 
-		self.generate_arrayclass(classname, dirpath, namespace, stringtype)
+		filenames, includes = self.generate_arrayclass(classname, detail_writer, namespace, stringtype, codeoptions)
+		includes = dict([(os.path.join("detail", filename), [os.path.join("detail", f) for f in included]) \
+				for filename, included in includes.items()])
+		return [os.path.join("detail", filename) for filename in filenames], includes
 
-	def generate_arrayclass(self, arrayclass, dirpath, namespace, stringtype):
+	def generate_arrayclass(self, arrayclass, writer, namespace, stringtype, codeoptions = None):
 		walker = JSONArrayClassWalker()
 
-		cppheader = CppHeaderHandler(namespace, stringtype)
+		cppheader = CppHeaderHandler(namespace, stringtype, codeoptions)
+		# header and body are in "detail/" itself
+		cppheader.detaildir = ""
 		walker.json_handlers.append(cppheader)
-		cppbodybuilder = CppBodyBuilder(namespace, stringtype)
+		cppbodybuilder = CppBodyBuilder(namespace, stringtype, codeoptions)
+		cppbodybuilder.filehandler.detaildir = ""
 		walker.json_handlers.extend(cppbodybuilder.handlers)
 
 		walker.walk(arrayclass)
 
-		cppheader.save_to_dir(dirpath)
-		cppbodybuilder.save_to_dir(dirpath)
+		cppheader.save(writer)
+		cppbodybuilder.save(writer)
+		return [cppheader.filename, cppbodybuilder.filehandler.filename], {cppheader.filename: cppheader.includes()}
 
 if __name__ == "__main__":
 	detailCpp = JSONDetailCppClass()
@@ -0,0 +1,105 @@
+#  The MIT License (MIT)
+#
+#  Copyright (c) 2013 Yuanyang Wu
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+import hashlib
+import json
+import os.path
+
+from jsoncpphandler import CppCodeOptions
+
+class JSONGenCache:
+
+	# changing any of them may change the generated code
+	generator_modules = ["jsoncpphandler.py", "jsondetailcpp.py", "jsondata2cpp.py", "jsonxsd2cpp.py", "jsongencache.py", "jsonstream.py"]
+
+	def hash_string(content):
+		return hashlib.md5(content).hexdigest()
+
+	def hash_file(filepath):
+		f = open(filepath, "rb")
+		digest = JSONGenCache.hash_string(f.read())
+		f.close()
+		return digest
+
+	def hash_path(path):
+		if not os.path.isdir(path):
+			return JSONGenCache.hash_file(path)
+		return JSONGenCache.hash_string("".join([f + JSONGenCache.hash_file(os.path.join(path, f)) \
+				for f in sorted(os.listdir(path)) if f.endswith(".json")]))
+
+	def generator_version():
+		dirpath = os.path.dirname(os.path.abspath(__file__))
+		return JSONGenCache.hash_string("".join([JSONGenCache.hash_file(os.path.join(dirpath, m)) \
+				for m in JSONGenCache.generator_modules]))
+
+	hash_string = staticmethod(hash_string)
+	hash_file = staticmethod(hash_file)
+	hash_path = staticmethod(hash_path)
+	generator_version = staticmethod(generator_version)
+
+	def __init__(self, filepath, namespace, stringtype, codeoptions = None):
+		if codeoptions == None:
+			codeoptions = CppCodeOptions()
+		self.filepath = filepath
+		self.options_key = "\n".join([JSONGenCache.generator_version(), namespace, stringtype, codeoptions.signature()])
+		# output name like "xsd:type:0" => {"key": ..., "files": {relative file path: md5},
+		# "includes": {relative header path: [included relative header paths]}}
+		self.entries = {}
+		# filepath None keeps the cache in memory only
+		if filepath != None and os.path.exists(filepath):
+			f = open(filepath)
+			self.entries = json.load(f)
+			f.close()
+
+	def make_key(self, definition):
+		return JSONGenCache.hash_string(self.options_key + "\n" + definition)
+
+	def is_fresh(self, name, key, dirpath):
+		entry = self.entries.get(name)
+		if entry == None or entry["key"] != key:
+			return False
+
+		for filename, digest in entry["files"].items():
+			filepath = os.path.join(dirpath, filename)
+			if not os.path.exists(filepath):
+				return False
+			if JSONGenCache.hash_file(filepath) != digest:
+				return False
+		return True
+
+	def update(self, name, key, dirpath, filenames, includes = None):
+		files = {}
+		for filename in filenames:
+			files[filename] = JSONGenCache.hash_file(os.path.join(dirpath, filename))
+		self.entries[name] = {"key": key, "files": files, "includes": includes or {}}
+
+	def get_outputs(self, name):
+		# (filenames, includes) recorded for a fresh entry
+		entry = self.entries[name]
+		return sorted(entry["files"].keys()), entry.get("includes", {})
+
+	def save(self):
+		if self.filepath == None:
+			return None
+		f = open(self.filepath, "w")
+		json.dump(self.entries, f, indent=1, sort_keys=True)
+		f.close()
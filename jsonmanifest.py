@@ -0,0 +1,81 @@
+#  The MIT License (MIT)
+#
+#  Copyright (c) 2013 Yuanyang Wu
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import os.path
+
+from jsoncpphandler import FileUtil
+from jsongencache import JSONGenCache
+
+class JSONManifest:
+	def __init__(self, dstdir):
+		self.dstdir = dstdir
+		self.inputs = set()
+		# generated file paths, headers map to the generated headers they include
+		self.outputs = set()
+		self.includes = {}
+
+		dirpath = os.path.dirname(os.path.abspath(__file__))
+		for m in JSONGenCache.generator_modules:
+			self.add_input(os.path.relpath(os.path.join(dirpath, m)))
+
+	def output_path(self, filename):
+		return os.path.normpath(os.path.join(self.dstdir, filename))
+
+	def add_input(self, path):
+		if os.path.isdir(path):
+			for f in os.listdir(path):
+				if f.endswith(".json"):
+					self.inputs.add(os.path.normpath(os.path.join(path, f)))
+		else:
+			self.inputs.add(os.path.normpath(path))
+
+	def add_outputs(self, filenames, includes):
+		# filenames and includes are relative to dstdir
+		for filename in filenames:
+			self.outputs.add(self.output_path(filename))
+		for filename, included in includes.items():
+			self.includes[self.output_path(filename)] = sorted([self.output_path(f) for f in included])
+
+	def content(self):
+		return json.dumps({
+				"inputs": sorted(self.inputs),
+				"outputs": sorted(self.outputs),
+				"includes": self.includes
+			}, indent=1, sort_keys=True, separators=(",", ": ")) + "\n"
+
+	def escape_make_path(path):
+		return path.replace("$", "$$").replace("#", "\\#").replace(" ", "\\ ")
+
+	def depfile_content(self):
+		# all generated files are rebuilt from all inputs, make/ninja "target: prerequisites" syntax
+		targets = [JSONManifest.escape_make_path(f) for f in sorted(self.outputs)]
+		prerequisites = [JSONManifest.escape_make_path(f) for f in sorted(self.inputs)]
+		return " \\\n  ".join(targets) + ": \\\n  " + " \\\n  ".join(prerequisites) + "\n"
+
+	def save_manifest(self, filepath):
+		FileUtil.save_if_changed(filepath, self.content())
+
+	def save_depfile(self, filepath):
+		FileUtil.save_if_changed(filepath, self.depfile_content())
+
+	escape_make_path = staticmethod(escape_make_path)
@@ -0,0 +1,183 @@
+#  The MIT License (MIT)
+#
+#  Copyright (c) 2013 Yuanyang Wu
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import resource
+import time
+
+class JSONProfiler:
+	def __init__(self, enabled = True):
+		# a disabled profiler costs nothing, so callers need not check --profile
+		self.enabled = enabled
+		# phase name => {"calls": ..., "seconds": wall time, "peak_growth_kb": most the process peak rose in one call}
+		self.phases = {}
+		# phase names in the order they are first finished, for report
+		self.phase_names = []
+		# handler class name => {"calls": ..., "seconds": ...}
+		self.handlers = {}
+		# handler method name like "handle_string" => walker events
+		self.events = {}
+		# generated class name => {"events": ..., "seconds": walk time}
+		self.types = {}
+		self.current_type = None
+		# phase name => (time, process peak) at begin()
+		self.begin_states = {}
+
+	def peak_memory_kb():
+		# ru_maxrss is the peak of the whole process so far, in kilobytes on Linux
+		return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+	def begin(self, phase):
+		if self.enabled:
+			self.begin_states[phase] = (time.time(), JSONProfiler.peak_memory_kb())
+
+	def end(self, phase):
+		if not self.enabled:
+			return 0.0
+
+		begin_time, begin_peak = self.begin_states.pop(phase)
+		seconds = time.time() - begin_time
+		stat = self.phase_stat(phase)
+		stat["calls"] += 1
+		stat["seconds"] += seconds
+		# memory the phase needed beyond what the process had already used
+		stat["peak_growth_kb"] = max(stat["peak_growth_kb"], JSONProfiler.peak_memory_kb() - begin_peak)
+		return seconds
+
+	def phase_stat(self, phase):
+		if not self.phases.has_key(phase):
+			self.phases[phase] = {"calls": 0, "seconds": 0.0, "peak_growth_kb": 0}
+			self.phase_names.append(phase)
+		return self.phases[phase]
+
+	def begin_type(self, classname):
+		if not self.enabled:
+			return None
+
+		self.current_type = classname
+		self.types.setdefault(classname, {"events": 0, "seconds": 0.0})
+		self.begin("walk")
+
+	def end_type(self):
+		if not self.enabled:
+			return None
+
+		self.types[self.current_type]["seconds"] += self.end("walk")
+		self.current_type = None
+
+	def wrap_handlers(self, handlers):
+		# walker calls go through the counter once, then through every timed handler
+		if not self.enabled:
+			return handlers
+		return [JSONEventCounter(self)] + [JSONProfileHandler(self, handler) for handler in handlers]
+
+	def add_event(self, method_name):
+		self.events[method_name] = self.events.get(method_name, 0) + 1
+		if self.current_type != None:
+			self.types[self.current_type]["events"] += 1
+
+	def add_handler_call(self, handler_name, seconds):
+		stat = self.handlers.setdefault(handler_name, {"calls": 0, "seconds": 0.0})
+		stat["calls"] += 1
+		stat["seconds"] += seconds
+
+	def data(self):
+		return {"phases": self.phases, "handlers": self.handlers, "events": self.events, "types": self.types}
+
+	def merge(self, data):
+		# add profile data of another process, e.g. a --jobs worker
+		for phase, stat in sorted(data["phases"].items()):
+			cur = self.phase_stat(phase)
+			cur["calls"] += stat["calls"]
+			cur["seconds"] += stat["seconds"]
+			cur["peak_growth_kb"] = max(cur["peak_growth_kb"], stat["peak_growth_kb"])
+		for handler_name, stat in data["handlers"].items():
+			cur = self.handlers.setdefault(handler_name, {"calls": 0, "seconds": 0.0})
+			cur["calls"] += stat["calls"]
+			cur["seconds"] += stat["seconds"]
+		for method_name, count in data["events"].items():
+			self.events[method_name] = self.events.get(method_name, 0) + count
+		for classname, stat in data["types"].items():
+			cur = self.types.setdefault(classname, {"events": 0, "seconds": 0.0})
+			cur["events"] += stat["events"]
+			cur["seconds"] += stat["seconds"]
+
+	def report(self, max_types = 10):
+		lines = ["%-32s %8s %10s %10s" % ("phase", "calls", "seconds", "+peak MB")]
+		for phase in self.phase_names:
+			stat = self.phases[phase]
+			lines.append("%-32s %8d %10.3f %10.1f" % (phase, stat["calls"], stat["seconds"], stat["peak_growth_kb"] / 1024.0))
+
+		lines.append("")
+		lines.append("%-32s %8s %10s" % ("handler", "calls", "seconds"))
+		for handler_name, stat in sorted(self.handlers.items()):
+			lines.append("%-32s %8d %10.3f" % (handler_name, stat["calls"], stat["seconds"]))
+
+		lines.append("")
+		lines.append("%-32s %8s" % ("event", "count"))
+		for method_name, count in sorted(self.events.items()):
+			lines.append("%-32s %8d" % (method_name, count))
+
+		lines.append("")
+		lines.append("%-32s %8s %10s" % ("type (slowest first)", "events", "seconds"))
+		slowest = sorted(self.types.items(), key = lambda item: (-item[1]["seconds"], item[0]))
+		for classname, stat in slowest[:max_types]:
+			lines.append("%-32s %8d %10.3f" % (classname, stat["events"], stat["seconds"]))
+		return "\n".join(lines) + "\n"
+
+	def save(self, filepath):
+		f = open(filepath, "w")
+		json.dump(self.data(), f, indent=1, sort_keys=True, separators=(",", ": "))
+		f.write("\n")
+		f.close()
+
+	peak_memory_kb = staticmethod(peak_memory_kb)
+
+class JSONEventCounter:
+	def __init__(self, profiler):
+		self.profiler = profiler
+
+	def __getattr__(self, method_name):
+		if not method_name.startswith("handle_"):
+			raise AttributeError(method_name)
+
+		def count(*args, **kwargs):
+			self.profiler.add_event(method_name)
+		return count
+
+class JSONProfileHandler:
+	def __init__(self, profiler, handler):
+		self.profiler = profiler
+		self.handler = handler
+		self.handler_name = handler.__class__.__name__
+
+	def __getattr__(self, method_name):
+		method = getattr(self.handler, method_name)
+		if not method_name.startswith("handle_"):
+			return method
+
+		def timed(*args, **kwargs):
+			begin_time = time.time()
+			ret = method(*args, **kwargs)
+			self.profiler.add_handler_call(self.handler_name, time.time() - begin_time)
+			return ret
+		return timed
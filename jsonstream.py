@@ -0,0 +1,147 @@
+#  The MIT License (MIT)
+#
+#  Copyright (c) 2013 Yuanyang Wu
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+import codecs
+import json.decoder
+import re
+
+# Pull parser reading JSON text incrementally from a file object.
+# Memory is bounded by the read buffer and the largest single token, not by
+# the document size. events() yields (event, value):
+#   ("start_map", None), ("map_key", key), ("end_map", None),
+#   ("start_array", None), ("end_array", None),
+#   ("value", value) where value is unicode, int, long, float, bool or None
+# With decode_containers, an object/array found complete in read buffer is
+# decoded at once by json module and yielded as ("value", dict or list).
+class JSONEventReader:
+	token_re = re.compile(r"[ \t\n\r]*(?:([{}\[\]:,])|(\")|([-+.eE0-9]+)|([a-z]+))")
+	literals = {u"true": True, u"false": False, u"null": None}
+
+	def __init__(self, f, bufsize = 65536, decode_containers = False):
+		self.f = f
+		self.decode_containers = decode_containers
+		self.json_decoder = json.decoder.JSONDecoder()
+		self.bufsize = bufsize
+		self.decoder = codecs.getincrementaldecoder("utf-8")()
+		self.buf = u""
+		self.pos = 0
+		self.eof = False
+
+	def read_more(self):
+		# drop consumed text so that only unparsed text is kept
+		data = self.f.read(self.bufsize)
+		self.eof = len(data) == 0
+		self.buf = self.buf[self.pos:] + self.decoder.decode(data, self.eof)
+		self.pos = 0
+
+	def error(self, msg):
+		raise ValueError(msg + " near \"" + self.buf[self.pos:self.pos + 20].encode("utf-8") + "\"")
+
+	def read_string(self):
+		while True:
+			try:
+				value, self.pos = json.decoder.scanstring(self.buf, self.pos)
+				return value
+			except ValueError:
+				# string may be cut at the end of buffer
+				if self.eof:
+					raise
+				self.read_more()
+
+	def decode_container(self, pos):
+		try:
+			value, end = self.json_decoder.raw_decode(self.buf, pos)
+		except ValueError:
+			# too big for read buffer, or invalid
+			return False, None
+		self.pos = end
+		return True, value
+
+	def events(self):
+		# only nesting is checked, it is not a validating parser
+		token_re = JSONEventReader.token_re
+		stack = []
+		expect_key = False
+		while True:
+			m = token_re.match(self.buf, self.pos)
+			if m == None or m.end() == len(self.buf):
+				# token may be cut at the end of buffer
+				if not self.eof:
+					self.read_more()
+					continue
+				if m == None:
+					if len(self.buf[self.pos:].strip()) > 0:
+						self.error("invalid JSON text")
+					break
+
+			punctuation, quote, number, literal = m.groups()
+			if self.decode_containers and (punctuation == u"{" or punctuation == u"["):
+				decoded, value = self.decode_container(m.start(1))
+				if decoded:
+					expect_key = False
+					yield "value", value
+					continue
+
+			self.pos = m.end()
+			if punctuation != None:
+				if punctuation == u",":
+					expect_key = (len(stack) > 0) and (stack[-1] == u"{")
+				elif punctuation == u"{":
+					stack.append(punctuation)
+					expect_key = True
+					yield "start_map", None
+				elif punctuation == u"[":
+					stack.append(punctuation)
+					expect_key = False
+					yield "start_array", None
+				elif punctuation == u"}":
+					if len(stack) == 0 or stack.pop() != u"{":
+						self.error("unbalanced \"}\"")
+					expect_key = False
+					yield "end_map", None
+				elif punctuation == u"]":
+					if len(stack) == 0 or stack.pop() != u"[":
+						self.error("unbalanced \"]\"")
+					expect_key = False
+					yield "end_array", None
+			elif quote != None:
+				value = self.read_string()
+				if expect_key:
+					expect_key = False
+					yield "map_key", value
+				else:
+					yield "value", value
+			elif number != None:
+				try:
+					if u"." in number or u"e" in number or u"E" in number:
+						yield "value", float(number)
+					else:
+						yield "value", int(number)
+				except ValueError:
+					self.error("invalid JSON number")
+			else:
+				if not JSONEventReader.literals.has_key(literal):
+					self.error("invalid JSON value")
+				yield "value", JSONEventReader.literals[literal]
+
+		if len(stack) > 0:
+			self.error("unexpected end of JSON text")
@@ -24,39 +24,43 @@
 
 import string
 import os.path
+import sys
+import traceback
 import types
-import xml.dom.minidom
+import xml.etree.cElementTree as ElementTree
+import multiprocessing
 
-from jsoncpphandler import CppHeaderHandler, CppBodyBuilder, CppTest, CppFormat
+from jsoncpphandler import CppCodeOptions, CppHeaderHandler, CppBodyBuilder, CppTest, CppFormat, FileWriter, MemoryWriter
 from jsondetailcpp import JSONDetailCppClass
-
-def debug_xml_node(node, indent):
-	print "  " * indent + node.localName + " " + \
-		", ".join([str(item[0]) + "=" + str(item[1]) for item in node.attributes.items()])
-	for n in node.childNodes:
-		if n.nodeType == n.ELEMENT_NODE:
-			debug_xml_node(n, indent + 1)
+from jsongencache import JSONGenCache
+from jsonmanifest import JSONManifest
+from jsonprofile import JSONProfiler
 
 class XmlUtil:
+	def get_local_name(xml_node):
+		# "{namespace}name" -> "name"
+		return xml_node.tag.split("}")[-1]
+
 	def get_node_attribute_value(xml_node, attr_name, default_value = None):
-		if xml_node.attributes.has_key(attr_name):
-			return str(xml_node.attributes.getNamedItem(attr_name).value)
+		value = xml_node.get(attr_name)
+		if value != None:
+			return str(value)
 		else:
 			return default_value
 
 	def get_node_attribute_dic(xml_node):
 		ret = {}
-		for item in xml_node.attributes.items():
+		for item in xml_node.items():
 			ret[str(item[0])] = str(item[1])
 		return ret
 
 	def get_child_element_node(xml_node, element_name):
-		for n in xml_node.childNodes:
-			if n.nodeType == n.ELEMENT_NODE:
-				if str(n.localName) == element_name:
-					return n
+		for n in xml_node:
+			if XmlUtil.get_local_name(n) == element_name:
+				return n
 		return None
 
+	get_local_name = staticmethod(get_local_name)
 	get_node_attribute_value = staticmethod(get_node_attribute_value)
 	get_node_attribute_dic = staticmethod(get_node_attribute_dic)
 	get_child_element_node = staticmethod(get_child_element_node)
@@ -101,6 +105,12 @@ class JSONXSDFile:
 		self.complextypes = {}
 		self.parse_file()
 
+		# resolved lazily once and shared by generation and queries
+		self.basic_type_cache = {}
+		self.type_deps_cache = {}
+		self.dependents_map = None
+		self.topological_order = None
+
 	def get_element_definition(self, element_name):
 		assert self.elements.has_key(element_name), ("element must be defined")
 		element = self.elements[element_name]
@@ -110,15 +120,20 @@ class JSONXSDFile:
 		return self.get_basic_type(typename) != None
 
 	def get_basic_type(self, typename):
-		if JSONXSDConstant.basic_arrays.has_key(typename):
-			return typename
+		if self.basic_type_cache.has_key(typename):
+			return self.basic_type_cache[typename]
 
-		def_node = self.simpletypes.get(typename)
-		if def_node != None:
-			self.parse_simpletype_full(def_node)
-			return self.get_basic_type(def_node["base_type_name"])
+		basic_typename = None
+		if JSONXSDConstant.basic_arrays.has_key(typename):
+			basic_typename = typename
+		else:
+			def_node = self.simpletypes.get(typename)
+			if def_node != None:
+				self.check_definition(def_node)
+				basic_typename = self.get_basic_type(def_node["base_type_name"])
 
-		return None
+		self.basic_type_cache[typename] = basic_typename
+		return basic_typename
 
 	def is_single_basic_type(self, element_name):
 		assert self.elements.has_key(element_name), ("element must be defined")
@@ -151,47 +166,134 @@ class JSONXSDFile:
 				return (typename, False), set([(typename, False)])
 
 	def get_type_deps(self, typename):
-		deps = set()
-
-		if self.simpletypes.has_key(typename):
+		# returned set is cached, callers must not modify it
+		deps = self.type_deps_cache.get(typename)
+		if deps != None:
 			return deps
 
-		def_node = self.complextypes[typename]
-		self.parse_complextype_full(def_node)
-		if def_node.has_key("sequence_elements"):
-			for n in def_node["sequence_elements"]:
-				if n.has_key("ref_name"):
-					cur_class, cur_deps = self.get_element_class_and_deps(n["ref_name"])
-				else:
-					cur_class, cur_deps = self.get_type_deps_simple(n["type_name"], n["is_multiple"])
-				deps = deps.union(cur_deps)
+		deps = set()
+		if not self.simpletypes.has_key(typename):
+			def_node = self.complextypes[typename]
+			self.check_definition(def_node)
+			if def_node.has_key("sequence_elements"):
+				for n in def_node["sequence_elements"]:
+					if n.has_key("ref_name"):
+						cur_class, cur_deps = self.get_element_class_and_deps(n["ref_name"])
+					else:
+						cur_class, cur_deps = self.get_type_deps_simple(n["type_name"], n["is_multiple"])
+					deps.update(cur_deps)
 
-		if def_node.has_key("base_type_name"):
-			cur_class, cur_deps = self.get_type_deps_simple(def_node["base_type_name"], False)
-			deps = deps.union(cur_deps)
+			if def_node.has_key("base_type_name"):
+				cur_class, cur_deps = self.get_type_deps_simple(def_node["base_type_name"], False)
+				deps.update(cur_deps)
 
+		deps = frozenset(deps)
+		self.type_deps_cache[typename] = deps
 		return deps
 
+	def get_complextype_deps(self, typename):
+		# complexType names used by the complexType, single or array
+		return sorted(set([dep_typename for dep_typename, is_multiple in self.get_type_deps(typename) \
+				if self.complextypes.has_key(dep_typename)]))
+
+	def get_valid_complextype_names(self):
+		# broken types can not be generated and are left out of the graph
+		return sorted([typename for typename, def_node in self.complextypes.items() \
+				if not def_node.has_key("error")])
+
+	def get_dependents_map(self):
+		# complexType name -> names of complexTypes using it directly
+		if self.dependents_map == None:
+			self.dependents_map = {}
+			for typename in self.get_valid_complextype_names():
+				for dep_typename in self.get_complextype_deps(typename):
+					self.dependents_map.setdefault(dep_typename, set()).add(typename)
+		return self.dependents_map
+
+	def get_dependents(self, typename):
+		# complexTypes using the type directly or indirectly
+		dependents_map = self.get_dependents_map()
+		ret = set()
+		new_dependents = set(dependents_map.get(typename, ()))
+		while len(new_dependents) > 0:
+			dependent = new_dependents.pop()
+			if dependent not in ret:
+				ret.add(dependent)
+				new_dependents.update(dependents_map.get(dependent, ()))
+		return ret
+
+	def get_topological_order(self):
+		# complexType names, every type after the types it uses.
+		# iterative DFS so that deep inheritance chains do not hit recursion limit
+		if self.topological_order == None:
+			order = []
+			visited = set()
+			for root in self.get_valid_complextype_names():
+				if root in visited:
+					continue
+				visited.add(root)
+				stack = [(root, iter(self.get_complextype_deps(root)))]
+				while len(stack) > 0:
+					typename, children = stack[-1]
+					child = next(children, None)
+					if child == None:
+						stack.pop()
+						order.append(typename)
+					elif child not in visited and not self.complextypes[child].has_key("error"):
+						visited.add(child)
+						stack.append((child, iter(self.get_complextype_deps(child))))
+			self.topological_order = order
+		return self.topological_order
+
+	def get_type_signature(self, typename, is_multiple):
+		# everything JSONXSDWalker reads to generate code of the type
+		if is_multiple:
+			return repr((typename, is_multiple))
+
+		def_node = self.complextypes[typename]
+		self.check_definition(def_node)
+		children = []
+		for n in def_node.get("sequence_elements", []):
+			if n.has_key("ref_name"):
+				cur_class, cur_deps = self.get_element_class_and_deps(n["ref_name"])
+				cur_name = self.get_element_definition(n["ref_name"])["name"]
+			else:
+				cur_class, cur_deps = self.get_type_deps_simple(n["type_name"], n["is_multiple"])
+				cur_name = n["name"]
+			children.append((cur_name, cur_class))
+		return repr((typename, is_multiple, def_node.get("base_type_name"), children))
+
 	def parse_file(self):
-		dom = xml.dom.minidom.parse(self.filepath)
-		self.parse_schema_node(dom.childNodes[0])
-
-	def parse_schema_node(self, xml_node):
-		for n in xml_node.childNodes:
-			if n.nodeType == n.ELEMENT_NODE:
-				if str(n.localName) == "element":
-					def_node = self.parse_element_node(n, True)
-					self.elements[def_node["name"]] = def_node
-				if str(n.localName) == "simpleType":
-					def_node = self.parse_simpletype_node(n)
-					self.simpletypes[def_node["name"]] = def_node
-				if str(n.localName) == "complexType":
-					def_node = self.parse_complextype_node(n)
-					self.complextypes[def_node["name"]] = def_node
+		# single pass: every top level definition is converted to a plain dict
+		# as soon as its end tag is read, then its xml subtree is dropped
+		depth = 0
+		root = None
+		for event, xml_node in ElementTree.iterparse(self.filepath, events = ("start", "end")):
+			if event == "start":
+				if root == None:
+					root = xml_node
+				depth += 1
+				continue
+
+			depth -= 1
+			if depth == 1:
+				self.parse_schema_child_node(xml_node)
+				root.clear()
+
+	def parse_schema_child_node(self, xml_node):
+		local_name = XmlUtil.get_local_name(xml_node)
+		if local_name == "element":
+			def_node = self.parse_element_node(xml_node, True)
+			self.elements[def_node["name"]] = def_node
+		if local_name == "simpleType":
+			def_node = self.parse_simpletype_node(xml_node)
+			self.simpletypes[def_node["name"]] = def_node
+		if local_name == "complexType":
+			def_node = self.parse_complextype_node(xml_node)
+			self.complextypes[def_node["name"]] = def_node
 
 	def parse_element_node(self, xml_node, require_name_attr):
 		def_node = {}
-		def_node["xml_node"] = xml_node
 
 		attrs = XmlUtil.get_node_attribute_dic(xml_node)
 
@@ -214,15 +316,13 @@ class JSONXSDFile:
 
 	def parse_simpletype_node(self, xml_node):
 		def_node = {}
-		def_node["xml_node"] = xml_node
 
 		def_node["name"] = XmlUtil.get_node_attribute_value(xml_node, "name")
 		assert ["name"] != None, ("""<simpleType> must has attribute "name".""")
+		self.parse_deferring_error(def_node, self.parse_simpletype_content, xml_node)
 		return def_node
 
-	def parse_simpletype_full(self, def_node):
-		xml_node = def_node["xml_node"]
-
+	def parse_simpletype_content(self, def_node, xml_node):
 		restriction_node = XmlUtil.get_child_element_node(xml_node, "restriction")
 		assert restriction_node != None, ("simpleType \"" + def_node.get("name", "(None)") + "\" must has \"restriction\" child node")
 
@@ -232,22 +332,16 @@ class JSONXSDFile:
 
 	def parse_complextype_node(self, xml_node):
 		def_node = {}
-		def_node["xml_node"] = xml_node
 
 		def_node["name"] = XmlUtil.get_node_attribute_value(xml_node, "name")
 		assert ["name"] != None, ("""<simpleType> must has attribute "name".""")
+		self.parse_deferring_error(def_node, self.parse_complextype_content, xml_node)
 		return def_node
 
-	def parse_complextype_full(self, def_node):
-		xml_node = def_node["xml_node"]
-
+	def parse_complextype_content(self, def_node, xml_node):
 		node = XmlUtil.get_child_element_node(xml_node, "sequence")
 		if node != None:
-			sequence_elements = []
-			for n in node.childNodes:
-				if n.nodeType == n.ELEMENT_NODE:
-					sequence_elements.append(self.parse_element_node(n, False))
-			def_node["sequence_elements"] = sequence_elements
+			def_node["sequence_elements"] = [self.parse_element_node(n, False) for n in node]
 			return None
 
 		node = XmlUtil.get_child_element_node(xml_node, "complexContent")
@@ -260,11 +354,7 @@ class JSONXSDFile:
 
 				sequence_xml_node = XmlUtil.get_child_element_node(extension_xml_node, "sequence")
 				if sequence_xml_node != None:
-					sequence_elements = []
-					for n in sequence_xml_node.childNodes:
-						if n.nodeType == n.ELEMENT_NODE:
-							sequence_elements.append(self.parse_element_node(n, False))
-					def_node["sequence_elements"] = sequence_elements
+					def_node["sequence_elements"] = [self.parse_element_node(n, False) for n in sequence_xml_node]
 				return None
 
 			restriction_xml_node = XmlUtil.get_child_element_node(node, "restriction");
@@ -279,6 +369,17 @@ class JSONXSDFile:
 
 		assert False, ("complexType \"" + def_node["name"] + "\" must have \"sequence/complexContent\" child element")
 
+	def parse_deferring_error(self, def_node, parse_content, xml_node):
+		# a broken type is only reported when it is used, types nobody refers to
+		# must not fail the whole schema
+		try:
+			parse_content(def_node, xml_node)
+		except AssertionError, e:
+			def_node["error"] = str(e)
+
+	def check_definition(self, def_node):
+		assert not def_node.has_key("error"), (def_node.get("error"))
+
 class JSONXSDWalker:
 	def __init__(self, json_xsd_file):
 		self.schema = json_xsd_file
@@ -371,28 +472,55 @@ class JSONXSDWalker:
 		for handler in self.json_handlers:
 			handler.handle_array_end(parent_names, name, complex_type_name)
 
-def parse_options():
+def parse_options(args = None, prog = None):
 	import optparse
 
 	usage_msg = """usage: %prog [options] XSDFile"""
-	parser = optparse.OptionParser(usage=usage_msg)
-	parser.add_option("--element", dest="element_name", default="",
-		help="required. Generate code against specified <element> name in XSD file")
+	parser = optparse.OptionParser(usage=usage_msg, prog=prog)
+	parser.add_option("--element", action="append", dest="element_names", default=[], metavar="ELEMENT",
+		help="generate code against specified <element> name in XSD file. Repeat it to generate several elements in one run. Shared types are generated only once")
+	parser.add_option("--all-elements", action="store_true", dest="all_elements", default=False,
+		help="generate code against all top level <element> in XSD file")
 	parser.add_option("--dstdir", dest="dstdir", default=".",
 		help="directory to save the generated code files, default is current directory")
 	parser.add_option("--namespace", dest="namespace", default="",
 		help="""C++ namespace seperated with "::", for example, "com::company". Default is no namespace""")
 	parser.add_option("--stringtype", dest="stringtype", default="std::string",
 		help="""C++ string type, std::string or std::wstring, default is std::string""")
+	CppCodeOptions.add_options(parser)
 	parser.add_option("--gentest", action="store_true", dest="gentest", default=False,
-		help="""generate test code "main.cpp", default is false""")
-	options, reminder = parser.parse_args()
+		help="""generate test code "main.cpp" against the only --element, default is false""")
+	parser.add_option("--cachefile", dest="cachefile", default="",
+		help="""file to keep the incremental generation cache, types unchanged since last run are skipped. Default is no cache""")
+	parser.add_option("--jobs", type="int", dest="jobs", default=1,
+		help="""number of processes generating types in parallel, default is 1""")
+	parser.add_option("--dependents", dest="dependents", default="", metavar="TYPE",
+		help="""print complexTypes using complexType TYPE directly or indirectly, in dependency order, instead of generating code""")
+	parser.add_option("--depfile", dest="depfile", default="",
+		help="""file to write make/ninja dependencies of the generated files on XSD file and generator. Default is no depfile""")
+	parser.add_option("--manifest", dest="manifest", default="",
+		help="""JSON file to list inputs, generated files including "detail/" classes and their generated includes. Default is no manifest""")
+	parser.add_option("--profile", action="store_true", dest="profile", default=False,
+		help="""print wall time and growth of peak memory of each phase, time of each handler, event counts and slowest types to stderr. Default is false""")
+	parser.add_option("--profilefile", dest="profilefile", default="",
+		help="""with --profile, also save profile data to JSON file. Default is no file""")
+	options, reminder = parser.parse_args(args)
 
 	valid = True
 	if len(reminder) != 1:
 		valid = False
 
-	if valid and options.element_name == "":
+	if valid and (len(options.element_names) == 0) and (not options.all_elements) and (options.dependents == ""):
+		valid = False
+
+	if valid and (options.dependents != "") and (len(options.element_names) > 0 or options.all_elements):
+		valid = False
+
+	if valid and (len(options.element_names) > 0) and options.all_elements:
+		valid = False
+
+	# "main.cpp" tests exactly one element
+	if valid and options.gentest and (options.all_elements or len(options.element_names) != 1):
 		valid = False
 
 	if valid and (len(options.namespace) > 0):
@@ -406,35 +534,31 @@ def parse_options():
 	if valid and (options.stringtype not in ["std::string", "std::wstring"]):
 		valid = False
 
+	if valid and not CppCodeOptions.is_valid(options):
+		valid = False
+
+	if valid and options.jobs < 1:
+		valid = False
+
+	if valid and options.profilefile != "" and not options.profile:
+		valid = False
+
 	if not valid:
 		parser.print_help()
 		exit(1)
 
 	options.jsonxsdfile = reminder[0]
+	options.codeoptions = CppCodeOptions.from_options(options)
 
 	return options
 
-if __name__ == "__main__":
-	options = parse_options()
-
-	dom = xml.dom.minidom.parse(options.jsonxsdfile)
-	#debug_xml_node(dom.childNodes[0], 0)
+def get_elements_deps(schema, element_names):
+	new_deps = set()
+	for element_name in element_names:
+		cur_class, cur_deps = schema.get_element_class_and_deps(element_name)
+		new_deps.update(cur_deps)
 
-	schema = JSONXSDFile(options.jsonxsdfile)
-	#import pprint
-	#pprint.pprint(schema.elements)
-	#pprint.pprint(schema.simpletypes)
-	#pprint.pprint(schema.complextypes)
-	#jsondef = schema.get_element_definition(options.element_name)
-	#pprint.pprint(jsondef)
-	#exit(0)
-
-	cur_class, cur_deps = schema.get_element_class_and_deps(options.element_name)
-	#print "cur_class: ", cur_class
-	#print "cur_deps", cur_deps
-
-	typename, is_multiple = cur_class
-	new_deps = cur_deps
+	# types shared by several elements are collected only once
 	dep_types = set()
 	array_types = set()
 	while len(new_deps) > 0:
@@ -445,38 +569,233 @@ if __name__ == "__main__":
 		elif (typename, is_multiple) in dep_types:
 			pass # ignore already parsed type
 		else:
-			cur_deps = schema.get_type_deps(typename)
-			new_deps = new_deps.union(cur_deps)
+			new_deps.update(schema.get_type_deps(typename))
 			dep_types.add( (typename, is_multiple) )
 
-	#print "dep_types: ", dep_types
-	#print "array_types: ", array_types
+	return dep_types, array_types
+
+def generate_type(schema, typename, is_multiple, namespace, stringtype, writer, profiler = None, codeoptions = None):
+	if profiler == None:
+		profiler = JSONProfiler(False)
+	walker = JSONXSDWalker(schema)
+
+	cppheader = CppHeaderHandler(namespace, stringtype, codeoptions)
+	walker.json_handlers.append(cppheader)
+	cppbodybuilder = CppBodyBuilder(namespace, stringtype, codeoptions)
+	walker.json_handlers.extend(cppbodybuilder.handlers)
+	walker.json_handlers = profiler.wrap_handlers(walker.json_handlers)
+
+	#print "walking " + typename + ", " + str(is_multiple)
+	profiler.begin_type(JSONXSDConstant.get_cpp_class_name(typename, is_multiple))
+	walker.walk(typename, is_multiple)
+	profiler.end_type()
+
+	profiler.begin("write")
+	cppheader.save(writer)
+	cppbodybuilder.save(writer)
+	profiler.end("write")
+	return [cppheader.filename, cppbodybuilder.filehandler.filename], {cppheader.filename: cppheader.includes()}
+
+def generate_from_xsd(schema, element_names, namespace = "", stringtype = "std::string", writer = None, codeoptions = None):
+	# library entry point generating the elements and all types they use without --dstdir.
+	# schema is XSD file path or a JSONXSDFile to share among calls.
+	# returns {relative path: content}, or with writer, calls writer(relative path, chunks)
+	# for every file and returns the relative paths.
+	if not isinstance(schema, JSONXSDFile):
+		schema = JSONXSDFile(schema)
+	if codeoptions == None:
+		codeoptions = CppCodeOptions()
+
+	memorywriter = None
+	if writer == None:
+		memorywriter = MemoryWriter()
+		writer = memorywriter
+
+	dep_types, array_types = get_elements_deps(schema, element_names)
+	filenames = []
+	for typename, is_multiple in sorted(array_types):
+		classname = JSONXSDConstant.get_cpp_class_name(typename, is_multiple)
+		cur_filenames, includes = JSONDetailCppClass().save(classname, writer, namespace, stringtype, codeoptions)
+		filenames.extend(cur_filenames)
+	for typename, is_multiple in sorted(dep_types):
+		cur_filenames, includes = generate_type(schema, typename, is_multiple, namespace, stringtype, writer, None, codeoptions)
+		filenames.extend(cur_filenames)
+	for detailheader in codeoptions.detail_headers(namespace):
+		detailheader.save(writer)
+		filenames.append(detailheader.filepath)
+
+	if memorywriter != None:
+		return memorywriter.files
+	return filenames
+
+# schema shared by generate_work() in current and worker processes
+worker_schema = None
+
+def init_worker(jsonxsdfile):
+	global worker_schema
+	# forked workers inherit the parsed schema
+	if worker_schema == None:
+		worker_schema = JSONXSDFile(jsonxsdfile)
+
+def generate_work(work):
+	typename, is_multiple, options = work
+	# profile data is returned to be merged by the main process
+	profiler = JSONProfiler(options.profile)
+	# reported when the class name itself can not be made
+	classname = typename
+	try:
+		classname = JSONXSDConstant.get_cpp_class_name(typename, is_multiple)
+		if JSONXSDConstant.is_basic_type(typename):
+			detailCpp = JSONDetailCppClass()
+			profiler.begin("detail")
+			outputs = detailCpp.save_to_dir(classname, options.dstdir, options.namespace, options.stringtype, options.codeoptions)
+			profiler.end("detail")
+		else:
+			outputs = generate_type(worker_schema, typename, is_multiple, options.namespace, options.stringtype,
+					FileWriter(options.dstdir), profiler, options.codeoptions)
+		return outputs, None, profiler.data()
+	except Exception:
+		return None, "failed to generate " + classname + "\n" + traceback.format_exc(), profiler.data()
+
+class JSONXSDLoader:
+	# schema and cache of one run, jsonxsd2cppd.py keeps them across runs
+	def get_schema(self, filepath):
+		return JSONXSDFile(filepath)
+
+	def get_cache(self, options):
+		if options.cachefile == "":
+			return None
+		return JSONGenCache(options.cachefile, options.namespace, options.stringtype, options.codeoptions)
+
+def main(args = None, loader = None, prog = None):
+	global worker_schema
+
+	options = parse_options(args, prog)
+	if loader == None:
+		loader = JSONXSDLoader()
 
-	typename, is_multiple = cur_class
-	if JSONXSDConstant.is_basic_type(typename) and not is_multiple:
-		#single basic/simple type
+	profiler = JSONProfiler(options.profile)
+	profiler.begin("total")
+	profiler.begin("parse")
+	schema = loader.get_schema(options.jsonxsdfile)
+	profiler.end("parse")
+	#import pprint
+	#pprint.pprint(schema.elements)
+	#pprint.pprint(schema.simpletypes)
+	#pprint.pprint(schema.complextypes)
+
+	if options.dependents != "":
+		if not schema.complextypes.has_key(options.dependents):
+			sys.stderr.write("complexType \"" + options.dependents + "\" is not defined\n")
+			exit(1)
+		dependents = schema.get_dependents(options.dependents)
+		for typename in schema.get_topological_order():
+			if typename in dependents:
+				print typename
 		exit(0)
 
-	classname = JSONXSDConstant.get_cpp_class_name(typename, is_multiple)
-	if options.gentest:
-		cpptest = CppTest(classname, options.namespace, options.stringtype)
-		cpptest.savefile(os.path.join(options.dstdir, cpptest.filename))
+	element_names = options.element_names
+	if options.all_elements:
+		element_names = sorted(schema.elements.keys())
 
-	for typename, is_multiple in array_types:
-		classname = JSONXSDConstant.get_cpp_class_name(typename, is_multiple)
-		detailCpp = JSONDetailCppClass()
-		detailCpp.save_to_dir(classname, options.dstdir, options.namespace, options.stringtype)
+	profiler.begin("deps")
+	dep_types, array_types = get_elements_deps(schema, element_names)
+	profiler.end("deps")
+	#print "dep_types: ", dep_types
+	#print "array_types: ", array_types
 
-	for typename, is_multiple in dep_types:
-		walker = JSONXSDWalker(schema)
+	manifest = None
+	if options.depfile != "" or options.manifest != "":
+		manifest = JSONManifest(options.dstdir)
+		manifest.add_input(options.jsonxsdfile)
 
-		cppheader = CppHeaderHandler(options.namespace, options.stringtype)
-		walker.json_handlers.append(cppheader)
-		cppbodybuilder = CppBodyBuilder(options.namespace, options.stringtype)
-		walker.json_handlers.extend(cppbodybuilder.handlers)
+	if options.gentest:
+		cur_class, cur_deps = schema.get_element_class_and_deps(element_names[0])
+		typename, is_multiple = cur_class
+		if not (JSONXSDConstant.is_basic_type(typename) and not is_multiple):
+			classname = JSONXSDConstant.get_cpp_class_name(typename, is_multiple)
+			cpptest = CppTest(classname, options.namespace, options.stringtype, options.codeoptions, is_multiple)
+			cpptest.savefile(os.path.join(options.dstdir, cpptest.filename))
+			if manifest != None:
+				manifest.add_outputs([cpptest.filename], {})
+
+	for detailheader in options.codeoptions.detail_headers(options.namespace):
+		detailheader.save(FileWriter(options.dstdir))
+		if manifest != None:
+			manifest.add_outputs([detailheader.filepath], {})
+
+	cache = loader.get_cache(options)
+
+	# (cache entry name, cache key, (typename, is_multiple)) of types to generate
+	profiler.begin("cache")
+	works = []
+	for typename, is_multiple in sorted(array_types):
+		name = JSONXSDConstant.get_cpp_class_name(typename, is_multiple)
+		key = None
+		if cache != None:
+			key = cache.make_key(name)
+			if cache.is_fresh(name, key, options.dstdir):
+				if manifest != None:
+					manifest.add_outputs(*cache.get_outputs(name))
+				continue
+		works.append( (name, key, (typename, is_multiple)) )
+
+	for typename, is_multiple in sorted(dep_types):
+		name = "xsd:" + typename + ":" + str(int(is_multiple))
+		key = None
+		if cache != None:
+			key = cache.make_key(schema.get_type_signature(typename, is_multiple))
+			if cache.is_fresh(name, key, options.dstdir):
+				if manifest != None:
+					manifest.add_outputs(*cache.get_outputs(name))
+				continue
+		works.append( (name, key, (typename, is_multiple)) )
+
+	profiler.end("cache")
+
+	work_args = [(typename, is_multiple, options) for name, key, (typename, is_multiple) in works]
+	profiler.begin("generate")
+	worker_schema = schema
+	if options.jobs > 1 and len(works) > 1:
+		pool = multiprocessing.Pool(options.jobs, init_worker, (options.jsonxsdfile,))
+		results = pool.map(generate_work, work_args)
+		pool.close()
+		pool.join()
+	else:
+		results = map(generate_work, work_args)
+
+	profiler.end("generate")
+
+	failed = False
+	for (name, key, cur_class), (outputs, error, profile_data) in zip(works, results):
+		profiler.merge(profile_data)
+		if error != None:
+			sys.stderr.write(error)
+			failed = True
+			continue
+
+		filenames, includes = outputs
+		if cache != None:
+			cache.update(name, key, options.dstdir, filenames, includes)
+		if manifest != None:
+			manifest.add_outputs(filenames, includes)
+
+	if cache != None:
+		cache.save()
+
+	profiler.end("total")
+	if options.profile:
+		sys.stderr.write(profiler.report())
+		if options.profilefile != "":
+			profiler.save(options.profilefile)
+
+	if failed:
+		exit(1)
 
-		#print "walking " + typename + ", " + str(is_multiple)
-		walker.walk(typename, is_multiple)
-		cppheader.save_to_dir(options.dstdir)
-		cppbodybuilder.save_to_dir(options.dstdir)
+	if options.manifest != "":
+		manifest.save_manifest(options.manifest)
+	if options.depfile != "":
+		manifest.save_depfile(options.depfile)
 
+if __name__ == "__main__":
+	main()
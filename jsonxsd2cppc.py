@@ -0,0 +1,77 @@
+#!/usr/bin/python
+
+#  The MIT License (MIT)
+#
+#  Copyright (c) 2013 Yuanyang Wu
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import os
+import os.path
+import socket
+import sys
+
+# thin client of jsonxsd2cppd.py, only standard modules are imported to start fast.
+# arguments are the same as jsonxsd2cpp.py, plus
+#   --socket=SOCKET  daemon socket, default is $JSONXSD2CPPD_SOCKET or /tmp/jsonxsd2cppd-UID.sock
+#   --shutdown       stop the daemon
+# jsonxsd2cpp.py is run in-process when no daemon is listening.
+
+def default_socket_path():
+	return os.environ.get("JSONXSD2CPPD_SOCKET", "/tmp/jsonxsd2cppd-" + str(os.getuid()) + ".sock")
+
+def send_request(socketpath, request):
+	s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	s.connect(socketpath)
+	s.sendall(json.dumps(request) + "\n")
+	f = s.makefile("r")
+	response = json.loads(f.readline())
+	f.close()
+	s.close()
+	return response
+
+if __name__ == "__main__":
+	socketpath = default_socket_path()
+	shutdown = False
+	args = []
+	for arg in sys.argv[1:]:
+		if arg.startswith("--socket="):
+			socketpath = arg[len("--socket="):]
+		elif arg == "--shutdown":
+			shutdown = True
+		else:
+			args.append(arg)
+
+	if shutdown:
+		request = {"shutdown": True}
+	else:
+		request = {"cwd": os.getcwd(), "args": args}
+
+	try:
+		response = send_request(socketpath, request)
+	except socket.error:
+		if shutdown:
+			exit(0)
+		generator = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jsonxsd2cpp.py")
+		os.execv(sys.executable, [sys.executable, generator] + args)
+
+	sys.stdout.write(response["stdout"])
+	sys.stderr.write(response["stderr"])
+	exit(response["code"])
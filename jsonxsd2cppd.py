@@ -0,0 +1,191 @@
+#!/usr/bin/python
+
+#  The MIT License (MIT)
+#
+#  Copyright (c) 2013 Yuanyang Wu
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+import SocketServer
+import StringIO
+import errno
+import json
+import os
+import os.path
+import socket
+import sys
+import traceback
+
+import jsonxsd2cpp
+from jsongencache import JSONGenCache
+
+# request and response are one JSON line each
+#   request:  {"cwd": client directory, "args": jsonxsd2cpp.py arguments}
+#             {"shutdown": true}
+#   response: {"code": exit code, "stdout": ..., "stderr": ...}
+
+class JSONXSDDaemonLoader(jsonxsd2cpp.JSONXSDLoader):
+	def __init__(self):
+		# absolute XSD path => (mtime, size, JSONXSDFile)
+		self.schemas = {}
+		# (absolute dstdir, namespace, stringtype, code options) => in-memory JSONGenCache
+		self.caches = {}
+
+	def file_state(filepath):
+		st = os.stat(filepath)
+		return st.st_mtime, st.st_size
+
+	def get_schema(self, filepath):
+		filepath = os.path.abspath(filepath)
+		mtime, size = JSONXSDDaemonLoader.file_state(filepath)
+		cached = self.schemas.get(filepath)
+		if cached == None or cached[0] != mtime or cached[1] != size:
+			cached = (mtime, size, jsonxsd2cpp.JSONXSDFile(filepath))
+			self.schemas[filepath] = cached
+		return cached[2]
+
+	def get_cache(self, options):
+		if options.cachefile != "":
+			return jsonxsd2cpp.JSONXSDLoader.get_cache(self, options)
+
+		# without --cachefile types unchanged since last request are skipped anyway
+		key = (os.path.abspath(options.dstdir), options.namespace, options.stringtype, options.codeoptions.signature())
+		if not self.caches.has_key(key):
+			self.caches[key] = JSONGenCache(None, options.namespace, options.stringtype, options.codeoptions)
+		return self.caches[key]
+
+	def refresh(self):
+		# parse changed schemas ahead of next request, drop deleted ones
+		for filepath, (mtime, size, schema) in self.schemas.items():
+			try:
+				if JSONXSDDaemonLoader.file_state(filepath) != (mtime, size):
+					self.get_schema(filepath)
+			except Exception:
+				del self.schemas[filepath]
+
+	file_state = staticmethod(file_state)
+
+class JSONXSDRequestHandler(SocketServer.StreamRequestHandler):
+	def handle(self):
+		line = self.rfile.readline()
+		if line == "":
+			# connection of is_serving()
+			return
+		request = json.loads(line)
+		if request.get("shutdown"):
+			self.server.running = False
+			response = {"code": 0, "stdout": "", "stderr": ""}
+		else:
+			# JSON strings are unicode, generator works on byte strings
+			response = self.server.run(request["cwd"].encode("utf-8"), [arg.encode("utf-8") for arg in request["args"]])
+		self.wfile.write(json.dumps(response) + "\n")
+
+class JSONXSDDaemon(SocketServer.UnixStreamServer):
+	def __init__(self, socketpath, poll_interval):
+		SocketServer.UnixStreamServer.__init__(self, socketpath, JSONXSDRequestHandler)
+		self.loader = JSONXSDDaemonLoader()
+		self.running = True
+		# handle_timeout() is called when no request comes in the interval
+		self.timeout = poll_interval
+
+	def run(self, cwd, args):
+		# requests are served one by one, so that chdir and output capture are safe
+		cwd_saved = os.getcwd()
+		stdout, stderr = sys.stdout, sys.stderr
+		sys.stdout, sys.stderr = StringIO.StringIO(), StringIO.StringIO()
+		code = 0
+		try:
+			try:
+				os.chdir(cwd)
+				jsonxsd2cpp.main(args, self.loader, "jsonxsd2cpp.py")
+			except SystemExit, e:
+				if e.code != None:
+					code = e.code
+			except Exception:
+				sys.stderr.write(traceback.format_exc())
+				code = 1
+			response = {"code": code, "stdout": sys.stdout.getvalue(), "stderr": sys.stderr.getvalue()}
+		finally:
+			sys.stdout, sys.stderr = stdout, stderr
+			os.chdir(cwd_saved)
+		return response
+
+	def handle_timeout(self):
+		self.loader.refresh()
+
+	def serve(self):
+		while self.running:
+			self.handle_request()
+
+def default_socket_path():
+	return os.environ.get("JSONXSD2CPPD_SOCKET", "/tmp/jsonxsd2cppd-" + str(os.getuid()) + ".sock")
+
+def is_serving(socketpath):
+	# whether a daemon accepts connections on socketpath, a refused one is left by a killed daemon
+	s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	try:
+		s.connect(socketpath)
+	except socket.error, e:
+		if e.errno in (errno.ECONNREFUSED, errno.ENOENT):
+			return False
+		raise
+	finally:
+		s.close()
+	return True
+
+def parse_options():
+	import optparse
+
+	usage_msg = """usage: %prog [options]"""
+	parser = optparse.OptionParser(usage=usage_msg)
+	parser.add_option("--socket", dest="socket", default=default_socket_path(),
+		help="""Unix socket to serve jsonxsd2cppc.py requests, default is $JSONXSD2CPPD_SOCKET or /tmp/jsonxsd2cppd-UID.sock""")
+	parser.add_option("--poll", type="float", dest="poll", default=1.0,
+		help="""seconds between checks of loaded XSD files for changes, default is 1""")
+	options, reminder = parser.parse_args()
+
+	valid = True
+	if len(reminder) != 0:
+		valid = False
+
+	if valid and options.poll <= 0:
+		valid = False
+
+	if not valid:
+		parser.print_help()
+		exit(1)
+
+	return options
+
+if __name__ == "__main__":
+	options = parse_options()
+
+	if os.path.exists(options.socket):
+		if is_serving(options.socket):
+			sys.stderr.write("a daemon is already serving " + options.socket + "\n")
+			exit(1)
+		# socket left by a killed daemon
+		os.remove(options.socket)
+
+	daemon = JSONXSDDaemon(options.socket, options.poll)
+	try:
+		daemon.serve()
+	finally:
+		daemon.server_close()
+		os.remove(options.socket)
@@ -0,0 +1,324 @@
+#!/usr/bin/python
+
+#  The MIT License (MIT)
+#
+#  Copyright (c) 2013 Yuanyang Wu
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import math
+import os
+import os.path
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+from jsoncpphandler import CppHeaderHandler, CppBodyBuilder
+from jsondata2cpp import JSONDataWalker
+from jsonprofile import JSONProfiler
+from jsonxsd2cpp import JSONXSDFile, JSONXSDWalker, JSONXSDConstant, get_elements_deps
+
+class SchemaSynthesizer:
+	basic_types = ["xs:string", "xs:int", "xs:long", "xs:boolean", "xs:double"]
+
+	def __init__(self, types, fields, depth, inherit, arrays):
+		self.types = types
+		self.fields = fields
+		self.depth = depth
+		self.inherit = inherit
+		self.arrays = arrays
+
+	def xsd(self):
+		# type i uses type i+1 as field inside chains of "depth" types,
+		# and extends type i-1 inside chains of "inherit" types
+		lines = ["""<?xml version="1.0" encoding="UTF-8"?>""",
+			"""<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">"""]
+		for i in xrange(self.types):
+			lines.append("""  <xs:element name="e%d" type="t%d"/>""" % (i, i))
+
+		for i in xrange(self.types):
+			elements = []
+			for j in xrange(self.fields):
+				max_occurs = ["1", "unbounded"][j % 2]
+				elements.append("""<xs:element name="f%d_%d" type="%s" minOccurs="0" maxOccurs="%s"/>""" \
+						% (i, j, SchemaSynthesizer.basic_types[j % len(SchemaSynthesizer.basic_types)], max_occurs))
+			if (i % self.depth) != self.depth - 1 and i + 1 < self.types:
+				elements.append("""<xs:element name="child%d" type="t%d" minOccurs="0"/>""" % (i, i + 1))
+				elements.append("""<xs:element name="children%d" type="t%d" maxOccurs="unbounded"/>""" % (i, i + 1))
+
+			lines.append("""  <xs:complexType name="t%d">""" % i)
+			if (i % (self.inherit + 1)) != 0:
+				lines.append("""    <xs:complexContent><xs:extension base="t%d"><xs:sequence>""" % (i - 1))
+				lines.extend(["      " + e for e in elements])
+				lines.append("""    </xs:sequence></xs:extension></xs:complexContent>""")
+			else:
+				lines.append("""    <xs:sequence>""")
+				lines.extend(["      " + e for e in elements])
+				lines.append("""    </xs:sequence>""")
+			lines.append("""  </xs:complexType>""")
+
+		lines.append("""</xs:schema>""")
+		return "\n".join(lines) + "\n"
+
+	def json_object(self, i, depth):
+		values = [u"text", 1, 5000000000, True, 1.5]
+		ret = {}
+		for j in xrange(self.fields):
+			ret["f%d" % j] = values[j % len(values)]
+		if depth > 1:
+			ret["child"] = self.json_object(i, depth - 1)
+			element = self.json_object(i, depth - 1)
+			for n in xrange(self.arrays):
+				element = [element]
+			ret["children"] = element
+		return ret
+
+	def json(self):
+		# "types" members of the root object, each nested "depth" levels
+		return dict([("m%d" % i, self.json_object(i, self.depth)) for i in xrange(self.types)])
+
+def make_handlers():
+	cppheader = CppHeaderHandler("", "std::string")
+	cppbodybuilder = CppBodyBuilder("", "std::string")
+	return cppheader, cppbodybuilder, [cppheader] + cppbodybuilder.handlers
+
+def run_xsd(synthesizer, profiler):
+	f = tempfile.NamedTemporaryFile(suffix = ".xsd", delete = False)
+	f.write(synthesizer.xsd())
+	f.close()
+
+	profiler.begin("JSONXSDFile")
+	schema = JSONXSDFile(f.name)
+	profiler.end("JSONXSDFile")
+	os.remove(f.name)
+
+	profiler.begin("dependency closure")
+	dep_types, array_types = get_elements_deps(schema, sorted(schema.elements.keys()))
+	profiler.end("dependency closure")
+
+	profiler.begin("JSONXSDWalker")
+	for typename, is_multiple in sorted(dep_types):
+		walker = JSONXSDWalker(schema)
+		cppheader, cppbodybuilder, handlers = make_handlers()
+		walker.json_handlers = profiler.wrap_handlers(handlers)
+		profiler.begin_type(JSONXSDConstant.get_cpp_class_name(typename, is_multiple))
+		walker.walk(typename, is_multiple)
+		profiler.end_type()
+		profiler.begin("content")
+		cppheader.content()
+		cppbodybuilder.content()
+		profiler.end("content")
+	profiler.end("JSONXSDWalker")
+
+def run_data(synthesizer, profiler):
+	rawjson = synthesizer.json()
+
+	profiler.begin("JSONDataWalker")
+	walker = JSONDataWalker(rawjson, "root")
+	cppheader, cppbodybuilder, handlers = make_handlers()
+	walker.json_handlers = profiler.wrap_handlers(handlers)
+	profiler.begin_type("Root")
+	walker.walk()
+	profiler.end_type()
+	profiler.begin("content")
+	cppheader.content()
+	cppbodybuilder.content()
+	profiler.end("content")
+	profiler.end("JSONDataWalker")
+
+def run_case(options):
+	# run in its own process so that peak growth belongs to this case only
+	synthesizer = SchemaSynthesizer(options.size, options.fields, options.depth, options.inherit, options.arrays)
+	profiler = JSONProfiler()
+	profiler.begin("total")
+	{"xsd": run_xsd, "data": run_data}[options.run](synthesizer, profiler)
+	profiler.end("total")
+	json.dump(profiler.data(), sys.stdout)
+
+def read_command(args, cwd = None):
+	p = subprocess.Popen(args, stdout = subprocess.PIPE, cwd = cwd)
+	output = p.communicate()[0]
+	if p.returncode != 0:
+		raise OSError(" ".join(args) + " failed")
+	return output
+
+def git_label():
+	try:
+		return read_command(["git", "rev-parse", "--short", "HEAD"], os.path.dirname(os.path.abspath(__file__))).strip()
+	except OSError:
+		return "unknown"
+
+def run_benchmark(options):
+	params = ["--fields=%d" % options.fields, "--depth=%d" % options.depth,
+		"--inherit=%d" % options.inherit, "--arrays=%d" % options.arrays]
+	results = {}
+	for kind in ["xsd", "data"]:
+		results[kind] = {}
+		for size in options.sizes:
+			# keep the fastest of repeated runs to reduce noise
+			for n in xrange(options.repeat):
+				output = read_command([sys.executable, os.path.abspath(__file__),
+						"--run=" + kind, "--size=%d" % size] + params)
+				case = json.loads(output)
+				best = results[kind].get(str(size))
+				if best == None or case["phases"]["total"]["seconds"] < best["phases"]["total"]["seconds"]:
+					results[kind][str(size)] = case
+
+	return {"label": options.label, "params": params, "sizes": options.sizes, "results": results}
+
+def timings(result, kind, size):
+	# phases and handlers of one case, handlers have no peak growth
+	case = result["results"][kind].get(str(size))
+	if case == None:
+		return {}
+	ret = {}
+	for name, stat in case["phases"].items():
+		# results saved before peak growth was measured have none
+		growth = stat.get("peak_growth_kb")
+		if growth != None:
+			growth = growth / 1024.0
+		ret[name] = (stat["seconds"], growth)
+	for name, stat in case["handlers"].items():
+		ret[name] = (stat["seconds"], None)
+	return ret
+
+def timing_names(result, kind):
+	names = set()
+	for size in result["sizes"]:
+		names.update(timings(result, kind, size).keys())
+	return sorted(names)
+
+def report(result):
+	# exponent k of time ~ size^k between neighbouring sizes, 1.0 is linear
+	lines = ["benchmark " + result["label"] + " " + " ".join(result["params"])]
+	for kind in ["xsd", "data"]:
+		lines.append("")
+		lines.append("%-6s %-24s %10s %10s %10s" % (kind, "phase/handler", "seconds", "+peak MB", "exponent"))
+		sizes = result["sizes"]
+		for name in timing_names(result, kind):
+			for i in xrange(len(sizes)):
+				cur = timings(result, kind, sizes[i]).get(name)
+				if cur == None:
+					continue
+				seconds, peak = cur
+				exponent = ""
+				if i > 0:
+					prev = timings(result, kind, sizes[i - 1]).get(name)
+					if prev != None and prev[0] > 0 and seconds > 0:
+						exponent = "%.2f" % (math.log(seconds / prev[0]) / math.log(float(sizes[i]) / sizes[i - 1]))
+				if peak == None:
+					peak = ""
+				else:
+					peak = "%.1f" % peak
+				lines.append("%-6d %-24s %10.3f %10s %10s" % (sizes[i], name, seconds, peak, exponent))
+	return "\n".join(lines) + "\n"
+
+def compare(old, new):
+	lines = ["compare " + old["label"] + " => " + new["label"]]
+	for kind in ["xsd", "data"]:
+		lines.append("")
+		lines.append("%-6s %-24s %10s %10s %8s" % (kind, "phase/handler", "old", "new", "ratio"))
+		for size in new["sizes"]:
+			old_timings = timings(old, kind, size)
+			new_timings = timings(new, kind, size)
+			for name in timing_names(new, kind):
+				if not (old_timings.has_key(name) and new_timings.has_key(name)):
+					continue
+				old_seconds = old_timings[name][0]
+				new_seconds = new_timings[name][0]
+				ratio = ""
+				if old_seconds > 0:
+					ratio = "%.2f" % (new_seconds / old_seconds)
+				lines.append("%-6d %-24s %10.3f %10.3f %8s" % (size, name, old_seconds, new_seconds, ratio))
+	return "\n".join(lines) + "\n"
+
+def parse_options():
+	import optparse
+
+	usage_msg = """usage: %prog [options]"""
+	parser = optparse.OptionParser(usage=usage_msg)
+	parser.add_option("--sizes", dest="sizes", default="250,500,1000,2000",
+		help="""comma separated numbers of types (XSD) or root members (JSON) to benchmark, default is 250,500,1000,2000""")
+	parser.add_option("--fields", type="int", dest="fields", default=10,
+		help="""basic fields per type, half of them arrays, default is 10""")
+	parser.add_option("--depth", type="int", dest="depth", default=3,
+		help="""nesting depth of types used as fields and of JSON objects, default is 3""")
+	parser.add_option("--inherit", type="int", dest="inherit", default=2,
+		help="""length of XSD "complexContent > extension" chains, default is 2""")
+	parser.add_option("--arrays", type="int", dest="arrays", default=1,
+		help="""array nesting of JSON object arrays, default is 1""")
+	parser.add_option("--repeat", type="int", dest="repeat", default=3,
+		help="""runs of each case, the fastest one is kept, default is 3""")
+	parser.add_option("--resultdir", dest="resultdir", default="results",
+		help="""directory to save result "LABEL.json", default is "results" """)
+	parser.add_option("--label", dest="label", default="",
+		help="""name of the result, default is current git commit""")
+	parser.add_option("--compare", dest="compare", default="",
+		help="""result file of an earlier run to compare with""")
+	parser.add_option("--run", dest="run", default="",
+		help=optparse.SUPPRESS_HELP)
+	parser.add_option("--size", type="int", dest="size", default=0,
+		help=optparse.SUPPRESS_HELP)
+	options, reminder = parser.parse_args()
+
+	valid = len(reminder) == 0
+	try:
+		options.sizes = [int(size) for size in options.sizes.split(",")]
+	except ValueError:
+		valid = False
+
+	if valid and (options.fields < 0 or options.depth < 1 or options.inherit < 0 or options.arrays < 0 or options.repeat < 1):
+		valid = False
+
+	if valid and options.run not in ["", "xsd", "data"]:
+		valid = False
+
+	if not valid:
+		parser.print_help()
+		exit(1)
+
+	if options.label == "":
+		options.label = git_label()
+
+	return options
+
+if __name__ == "__main__":
+	options = parse_options()
+
+	if options.run != "":
+		run_case(options)
+		exit(0)
+
+	result = run_benchmark(options)
+	sys.stdout.write(report(result))
+
+	if not os.path.exists(options.resultdir):
+		os.makedirs(options.resultdir)
+	f = open(os.path.join(options.resultdir, options.label + ".json"), "w")
+	json.dump(result, f, indent=1, sort_keys=True, separators=(",", ": "))
+	f.write("\n")
+	f.close()
+
+	if options.compare != "":
+		f = open(options.compare)
+		sys.stdout.write(compare(json.load(f), result))
+		f.close()
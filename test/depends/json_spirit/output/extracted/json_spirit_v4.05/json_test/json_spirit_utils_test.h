@@ -0,0 +1,18 @@
+#ifndef JSON_SPIRIT_UTILS_TEST
+#define JSON_SPIRIT_UTILS_TEST
+
+//          Copyright John W. Wilkinson 2007 - 2011
+// Distributed under the MIT License, see accompanying file LICENSE.txt
+
+// json spirit version 4.05
+
+#if defined(_MSC_VER) && (_MSC_VER >= 1020)
+# pragma once
+#endif
+
+namespace json_spirit
+{
+    void test_utils();
+}
+
+#endif
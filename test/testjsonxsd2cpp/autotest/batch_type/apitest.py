@@ -0,0 +1,46 @@
+#!/usr/bin/python
+
+#  The MIT License (MIT)
+#
+#  Copyright (c) 2013 Yuanyang Wu
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+import os.path
+import sys
+
+sys.path.insert(0, "../../../..")
+
+from jsonxsd2cpp import JSONXSDFile, generate_from_xsd
+
+# generate_from_xsd() must return the files jsonxsd2cpp.py writes to DSTDIR
+if __name__ == "__main__":
+	xsdfile, dstdir = sys.argv[1:]
+	schema = JSONXSDFile(xsdfile)
+	files = generate_from_xsd(schema, sorted(schema.elements.keys()))
+
+	expected = []
+	for dirpath, dirnames, filenames in os.walk(dstdir):
+		expected.extend([os.path.relpath(os.path.join(dirpath, f), dstdir) for f in filenames])
+	assert sorted(files.keys()) == sorted(expected), ("generated files differ")
+
+	for filename, content in files.items():
+		f = open(os.path.join(dstdir, filename))
+		assert f.read() == content, (filename + " differs")
+		f.close()